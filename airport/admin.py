@@ -1,21 +1,190 @@
 from django.contrib import admin
+from django.core.exceptions import ValidationError
 
 from .models import (
+    ArchivedFlight,
+    ArchivedTicket,
     Airport,
     AirplaneType,
     Airplane,
     Crew,
     Route,
     Flight,
+    FlightSchedule,
     Order,
     Ticket,
+    IdempotencyKey,
+    Job,
 )
 
-admin.site.register(Airport)
-admin.site.register(AirplaneType)
-admin.site.register(Airplane)
-admin.site.register(Crew)
-admin.site.register(Route)
-admin.site.register(Flight)
-admin.site.register(Order)
-admin.site.register(Ticket)
+# Route.__str__ reads both airports, so every list showing a route or a
+# flight joins them instead of querying them per row.
+ROUTE_RELATED = ("route__source", "route__destination")
+
+
+class SeatTaken(Exception):
+    """A ticket lost its seat to a concurrent booking while saving."""
+
+
+@admin.register(Airport)
+class AirportAdmin(admin.ModelAdmin):
+    list_display = ("name", "iata_code", "closest_big_city")
+    search_fields = ("name", "iata_code", "closest_big_city")
+
+
+@admin.register(AirplaneType)
+class AirplaneTypeAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+
+
+@admin.register(Airplane)
+class AirplaneAdmin(admin.ModelAdmin):
+    list_display = ("name", "type", "rows", "seats_in_row")
+    list_select_related = ("type",)
+    list_filter = ("type",)
+    search_fields = ("name",)
+    autocomplete_fields = ("type",)
+
+
+@admin.register(Crew)
+class CrewAdmin(admin.ModelAdmin):
+    list_display = ("first_name", "last_name")
+    search_fields = ("first_name", "last_name")
+
+
+@admin.register(Route)
+class RouteAdmin(admin.ModelAdmin):
+    list_display = ("id", "source", "destination", "distance")
+    list_select_related = ("source", "destination")
+    search_fields = (
+        "source__name",
+        "source__closest_big_city",
+        "destination__name",
+        "destination__closest_big_city",
+    )
+    autocomplete_fields = ("source", "destination")
+
+
+@admin.register(FlightSchedule)
+class FlightScheduleAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "route",
+        "airplane",
+        "weekdays",
+        "departure_time",
+        "valid_from",
+        "valid_until",
+    )
+    list_select_related = ROUTE_RELATED + ("airplane",)
+    autocomplete_fields = ("route", "airplane", "crew")
+
+
+@admin.register(Flight)
+class FlightAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "route",
+        "airplane",
+        "departure_time",
+        "arrival_time",
+        "seats_sold",
+    )
+    list_select_related = ROUTE_RELATED + ("airplane",)
+    # Both are served by flight_departure_idx and
+    # flight_airplane_departure_idx, which also lists the airplanes that
+    # have flights without loading every other one.
+    list_filter = (
+        "departure_time",
+        ("airplane", admin.RelatedOnlyFieldListFilter),
+    )
+    date_hierarchy = "departure_time"
+    search_fields = ("=id",)
+    autocomplete_fields = ("route", "airplane", "crew")
+    raw_id_fields = ("schedule",)
+    show_full_result_count = False
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "created_at", "total_price")
+    list_select_related = ("user",)
+    search_fields = ("=id", "user__email")
+    raw_id_fields = ("user",)
+    show_full_result_count = False
+
+
+@admin.register(Ticket)
+class TicketAdmin(admin.ModelAdmin):
+    list_display = ("id", "flight", "order", "row", "seat", "price")
+    list_select_related = tuple(
+        f"flight__{related}" for related in ROUTE_RELATED
+    ) + ("order",)
+    # Exact lookups hit the unique (flight, row, seat) index and
+    # ticket_order_idx.
+    search_fields = ("=flight__id", "=order__id")
+    raw_id_fields = ("flight", "order")
+    show_full_result_count = False
+
+    def save_model(self, request, obj, form, change):
+        try:
+            super().save_model(request, obj, form, change)
+        except ValidationError:
+            # A concurrent booking took the last seat after the form was
+            # validated. Leaving changeform_view's transaction rolls the
+            # save back.
+            raise SeatTaken
+
+    def changeform_view(
+        self, request, object_id=None, form_url="", extra_context=None
+    ):
+        try:
+            return super().changeform_view(
+                request, object_id, form_url, extra_context
+            )
+        except SeatTaken:
+            # The concurrent booking has committed by now, so validating
+            # the form again reports the sold-out flight on it.
+            return super().changeform_view(
+                request, object_id, form_url, extra_context
+            )
+
+
+@admin.register(ArchivedFlight)
+class ArchivedFlightAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "route",
+        "airplane",
+        "departure_time",
+        "arrival_time",
+    )
+    list_select_related = ROUTE_RELATED + ("airplane",)
+    raw_id_fields = ("route", "airplane", "crew")
+    show_full_result_count = False
+
+
+@admin.register(ArchivedTicket)
+class ArchivedTicketAdmin(admin.ModelAdmin):
+    list_display = ("id", "flight", "order", "row", "seat", "price")
+    list_select_related = tuple(
+        f"flight__{related}" for related in ROUTE_RELATED
+    ) + ("order",)
+    search_fields = ("=flight__id", "=order__id")
+    raw_id_fields = ("flight", "order")
+    show_full_result_count = False
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ("key", "user", "response_status", "created_at")
+    list_select_related = ("user",)
+    date_hierarchy = "created_at"
+    raw_id_fields = ("user",)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "status", "attempts", "run_after")
+    list_filter = ("status",)
+    search_fields = ("name",)
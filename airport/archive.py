@@ -0,0 +1,62 @@
+"""
+Moves flights that departed long ago, with their crew assignments and
+tickets, from the live tables into ArchivedFlight and ArchivedTicket.
+
+Rows keep their ids, so tickets and orders referenced by clients stay
+recognisable in order history. Live queries never see archived rows and
+so stay proportional to the current schedule rather than to history.
+"""
+from django.db import transaction
+
+from .models import ArchivedFlight, ArchivedTicket, Flight, Ticket
+
+
+def archive_batch(before, batch_size):
+    """
+    Archive up to ``batch_size`` of the earliest flights departing
+    before ``before`` in one transaction, returning
+    ``(flights, tickets)`` moved.
+    """
+    with transaction.atomic():
+        flight_ids = list(
+            Flight.objects.select_for_update()
+            .filter(departure_time__lt=before)
+            .order_by("departure_time")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not flight_ids:
+            return 0, 0
+
+        flights = Flight.objects.filter(id__in=flight_ids)
+        ArchivedFlight.objects.bulk_create(
+            ArchivedFlight(**values)
+            for values in flights.values(
+                "id",
+                "route_id",
+                "airplane_id",
+                "departure_time",
+                "arrival_time",
+            )
+        )
+        crew = Flight.crew.through.objects.filter(flight_id__in=flight_ids)
+        ArchivedFlight.crew.through.objects.bulk_create(
+            ArchivedFlight.crew.through(
+                archivedflight_id=flight_id, crew_id=crew_id
+            )
+            for flight_id, crew_id in crew.values_list("flight_id", "crew_id")
+        )
+        tickets = Ticket.objects.filter(flight_id__in=flight_ids)
+        archived_tickets = ArchivedTicket.objects.bulk_create(
+            ArchivedTicket(**values)
+            for values in tickets.values(
+                "id", "row", "seat", "price", "flight_id", "order_id"
+            )
+        )
+
+        # The flights are gone from every live query, so there is no
+        # point in deleting tickets one by one just to send the signals
+        # that invalidate their cached fares.
+        tickets._raw_delete(tickets.db)
+        crew._raw_delete(crew.db)
+        flights.delete()
+    return len(flight_ids), len(archived_tickets)
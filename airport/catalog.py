@@ -0,0 +1,233 @@
+"""
+Per-process read model of upcoming flights for flight search.
+
+With FLIGHT_CATALOG_ENABLED, each process keeps the flights departing
+today or later in memory, indexed by departure date and by route and
+departure date, so listing the flights of a day needs no database
+round trip. Flights of the same route or airplane share one object.
+
+Every write to a flight, or to a route, airport or airplane shown with
+flights, records a FlightChange row. At most every
+FLIGHT_CATALOG_MAX_STALENESS seconds a process reads the rows created
+since its last sync and reloads only the flights they name, so a
+search sees a change at most that many seconds late. Fares are looked
+up once per flight between syncs and are as stale at most.
+"""
+from datetime import datetime
+from operator import attrgetter
+
+from django.conf import settings
+from django.utils import timezone
+
+from airport_api.sync import IncrementalSync
+
+from .models import Flight, FlightChange
+from .pricing import price_flights
+
+
+class CatalogRoute:
+    __slots__ = ("label", "distance")
+
+    def __init__(self, route):
+        self.label = str(route)
+        self.distance = route.distance
+
+    def __str__(self):
+        return self.label
+
+
+class CatalogAirplane:
+    __slots__ = ("label", "capacity")
+
+    def __init__(self, airplane):
+        self.label = str(airplane)
+        self.capacity = airplane.capacity
+
+    def __str__(self):
+        return self.label
+
+
+class CatalogFlight:
+    """Flight as FlightListSerializer and price_flights read it."""
+
+    __slots__ = (
+        "id",
+        "route_id",
+        "route",
+        "airplane",
+        "departure_time",
+        "arrival_time",
+        "departure_date",
+    )
+
+    def __init__(self, flight, route, airplane):
+        self.id = flight.id
+        self.route_id = flight.route_id
+        self.route = route
+        self.airplane = airplane
+        self.departure_time = flight.departure_time
+        self.arrival_time = flight.arrival_time
+        self.departure_date = timezone.localtime(flight.departure_time).date()
+
+
+def start_of_today():
+    return timezone.make_aware(
+        datetime.combine(timezone.localdate(), datetime.min.time())
+    )
+
+
+class FlightCatalog(IncrementalSync):
+    interval_setting = "FLIGHT_CATALOG_MAX_STALENESS"
+
+    def reset(self):
+        super().reset()
+        self._flights = {}
+        self._by_date = {}
+        self._by_route_date = {}
+        self._routes = {}
+        self._airplanes = {}
+        self._fares = {}
+
+    def __len__(self):
+        return len(self._flights)
+
+    def _add(self, flight):
+        route = self._routes.get(flight.route_id)
+        if route is None:
+            route = self._routes[flight.route_id] = CatalogRoute(flight.route)
+        airplane = self._airplanes.get(flight.airplane_id)
+        if airplane is None:
+            airplane = self._airplanes[flight.airplane_id] = CatalogAirplane(
+                flight.airplane
+            )
+        entry = CatalogFlight(flight, route, airplane)
+        self._flights[entry.id] = entry
+        self._by_date.setdefault(entry.departure_date, {})[entry.id] = entry
+        self._by_route_date.setdefault(
+            (entry.route_id, entry.departure_date), {}
+        )[entry.id] = entry
+
+    def _remove(self, flight_id):
+        entry = self._flights.pop(flight_id, None)
+        if entry is not None:
+            self._by_date[entry.departure_date].pop(flight_id)
+            self._by_route_date[(entry.route_id, entry.departure_date)].pop(
+                flight_id
+            )
+
+    def _upcoming_flights(self):
+        return Flight.objects.filter(
+            departure_time__gte=start_of_today()
+        ).select_related("route__source", "route__destination", "airplane")
+
+    def _load_all(self):
+        # Built aside and swapped in, so searches running meanwhile keep
+        # reading the previous copy.
+        catalog = FlightCatalog()
+        for flight in self._upcoming_flights():
+            catalog._add(flight)
+        self._flights = catalog._flights
+        self._by_date = catalog._by_date
+        self._by_route_date = catalog._by_route_date
+        self._routes = catalog._routes
+        self._airplanes = catalog._airplanes
+
+    def _load(self, flight_ids):
+        flights = list(self._upcoming_flights().filter(id__in=flight_ids))
+        for flight_id in flight_ids:
+            self._remove(flight_id)
+        # The route or airplane may be what changed, so the flights get
+        # fresh copies of them.
+        for flight in flights:
+            self._routes.pop(flight.route_id, None)
+            self._airplanes.pop(flight.airplane_id, None)
+        for flight in flights:
+            self._add(flight)
+
+    def _evict_departed(self):
+        today = timezone.localdate()
+        for departure_date in [d for d in self._by_date if d < today]:
+            for flight_id in list(self._by_date.pop(departure_date)):
+                entry = self._flights.pop(flight_id)
+                self._by_route_date.pop((entry.route_id, departure_date), None)
+
+    def load(self, since):
+        if since is None:
+            self._load_all()
+        else:
+            changed = set(
+                FlightChange.objects.filter(created_at__gte=since).values_list(
+                    "flight_id", flat=True
+                )
+            )
+            if None in changed:
+                self._load_all()
+            elif changed:
+                self._load(changed)
+            self._evict_departed()
+        self._fares = {}
+
+    def search(self, departure_date, route_id=None, arrival_date=None):
+        """
+        Return the flights departing on ``departure_date``, optionally
+        only on ``route_id`` and arriving on ``arrival_date``, ordered by
+        departure. Return None when the catalog doesn't cover the date.
+        """
+        if departure_date is None or departure_date < timezone.localdate():
+            return None
+        self.sync()
+        if route_id is None:
+            flights = self._by_date.get(departure_date)
+        else:
+            flights = self._by_route_date.get((route_id, departure_date))
+        flights = list(flights.values()) if flights else []
+        if arrival_date is not None:
+            flights = [
+                flight
+                for flight in flights
+                if timezone.localtime(flight.arrival_time).date()
+                == arrival_date
+            ]
+        flights.sort(key=attrgetter("departure_time", "id"))
+        return flights
+
+    def fares(self, flights):
+        """
+        Return ``{flight_id: fare}`` for flights returned by search,
+        pricing each flight once between syncs.
+        """
+        fares = self._fares
+        missing = [flight for flight in flights if flight.id not in fares]
+        if missing:
+            fares.update(price_flights(missing))
+        return {flight.id: fares[flight.id] for flight in flights}
+
+
+flight_catalog = FlightCatalog()
+
+
+def record_flight_changes(*flight_ids):
+    """
+    Make the flight catalogs reload ``flight_ids``, or every flight when
+    called without ids.
+    """
+    if settings.FLIGHT_CATALOG_ENABLED:
+        FlightChange.objects.bulk_create(
+            [FlightChange(flight_id=flight_id) for flight_id in flight_ids]
+            or [FlightChange()]
+        )
+
+
+def record_upcoming_flight_changes(*args, **kwargs):
+    """
+    Make the flight catalogs reload the flights departing today or later
+    that match the filter arguments.
+    """
+    if settings.FLIGHT_CATALOG_ENABLED:
+        flight_ids = list(
+            Flight.objects.filter(
+                *args, departure_time__gte=start_of_today(), **kwargs
+            ).values_list("id", flat=True)
+        )
+        if flight_ids:
+            record_flight_changes(*flight_ids)
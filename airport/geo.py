@@ -0,0 +1,183 @@
+"""
+Great-circle distances and nearest-airport lookups.
+
+Positions are turned into unit vectors on the sphere once. The straight
+line (chord) distance between two unit vectors grows with the
+great-circle distance, so distances are computed from chords and a
+k-d tree over the vectors answers nearest-neighbour queries without
+any trigonometry per comparison.
+"""
+import math
+import uuid
+from heapq import heappush, heapreplace
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Airport, Route
+from .pricing import invalidate_route_fares
+
+EARTH_RADIUS_KM = 6371.0088
+
+_INDEX_VERSION_KEY = "airports:index_version"
+_index = None
+
+
+def unit_vector(latitude, longitude):
+    latitude, longitude = math.radians(latitude), math.radians(longitude)
+    cos_latitude = math.cos(latitude)
+    return (
+        cos_latitude * math.cos(longitude),
+        cos_latitude * math.sin(longitude),
+        math.sin(latitude),
+    )
+
+
+def _squared_chord(first, second):
+    return (
+        (first[0] - second[0]) ** 2
+        + (first[1] - second[1]) ** 2
+        + (first[2] - second[2]) ** 2
+    )
+
+
+def chord_to_km(squared_chord):
+    chord = math.sqrt(squared_chord)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def great_circle_km(latitude1, longitude1, latitude2, longitude2):
+    return chord_to_km(
+        _squared_chord(
+            unit_vector(latitude1, longitude1),
+            unit_vector(latitude2, longitude2),
+        )
+    )
+
+
+class KDTree:
+    """Static k-d tree over 3-D points for k-nearest-neighbour queries."""
+
+    def __init__(self, points, values):
+        self._nodes = []
+        self._root = self._build(list(zip(points, values)), 0)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def _build(self, items, depth):
+        if not items:
+            return -1
+        axis = depth % 3
+        items.sort(key=lambda item: item[0][axis])
+        median = len(items) // 2
+        index = len(self._nodes)
+        self._nodes.append(None)
+        after_median = median + 1
+        left = self._build(items[:median], depth + 1)
+        right = self._build(items[after_median:], depth + 1)
+        point, value = items[median]
+        self._nodes[index] = (point, value, axis, left, right)
+        return index
+
+    def nearest(self, point, count):
+        """
+        Return ``[(squared distance, value), ...]`` of the ``count`` points
+        nearest to ``point``, nearest first.
+        """
+        # Max-heap of the best count so far, by negated squared distance.
+        heap = []
+
+        def visit(index):
+            node_point, value, axis, left, right = self._nodes[index]
+            distance = _squared_chord(point, node_point)
+            if len(heap) < count:
+                heappush(heap, (-distance, index, value))
+            elif distance < -heap[0][0]:
+                heapreplace(heap, (-distance, index, value))
+
+            offset = point[axis] - node_point[axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+            if near >= 0:
+                visit(near)
+            # The far side can only hold closer points if the splitting
+            # plane is closer than the current count-th nearest point.
+            if far >= 0 and (len(heap) < count or offset**2 < -heap[0][0]):
+                visit(far)
+
+        if count > 0 and self._root >= 0:
+            visit(self._root)
+        heap.sort(reverse=True)
+        return [(-distance, value) for distance, _, value in heap]
+
+
+def invalidate_airport_index():
+    cache.set(_INDEX_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def get_airport_index():
+    """
+    Return the k-d tree of airports with coordinates, rebuilding this
+    process's copy when any process has changed airports since.
+    """
+    global _index
+    version = cache.get(_INDEX_VERSION_KEY)
+    if version is None:
+        cache.add(_INDEX_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(_INDEX_VERSION_KEY)
+    if _index is None or _index[0] != version:
+        airports = Airport.objects.filter(
+            latitude__isnull=False, longitude__isnull=False
+        ).values_list("id", "latitude", "longitude")
+        points = []
+        ids = []
+        for airport_id, latitude, longitude in airports:
+            points.append(unit_vector(latitude, longitude))
+            ids.append(airport_id)
+        _index = version, KDTree(points, ids)
+    return _index[1]
+
+
+def nearest_airports(latitude, longitude, count):
+    """Return ``[(airport_id, distance in km), ...]``, nearest first."""
+    return [
+        (airport_id, chord_to_km(squared_chord))
+        for squared_chord, airport_id in get_airport_index().nearest(
+            unit_vector(latitude, longitude), count
+        )
+    ]
+
+
+def update_route_distances(routes, batch_size=1000):
+    """
+    Set ``distance`` of the routes whose airports have coordinates,
+    computing each airport's position once, and drop the cached fares of
+    upcoming flights on the changed routes. Returns the number updated.
+    """
+    routes = list(routes.select_related("source", "destination"))
+    positions = {}
+    for route in routes:
+        for airport in (route.source, route.destination):
+            if airport.id not in positions and airport.latitude is not None:
+                positions[airport.id] = unit_vector(
+                    airport.latitude, airport.longitude
+                )
+
+    updated = []
+    for route in routes:
+        source = positions.get(route.source_id)
+        destination = positions.get(route.destination_id)
+        if source is None or destination is None:
+            continue
+        distance = round(chord_to_km(_squared_chord(source, destination)))
+        if distance != route.distance:
+            route.distance = distance
+            updated.append(route)
+    Route.objects.bulk_update(updated, ["distance"], batch_size=batch_size)
+    if updated:
+        invalidate_route_fares(updated)
+    return len(updated)
+
+
+def routes_of(airport):
+    return Route.objects.filter(Q(source=airport) | Q(destination=airport))
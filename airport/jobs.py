@@ -0,0 +1,86 @@
+"""
+Database-backed job queue.
+
+Handlers are registered with ``@job(name)`` and enqueued by name with a
+JSON payload. ``python manage.py run_workers`` claims due jobs, runs
+them and retries failures with exponential backoff until
+``max_attempts``, after which the job is left in the ``dead`` status.
+"""
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+_handlers = {}
+
+
+def job(name):
+    def decorator(func):
+        _handlers[name] = func
+        return func
+
+    return decorator
+
+
+def enqueue(name, **payload):
+    return Job.objects.create(name=name, payload=payload)
+
+
+def enqueue_on_commit(name, **payload):
+    """Enqueue once the current transaction commits, if it does."""
+    transaction.on_commit(lambda: enqueue(name, **payload))
+
+
+def claim_jobs(limit):
+    now = timezone.now()
+    lease_expired = now - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=Job.Status.PENDING, run_after__lte=now)
+                | Q(status=Job.Status.RUNNING, updated_at__lt=lease_expired)
+            )
+            .order_by("run_after")[:limit]
+        )
+        Job.objects.filter(pk__in=[claimed.pk for claimed in jobs]).update(
+            status=Job.Status.RUNNING,
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+    for claimed in jobs:
+        claimed.status = Job.Status.RUNNING
+        claimed.attempts += 1
+    return jobs
+
+
+def run_job(claimed):
+    try:
+        _handlers[claimed.name](**claimed.payload)
+    except Exception:
+        claimed.last_error = traceback.format_exc()
+        if claimed.attempts >= claimed.max_attempts:
+            claimed.status = Job.Status.DEAD
+        else:
+            claimed.status = Job.Status.PENDING
+            claimed.run_after = timezone.now() + timedelta(
+                seconds=2**claimed.attempts
+            )
+    else:
+        claimed.status = Job.Status.DONE
+    claimed.save(
+        update_fields=["status", "run_after", "last_error", "updated_at"]
+    )
+
+
+def run_pending_jobs(limit=10):
+    """Claim and run up to ``limit`` due jobs, returning how many ran."""
+    jobs = claim_jobs(limit)
+    for claimed in jobs:
+        run_job(claimed)
+    return len(jobs)
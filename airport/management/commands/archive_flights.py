@@ -0,0 +1,50 @@
+from datetime import datetime, time
+
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+
+from airport.archive import archive_batch
+
+
+class Command(BaseCommand):
+    help = "Move flights that departed before a date into the archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            required=True,
+            help="Archive flights departing before this date (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Flights moved per transaction",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            before = datetime.strptime(options["before"], "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError("--before must be a date (YYYY-MM-DD)")
+        before = timezone.make_aware(datetime.combine(before, time.min))
+        if before > timezone.now():
+            raise CommandError("Only flights in the past can be archived")
+
+        total_flights = total_tickets = 0
+        while True:
+            flights, tickets = archive_batch(before, options["batch_size"])
+            if not flights:
+                break
+            total_flights += flights
+            total_tickets += tickets
+            if options["verbosity"] > 1:
+                self.stdout.write(
+                    f"Archived {flights} flights, {tickets} tickets"
+                )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {total_flights} flights and {total_tickets} "
+                f"tickets departing before {options['before']}"
+            )
+        )
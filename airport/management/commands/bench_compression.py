@@ -0,0 +1,173 @@
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.core.management import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from airport_api.middleware import ENCODERS
+
+CITIES = ("Kyiv", "Lviv", "Warsaw", "Berlin", "Paris", "Madrid", "Rome")
+
+
+def _time(start, hours):
+    return (start + timedelta(hours=hours)).isoformat()
+
+
+def _route(rng):
+    source, destination = rng.sample(CITIES, 2)
+    return source, destination, rng.randint(300, 3000)
+
+
+def flight_list(rng, count):
+    """Shaped like FlightListSerializer output."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    flights = []
+    for flight_id in range(1, count + 1):
+        source, destination, distance = _route(rng)
+        hours = rng.randint(0, 24 * 90)
+        flights.append(
+            {
+                "id": flight_id,
+                "route": f"Route from:{source} to {destination}; "
+                f"Distance: {distance}",
+                "airplane": f"Airplane: Boeing 737-{rng.randint(1, 40)}",
+                "departure_time": _time(start, hours),
+                "arrival_time": _time(start, hours + 3),
+                "price_from": f"{rng.uniform(50, 400):.2f}",
+            }
+        )
+    return flights
+
+
+def flight_detail(rng, seats_taken):
+    """Shaped like FlightDetailSerializer output."""
+    source, destination, distance = _route(rng)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return {
+        "id": 1,
+        "route": {
+            "id": 1,
+            "source": f"City: {source}; Airport: {source} International",
+            "destination": (
+                f"City: {destination}; Airport: {destination} International"
+            ),
+            "distance": distance,
+        },
+        "airplane": {
+            "id": 1,
+            "name": "Boeing 737-800",
+            "rows": 30,
+            "seats_in_row": 6,
+            "type": "Narrow-body",
+            "capacity": 180,
+        },
+        "departure_time": _time(start, 10),
+        "arrival_time": _time(start, 13),
+        "crew": [
+            {"id": crew_id, "first_name": "Crew", "last_name": f"M{crew_id}"}
+            for crew_id in range(1, 7)
+        ],
+        "taken_places": [
+            {"row": row, "seat": seat}
+            for row, seat in sorted(
+                rng.sample(
+                    [(r, s) for r in range(1, 31) for s in range(1, 7)],
+                    seats_taken,
+                )
+            )
+        ],
+    }
+
+
+def order_list(rng, count):
+    """Shaped like a page of OrderListSerializer output."""
+    flights = flight_list(rng, count * 2)
+    return {
+        "count": count,
+        "next": None,
+        "previous": None,
+        "results": [
+            {
+                "id": order_id,
+                "tickets": [
+                    {
+                        "id": order_id * 10 + ticket,
+                        "row": rng.randint(1, 30),
+                        "seat": rng.randint(1, 6),
+                        "flight": {
+                            key: flights[order_id + ticket][key]
+                            for key in (
+                                "id",
+                                "route",
+                                "airplane",
+                                "departure_time",
+                                "arrival_time",
+                            )
+                        },
+                        "price": f"{rng.uniform(50, 400):.2f}",
+                    }
+                    for ticket in range(rng.randint(1, 3))
+                ],
+                "created_at": _time(
+                    datetime(2023, 12, 1, tzinfo=timezone.utc), order_id
+                ),
+                "total_price": f"{rng.uniform(50, 1200):.2f}",
+                "archived_tickets": [],
+            }
+            for order_id in range(count)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Report compressed size and CPU time per available encoding for "
+        "typical API payloads"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--flights",
+            type=int,
+            default=200,
+            help="Flights in the flight list payload",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=50,
+            help="Compressions timed per payload and encoding",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        renderer = JSONRenderer()
+        payloads = {
+            "flight list": flight_list(rng, options["flights"]),
+            "flight detail": flight_detail(rng, 120),
+            "order page": order_list(rng, 10),
+        }
+
+        self.stdout.write(
+            f"{'payload':<14} {'encoding':<9} {'bytes':>9} {'ratio':>7} "
+            f"{'cpu us':>9}"
+        )
+        for name, payload in payloads.items():
+            content = renderer.render(payload)
+            self.stdout.write(
+                f"{name:<14} {'identity':<9} {len(content):>9} "
+                f"{1:>7.2f} {0:>9.0f}"
+            )
+            for encoding, (compress, _) in ENCODERS.items():
+                timings = []
+                for _ in range(options["repeat"]):
+                    start = time.process_time()
+                    compressed = compress(content)
+                    timings.append(time.process_time() - start)
+                self.stdout.write(
+                    f"{name:<14} {encoding:<9} {len(compressed):>9} "
+                    f"{len(compressed) / len(content):>7.2f} "
+                    f"{statistics.median(timings) * 1e6:>9.0f}"
+                )
@@ -0,0 +1,56 @@
+import statistics
+import time
+
+from django.core.management import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request database latency with and without "
+        "connection reuse"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--database", default="default")
+
+    def simulate_requests(self, connection, count):
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def report(self, label, timings):
+        timings.sort()
+        self.stdout.write(
+            f"{label:<12} "
+            f"mean={statistics.mean(timings):.3f}ms "
+            f"p50={timings[len(timings) // 2]:.3f}ms "
+            f"p95={timings[int(len(timings) * 0.95)]:.3f}ms"
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        configured_max_age = connection.settings_dict["CONN_MAX_AGE"]
+
+        fresh_label = (
+            "pooled" if "POOL" in connection.settings_dict else "no reuse"
+        )
+        for label, max_age in [(fresh_label, 0), ("persistent", None)]:
+            connection.close()
+            connection.settings_dict["CONN_MAX_AGE"] = max_age
+            self.report(
+                label,
+                self.simulate_requests(connection, options["requests"]),
+            )
+
+        connection.close()
+        connection.settings_dict["CONN_MAX_AGE"] = configured_max_age
@@ -0,0 +1,91 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management import BaseCommand
+
+from user.hashing import PBKDF2PasswordHasher as PooledPBKDF2PasswordHasher
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure password verification throughput of one worker process, "
+        "hashing inline on request threads vs. on the bounded pool"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=16,
+            help="Concurrent request threads in the worker",
+        )
+        parser.add_argument(
+            "--logins", type=int, default=64, help="Logins to verify"
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=settings.PASSWORD_HASH_ITERATIONS,
+            help="PBKDF2 iterations",
+        )
+
+    def run(self, hasher, options):
+        encoded = hasher.encode(
+            "password", hasher.salt(), options["iterations"]
+        )
+        latencies = []
+        other_latencies = []
+        done = threading.Event()
+
+        def login(_):
+            start = time.perf_counter()
+            hasher.verify("password", encoded)
+            latencies.append(time.perf_counter() - start)
+
+        def other_requests():
+            # A cheap request served by the same worker during the storm.
+            while not done.is_set():
+                start = time.perf_counter()
+                sum(range(20_000))
+                other_latencies.append(time.perf_counter() - start)
+                time.sleep(0.01)
+
+        other = threading.Thread(target=other_requests)
+        other.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options["threads"]) as requests:
+            list(requests.map(login, range(options["logins"])))
+        elapsed = time.perf_counter() - start
+        done.set()
+        other.join()
+        latencies.sort()
+        return (
+            options["logins"] / elapsed,
+            statistics.median(latencies),
+            latencies[int(len(latencies) * 0.95) - 1],
+            statistics.median(other_latencies),
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{options['threads']} request threads, "
+            f"{settings.PASSWORD_HASH_WORKERS} hashing threads, "
+            f"{options['iterations']} iterations"
+        )
+        self.stdout.write(
+            f"{'hasher':<8} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'other p50 ms':>13}"
+        )
+        for name, hasher in (
+            ("inline", PBKDF2PasswordHasher()),
+            ("pooled", PooledPBKDF2PasswordHasher()),
+        ):
+            throughput, p50, p95, other_p50 = self.run(hasher, options)
+            self.stdout.write(
+                f"{name:<8} {throughput:>9.1f} {p50 * 1000:>8.1f} "
+                f"{p95 * 1000:>8.1f} {other_p50 * 1000:>13.2f}"
+            )
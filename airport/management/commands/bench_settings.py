@@ -0,0 +1,118 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+# Runs in a fresh interpreter so that imports are really cold.
+BENCH_SCRIPT = """
+import json, resource, sys, time
+
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter() - start
+
+from django.db import connection, reset_queries
+from django.test import Client
+
+client = Client()
+start = time.perf_counter()
+status = client.get(sys.argv[1]).status_code
+first_request = time.perf_counter() - start
+
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+timings = []
+for _ in range(int(sys.argv[2])):
+    start = time.perf_counter()
+    client.get(sys.argv[1])
+    timings.append(time.perf_counter() - start)
+rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+print(json.dumps({
+    "status": status,
+    "setup": setup,
+    "first_request": first_request,
+    "request": sorted(timings)[len(timings) // 2],
+    "rss_growth_kb": rss_after - rss_before,
+    "recorded_queries": len(connection.queries),
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare cold start and per-request overhead of the settings "
+        "profiles"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles",
+            nargs="+",
+            default=["development", "production"],
+            help="DJANGO_ENV values to compare",
+        )
+        parser.add_argument(
+            "--path", default="/healthz/", help="Path to request"
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Requests timed per profile after the first one",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=3,
+            help="Fresh processes started per profile",
+        )
+
+    def run_profile(self, profile, options):
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "airport_api.settings",
+            "DJANGO_ENV": profile,
+            "DJANGO_ALLOWED_HOSTS": "testserver",
+            "SECRET_KEY": settings.SECRET_KEY or "bench",
+        }
+        results = []
+        for _ in range(options["runs"]):
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    BENCH_SCRIPT,
+                    options["path"],
+                    str(options["requests"]),
+                ],
+                cwd=settings.BASE_DIR,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            results.append(json.loads(output.splitlines()[-1]))
+        return {
+            key: statistics.median(result[key] for result in results)
+            for key in results[0]
+        }
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'profile':<12} {'setup ms':>9} {'1st req ms':>11} "
+            f"{'req us':>8} {'rss +KB':>8} {'queries kept':>13}"
+        )
+        for profile in options["profiles"]:
+            result = self.run_profile(profile, options)
+            self.stdout.write(
+                f"{profile:<12} {result['setup'] * 1000:>9.1f} "
+                f"{result['first_request'] * 1000:>11.1f} "
+                f"{result['request'] * 1e6:>8.0f} "
+                f"{result['rss_growth_kb']:>8.0f} "
+                f"{result['recorded_queries']:>13.0f}"
+            )
@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+
+from airport_api.schema import build_schema, load_schema
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema served at /api/doc/"
+
+    def handle(self, *args, **options):
+        path = build_schema()
+        _, etag = load_schema()
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote schema to {path} (ETag {etag})")
+        )
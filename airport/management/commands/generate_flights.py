@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from airport.models import FlightSchedule
+from airport.scheduling import generate_flights
+
+
+class Command(BaseCommand):
+    help = "Create the missing flights of recurring schedules"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Generate flights departing within this many days",
+        )
+        parser.add_argument(
+            "--schedule",
+            type=int,
+            action="append",
+            dest="schedules",
+            help="Only expand this schedule; can be repeated",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Flights inserted per query",
+        )
+
+    def handle(self, *args, **options):
+        start_date = timezone.localdate()
+        end_date = start_date + timedelta(days=options["days"])
+        schedules = FlightSchedule.objects.filter(
+            valid_from__lte=end_date, valid_until__gte=start_date
+        ).prefetch_related("crew")
+        if options["schedules"]:
+            schedules = schedules.filter(id__in=options["schedules"])
+
+        created, skipped = generate_flights(
+            schedules, start_date, end_date, options["batch_size"]
+        )
+        for schedule_id, departure_time, reason in skipped:
+            self.stderr.write(
+                f"Skipped schedule {schedule_id} at {departure_time}: "
+                f"{reason}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created} flights until {end_date}, "
+                f"skipped {len(skipped)}"
+            )
+        )
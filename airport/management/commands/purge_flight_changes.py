@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from airport.models import FlightChange
+
+
+class Command(BaseCommand):
+    help = "Delete flight changes already read by every flight catalog"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=1,
+            help="Delete changes older than this many hours",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        deleted, _ = FlightChange.objects.filter(
+            created_at__lt=cutoff
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} flight changes")
+        )
@@ -0,0 +1,51 @@
+from django.core.management import BaseCommand
+
+from airport.models import Flight
+from airport.seating import find_seats_sold_drift, tickets_sold
+
+
+class Command(BaseCommand):
+    help = "Find flights whose seats_sold doesn't match their tickets"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drift, don't repair it",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Flights checked per query",
+        )
+
+    def handle(self, *args, **options):
+        flight_ids = Flight.objects.order_by("id").values_list("id", flat=True)
+        batch_size = options["batch_size"]
+        drifted = 0
+        last_id = 0
+        while True:
+            batch = list(flight_ids.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1]
+
+            drift = find_seats_sold_drift(Flight.objects.filter(id__in=batch))
+            for flight_id, seats_sold, tickets in drift:
+                self.stdout.write(
+                    f"Flight {flight_id}: seats_sold is {seats_sold}, "
+                    f"{tickets} tickets sold"
+                )
+            if drift and not options["dry_run"]:
+                # Counted again in the UPDATE itself, so tickets sold
+                # since the check are included.
+                Flight.objects.filter(
+                    id__in=[flight_id for flight_id, _, _ in drift]
+                ).update(seats_sold=tickets_sold())
+            drifted += len(drift)
+
+        action = "Found" if options["dry_run"] else "Repaired"
+        self.stdout.write(
+            self.style.SUCCESS(f"{action} {drifted} flights with drift")
+        )
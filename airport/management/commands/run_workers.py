@@ -0,0 +1,83 @@
+import logging
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import DatabaseError, connections
+
+from airport.jobs import run_pending_jobs
+
+logger = logging.getLogger(__name__)
+
+
+def worker_loop(batch_size, poll_interval, stop_event):
+    # Finish the current batch before exiting on Ctrl+C or SIGTERM.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    while not stop_event.is_set():
+        try:
+            ran = run_pending_jobs(batch_size)
+        except DatabaseError:
+            logger.exception("Failed to claim jobs")
+            connections.close_all()
+            ran = 0
+        if not ran:
+            stop_event.wait(poll_interval)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Run background job workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=settings.JOB_WORKER_PROCESSES
+        )
+        parser.add_argument("--batch-size", type=int, default=10)
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1,
+            help="Seconds to sleep when no jobs are due",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run due jobs in this process and exit",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            total = 0
+            while ran := run_pending_jobs(options["batch_size"]):
+                total += ran
+            self.stdout.write(self.style.SUCCESS(f"Ran {total} jobs"))
+            return
+
+        # Forked workers must open their own database connections.
+        connections.close_all()
+        stop_event = multiprocessing.Event()
+        workers = [
+            multiprocessing.Process(
+                target=worker_loop,
+                args=(
+                    options["batch_size"],
+                    options["poll_interval"],
+                    stop_event,
+                ),
+            )
+            for _ in range(options["processes"])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f"Started {len(workers)} workers")
+
+        def stop(signum, frame):
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+        for worker in workers:
+            worker.join()
+        self.stdout.write(self.style.SUCCESS("Workers stopped"))
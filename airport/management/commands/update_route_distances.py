@@ -0,0 +1,28 @@
+from django.core.management import BaseCommand
+
+from airport.geo import invalidate_airport_index, update_route_distances
+from airport.models import Route
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute route distances from airport coordinates, e.g. after "
+        "a bulk import that bypassed model signals"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Routes written per UPDATE statement",
+        )
+
+    def handle(self, *args, **options):
+        updated = update_route_distances(
+            Route.objects.all(), batch_size=options["batch_size"]
+        )
+        invalidate_airport_index()
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated the distance of {updated} routes")
+        )
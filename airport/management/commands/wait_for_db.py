@@ -1,18 +1,59 @@
 import time
-from django.db import connections
-from django.db.utils import OperationalError
-from django.core.management import BaseCommand
+
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.db.utils import DatabaseError
+
+from airport_api.health import check_database
 
 
 class Command(BaseCommand):
+    help = "Wait until the database accepts connections"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Give up after this many seconds",
+        )
+        parser.add_argument(
+            "--max-delay",
+            type=float,
+            default=5,
+            help="Upper bound for the delay between attempts",
+        )
+        parser.add_argument(
+            "--check-migrations",
+            action="store_true",
+            help="Also wait until all migrations are applied",
+        )
+
     def handle(self, *args, **options):
         self.stdout.write("Waiting for database...")
-        db_conn = None
-        while not db_conn:
+        start = time.monotonic()
+        delay = 0.1
+        while True:
             try:
-                db_conn = connections["default"]
-            except OperationalError:
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+                check_database(
+                    options["database"],
+                    check_migrations=options["check_migrations"],
+                )
+                break
+            except DatabaseError as error:
+                elapsed = time.monotonic() - start
+                if elapsed + delay > options["timeout"]:
+                    raise CommandError(
+                        f"Database unavailable after {elapsed:.1f}s: {error}"
+                    )
+                self.stdout.write(
+                    f"Database unavailable, waiting {delay:.1f} seconds..."
+                )
+                time.sleep(delay)
+                delay = min(delay * 2, options["max_delay"])
 
-        self.stdout.write(self.style.SUCCESS("Database available!"))
+        elapsed = time.monotonic() - start
+        self.stdout.write(
+            self.style.SUCCESS(f"Database available after {elapsed:.2f}s!")
+        )
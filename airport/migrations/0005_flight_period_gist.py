@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def create_flight_period_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX flight_period_gist ON airport_flight "
+            "USING GIST (tstzrange(departure_time, arrival_time))"
+        )
+
+
+def drop_flight_period_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS flight_period_gist")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0004_ticket_order_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_flight_period_index, drop_flight_period_index
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 4.2.6 on 2026-10-19 02:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0010_flightschedule"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedFlight",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("departure_time", models.DateTimeField()),
+                ("arrival_time", models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArchivedTicket",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("row", models.IntegerField()),
+                ("seat", models.IntegerField()),
+                (
+                    "price",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=10, null=True
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["departure_time"], name="flight_departure_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedticket",
+            name="flight",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="tickets",
+                to="airport.archivedflight",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedticket",
+            name="order",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_tickets",
+                to="airport.order",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedflight",
+            name="airplane",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_flights",
+                to="airport.airplane",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedflight",
+            name="crew",
+            field=models.ManyToManyField(
+                related_name="archived_flights", to="airport.crew"
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedflight",
+            name="route",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_flights",
+                to="airport.route",
+            ),
+        ),
+    ]
@@ -1,11 +1,40 @@
+from datetime import timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import (
+    MaxValueValidator,
+    MinValueValidator,
+    RegexValidator,
+)
+from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
 
 
 class Airport(models.Model):
     name = models.CharField(max_length=63)
     closest_big_city = models.CharField(max_length=63)
+    iata_code = models.CharField(
+        max_length=3,
+        unique=True,
+        null=True,
+        blank=True,
+        validators=[
+            RegexValidator(r"^[A-Z]{3}$", "Must be three capital letters")
+        ],
+    )
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
 
     def __str__(self):
         return f"City: {self.closest_big_city}; Airport: {self.name}"
@@ -30,7 +59,7 @@ class Airplane(models.Model):
         return f"Airplane: {self.name}"
 
     @property
-    def capacity(self):
+    def capacity(self) -> int:
         return self.rows * self.seats_in_row
 
 
@@ -62,16 +91,97 @@ class Route(models.Model):
         unique_together = ("source", "destination")
 
 
+class FlightSchedule(models.Model):
+    """Recurring flight, expanded into Flights by generate_flights."""
+
+    # generate_flights looks for conflicts within a day of each flight.
+    MAX_DURATION = timedelta(days=1)
+
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="schedules"
+    )
+    airplane = models.ForeignKey(
+        Airplane, on_delete=models.CASCADE, related_name="schedules"
+    )
+    weekdays = models.PositiveSmallIntegerField(
+        help_text="Bit mask of operating days: Monday = 1, ..., Sunday = 64"
+    )
+    departure_time = models.TimeField(help_text="Local time in timezone")
+    duration = models.DurationField()
+    timezone = models.CharField(max_length=63, default="UTC")
+    valid_from = models.DateField()
+    valid_until = models.DateField()
+    crew = models.ManyToManyField(Crew, related_name="schedules", blank=True)
+
+    def __str__(self):
+        return (
+            f"Schedule: {self.route}; departs {self.departure_time} "
+            f"({self.valid_from} - {self.valid_until})"
+        )
+
+    def operates_on(self, date):
+        return bool(self.weekdays >> date.weekday() & 1)
+
+    def clean(self):
+        try:
+            ZoneInfo(self.timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValidationError({"timezone": "Unknown timezone"})
+        if not 0 < self.weekdays < 128:
+            raise ValidationError(
+                {"weekdays": "Select at least one day of the week"}
+            )
+        if self.valid_until < self.valid_from:
+            raise ValidationError(
+                {"valid_until": "Validity period ends before it starts"}
+            )
+        if self.duration <= timedelta():
+            raise ValidationError({"duration": "Duration must be positive"})
+        if self.duration >= self.MAX_DURATION:
+            raise ValidationError(
+                {"duration": "Flights must last less than a day"}
+            )
+
+
 class Flight(models.Model):
     route = models.ForeignKey(
         Route, on_delete=models.CASCADE, related_name="flights"
     )
     airplane = models.ForeignKey(
-        Airplane, on_delete=models.CASCADE, related_name="flights"
+        Airplane,
+        on_delete=models.CASCADE,
+        related_name="flights",
+        db_index=False,
     )
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew, related_name="flights")
+    # Tickets sold, maintained with the tickets, see
+    # airport.seating.reserve_seats.
+    seats_sold = models.PositiveIntegerField(default=0, editable=False)
+    schedule = models.ForeignKey(
+        FlightSchedule,
+        on_delete=models.SET_NULL,
+        related_name="flights",
+        null=True,
+        blank=True,
+        db_index=False,
+    )
+
+    class Meta:
+        # Lets generate_flights find the flights it already created.
+        unique_together = ("schedule", "departure_time")
+        # Each airplane's timeline, for rotation checks and utilization.
+        indexes = [
+            models.Index(
+                fields=["airplane", "departure_time"],
+                name="flight_airplane_departure_idx",
+            ),
+            # Lets archive_flights walk old flights in departure order.
+            models.Index(
+                fields=["departure_time"], name="flight_departure_idx"
+            ),
+        ]
 
     def __str__(self):
         return (
@@ -79,29 +189,71 @@ class Flight(models.Model):
             f"Time: {self.departure_time} - {self.arrival_time}"
         )
 
+    @staticmethod
+    def validate_times(departure_time, arrival_time, error_to_raise):
+        if arrival_time <= departure_time:
+            raise error_to_raise(
+                {"arrival_time": "Arrival time must be after departure time"}
+            )
+
+    def clean(self):
+        Flight.validate_times(
+            self.departure_time, self.arrival_time, ValidationError
+        )
+
 
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
+    total_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="orders",
+        db_index=False,
     )
 
+    class Meta:
+        # Also serves plain lookups by user, so the FK has no own index.
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at"],
+                name="order_user_created_idx",
+            ),
+        ]
+
 
 class Ticket(models.Model):
     row = models.IntegerField()
     seat = models.IntegerField()
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
     flight = models.ForeignKey(
-        Flight, on_delete=models.CASCADE, related_name="tickets"
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="tickets",
+        db_index=False,
     )
     order = models.ForeignKey(
-        Order, on_delete=models.CASCADE, related_name="tickets"
+        Order,
+        on_delete=models.CASCADE,
+        related_name="tickets",
+        db_index=False,
     )
 
     class Meta:
+        # Lookups by flight are served by the unique index and lookups
+        # by order by ticket_order_idx, which also covers the columns
+        # order history reads, so neither FK needs its own index.
         unique_together = ("flight", "row", "seat")
-        ordering = ["row", "seat"]
+        indexes = [
+            models.Index(
+                fields=["order", "flight", "row", "seat"],
+                name="ticket_order_idx",
+            ),
+        ]
 
     @staticmethod
     def validate_ticket(row, seat, flight, error_to_raise):
@@ -127,6 +279,25 @@ class Ticket(models.Model):
             self.flight.airplane,
             ValidationError,
         )
+        moved = (
+            self._state.adding
+            or not Ticket.objects.filter(
+                pk=self.pk, flight_id=self.flight_id
+            ).exists()
+        )
+        # The conditional update of the pre_save signal still guards
+        # against concurrent bookings, this reports a sold-out flight on
+        # forms.
+        if (
+            moved
+            and not Flight.objects.filter(
+                pk=self.flight_id,
+                seats_sold__lt=self.flight.airplane.capacity,
+            ).exists()
+        ):
+            raise ValidationError(
+                {"flight": "No free seats left on this flight."}
+            )
 
     def save(
         self,
@@ -136,6 +307,109 @@ class Ticket(models.Model):
         update_fields=None,
     ):
         self.full_clean()
-        return super(Ticket, self).save(
-            force_insert, force_update, using, update_fields
+        # Together with the seats_sold update of the pre_save signal.
+        with transaction.atomic(using=using):
+            return super(Ticket, self).save(
+                force_insert, force_update, using, update_fields
+            )
+
+
+class ArchivedFlight(models.Model):
+    """Flight moved out of the live tables by archive_flights."""
+
+    id = models.BigIntegerField(primary_key=True)
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="archived_flights"
+    )
+    airplane = models.ForeignKey(
+        Airplane, on_delete=models.CASCADE, related_name="archived_flights"
+    )
+    departure_time = models.DateTimeField()
+    arrival_time = models.DateTimeField()
+    crew = models.ManyToManyField(Crew, related_name="archived_flights")
+
+    def __str__(self):
+        return (
+            f"Route: {self.route}; "
+            f"Time: {self.departure_time} - {self.arrival_time}"
         )
+
+
+class ArchivedTicket(models.Model):
+    """Ticket of an archived flight, keeping the id it had when live."""
+
+    id = models.BigIntegerField(primary_key=True)
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+    flight = models.ForeignKey(
+        ArchivedFlight, on_delete=models.CASCADE, related_name="tickets"
+    )
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name="archived_tickets"
+    )
+
+
+class IdempotencyKey(models.Model):
+    """Response of a create request, replayed when a client retries it."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys",
+        db_index=False,
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField()
+    response_body = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ("user", "key")
+
+
+class Job(models.Model):
+    """Background job, see ``airport.jobs``."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        DONE = "done"
+        DEAD = "dead"
+
+    name = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(
+        max_length=7, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "run_after"],
+                name="job_status_run_after_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Job {self.name} #{self.id}: {self.status}"
+
+
+class FlightChange(models.Model):
+    """
+    Flight that was created, changed or deleted, read by the flight
+    catalog of each process, see ``airport.catalog``. Without a flight
+    every flight may have changed, e.g. after a route was edited.
+    """
+
+    flight_id = models.BigIntegerField(null=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
@@ -0,0 +1,190 @@
+import math
+from decimal import Decimal, ROUND_HALF_UP
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Flight
+
+BASE_FARE = Decimal("20.00")
+FARE_PER_KM = Decimal("0.08")
+
+# Seat classes from the front of the cabin: (name, share of rows up to
+# and including this class, fare multiplier).
+SEAT_CLASSES = (
+    ("first", 0.1, Decimal("4.0")),
+    ("business", 0.3, Decimal("2.5")),
+    ("economy", 1.0, Decimal("1.0")),
+)
+
+# Load factor thresholds and the multiplier applied once a flight has
+# sold at least that share of its seats.
+LOAD_BUCKETS = (
+    (0.0, Decimal("1.00")),
+    (0.5, Decimal("1.15")),
+    (0.75, Decimal("1.35")),
+    (0.9, Decimal("1.60")),
+)
+
+CENT = Decimal("0.01")
+
+
+def seat_class(row, rows):
+    for name, share, _ in SEAT_CLASSES:
+        if row <= math.ceil(rows * share):
+            return name
+    return SEAT_CLASSES[-1][0]
+
+
+def load_bucket(seats_sold, capacity):
+    load_factor = seats_sold / capacity if capacity else 1
+    bucket = 0
+    for index, (threshold, _) in enumerate(LOAD_BUCKETS):
+        if load_factor >= threshold:
+            bucket = index
+    return bucket
+
+
+def compute_fare(distance, class_name, bucket):
+    class_multiplier = next(
+        multiplier
+        for name, _, multiplier in SEAT_CLASSES
+        if name == class_name
+    )
+    fare = (
+        (BASE_FARE + FARE_PER_KM * distance)
+        * class_multiplier
+        * LOAD_BUCKETS[bucket][1]
+    )
+    return fare.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _load_key(flight_id):
+    return f"fare:load:{flight_id}"
+
+
+def _fare_key(flight_id, class_name, bucket):
+    return f"fare:{flight_id}:{class_name}:{bucket}"
+
+
+def invalidate_flight_fares(*flight_ids):
+    cache.delete_many(
+        [_load_key(flight_id) for flight_id in flight_ids]
+        + [
+            _fare_key(flight_id, name, bucket)
+            for flight_id in flight_ids
+            for name, _, _ in SEAT_CLASSES
+            for bucket in range(len(LOAD_BUCKETS))
+        ]
+    )
+
+
+def invalidate_route_fares(routes):
+    """
+    Drop the cached fares of upcoming flights on ``routes``, which follow
+    the route distance, once the transaction commits.
+    """
+    flight_ids = list(
+        Flight.objects.filter(
+            route__in=routes, departure_time__gt=timezone.now()
+        ).values_list("id", flat=True)
+    )
+    if flight_ids:
+        transaction.on_commit(partial(invalidate_flight_fares, *flight_ids))
+
+
+def get_load_buckets(flights):
+    """
+    Return ``{flight_id: load bucket}``, reading sold seats with one
+    query for the flights missing from the cache.
+    """
+    keys = {flight.id: _load_key(flight.id) for flight in flights}
+    cached = cache.get_many(keys.values())
+    buckets = {
+        flight_id: cached[key]
+        for flight_id, key in keys.items()
+        if key in cached
+    }
+
+    missing = [flight for flight in flights if flight.id not in buckets]
+    if missing:
+        # Read again rather than taken from the flights, which may be
+        # catalog snapshots or loaded before tickets were sold.
+        seats_sold = dict(
+            Flight.objects.filter(
+                id__in=[flight.id for flight in missing]
+            ).values_list("id", "seats_sold")
+        )
+        for flight in missing:
+            buckets[flight.id] = load_bucket(
+                seats_sold.get(flight.id, 0), flight.airplane.capacity
+            )
+        cache.set_many(
+            {keys[flight.id]: buckets[flight.id] for flight in missing},
+            settings.FARE_CACHE_TIMEOUT,
+        )
+    return buckets
+
+
+def _price(flight_classes, buckets):
+    """
+    Return ``{(flight_id, class_name): fare}`` for ``(flight, class_name)``
+    pairs, with one cache round trip to read and one to store.
+    """
+    keys = {
+        (flight.id, class_name): _fare_key(
+            flight.id, class_name, buckets[flight.id]
+        )
+        for flight, class_name in flight_classes
+    }
+    cached = cache.get_many(keys.values())
+
+    fares = {}
+    computed = {}
+    for flight, class_name in flight_classes:
+        key = keys[(flight.id, class_name)]
+        if key in cached:
+            fares[(flight.id, class_name)] = cached[key]
+        else:
+            fares[(flight.id, class_name)] = computed[key] = compute_fare(
+                flight.route.distance, class_name, buckets[flight.id]
+            )
+    if computed:
+        cache.set_many(computed, settings.FARE_CACHE_TIMEOUT)
+    return fares
+
+
+def price_flights(flights, class_name="economy", buckets=None):
+    """
+    Return ``{flight_id: fare}`` for a page of flights in one batch.
+
+    Flights need ``route`` and ``airplane`` loaded. ``buckets`` are the
+    load buckets from get_load_buckets, looked up when not given.
+    """
+    flights = list(flights)
+    if buckets is None:
+        buckets = get_load_buckets(flights)
+    fares = _price([(flight, class_name) for flight in flights], buckets)
+    return {flight.id: fares[(flight.id, class_name)] for flight in flights}
+
+
+def price_tickets(seats, buckets=None):
+    """
+    Return the current fares of ``(flight, row)`` seats, in order, in one
+    batch like price_flights.
+    """
+    flight_classes = [
+        (flight, seat_class(row, flight.airplane.rows))
+        for flight, row in seats
+    ]
+    if buckets is None:
+        buckets = get_load_buckets(
+            list({flight.id: flight for flight, _ in seats}.values())
+        )
+    fares = _price(flight_classes, buckets)
+    return [
+        fares[(flight.id, class_name)] for flight, class_name in flight_classes
+    ]
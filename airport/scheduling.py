@@ -0,0 +1,521 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.db import connection, transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import Func, OuterRef, Subquery
+from django.utils import timezone
+
+from .catalog import record_flight_changes
+from .models import Airplane, Crew, Flight, FlightSchedule, Route
+
+
+class TsTzRange(Func):
+    """``tstzrange(start, end)``, matching the flight_period_gist index."""
+
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+class IntervalTree:
+    """
+    Static interval tree over half-open ``(start, end, value)`` intervals.
+
+    Intervals are kept sorted by start and every node of the implicit
+    balanced tree stores the largest end in its subtree, so subtrees that
+    end before the queried interval are skipped.
+    """
+
+    def __init__(self, intervals):
+        self._intervals = sorted(intervals, key=lambda interval: interval[0])
+        self._max_end = [None] * len(self._intervals)
+        self._build(0, len(self._intervals))
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def _build(self, low, high):
+        if low >= high:
+            return None
+        middle = (low + high) // 2
+        max_end = self._intervals[middle][1]
+        for child_max_end in (
+            self._build(low, middle),
+            self._build(middle + 1, high),
+        ):
+            if child_max_end is not None and child_max_end > max_end:
+                max_end = child_max_end
+        self._max_end[middle] = max_end
+        return max_end
+
+    def overlapping(self, start, end):
+        """Return values of intervals overlapping ``[start, end)``."""
+        values = []
+        stack = [(0, len(self._intervals))]
+        while stack:
+            low, high = stack.pop()
+            if low >= high:
+                continue
+            middle = (low + high) // 2
+            if self._max_end[middle] <= start:
+                continue
+            stack.append((low, middle))
+            interval_start, interval_end, value = self._intervals[middle]
+            if interval_start < end:
+                if interval_end > start:
+                    values.append(value)
+                stack.append((middle + 1, high))
+        return values
+
+
+class Timeline:
+    """
+    Busy intervals of one resource: the existing ones in an IntervalTree
+    plus the ones added while planning, which never overlap each other
+    and so are kept in plain sorted lists.
+    """
+
+    def __init__(self, intervals=()):
+        self._tree = IntervalTree(intervals)
+        self._starts = []
+        self._ends = []
+        self._values = []
+
+    def overlapping(self, start, end):
+        values = self._tree.overlapping(start, end)
+        index = bisect_right(self._starts, start)
+        if index and self._ends[index - 1] > start:
+            values.append(self._values[index - 1])
+        while index < len(self._starts) and self._starts[index] < end:
+            values.append(self._values[index])
+            index += 1
+        return values
+
+    def add(self, start, end, value):
+        index = bisect_right(self._starts, start)
+        self._starts.insert(index, start)
+        self._ends.insert(index, end)
+        self._values.insert(index, value)
+
+
+class Rotation:
+    """
+    Flights of one airplane ordered by departure, with the airports they
+    depart from and arrive at, checked as check_airplane_rotation does:
+    a new flight must not overlap them, must depart from the airport
+    the airplane arrives at before it and arrive where it departs from
+    next. ``arrived_at`` and ``departs_from`` are the airports of the
+    flights just before and after the given ones, if any.
+    """
+
+    def __init__(self, flights=(), arrived_at=None, departs_from=None):
+        self._flights = sorted(flights, key=lambda flight: flight[0])
+        self._departures = [flight[0] for flight in self._flights]
+        self._arrived_at = arrived_at
+        self._departs_from = departs_from
+
+    def conflicts(
+        self, departure_time, arrival_time, source_id, destination_id
+    ):
+        """Return why the airplane cannot fly the flight, or None."""
+        index = bisect_left(self._departures, departure_time)
+        previous = self._flights[index - 1] if index else None
+        following = (
+            self._flights[index] if index < len(self._flights) else None
+        )
+        if (previous and previous[1] > departure_time) or (
+            following and following[0] < arrival_time
+        ):
+            return "airplane is busy"
+        arrived_at = previous[3] if previous else self._arrived_at
+        if arrived_at is not None and arrived_at != source_id:
+            return "airplane is at another airport"
+        departs_from = following[2] if following else self._departs_from
+        if departs_from is not None and departs_from != destination_id:
+            return "airplane is due at another airport"
+        return None
+
+    def add(self, departure_time, arrival_time, source_id, destination_id):
+        index = bisect_left(self._departures, departure_time)
+        self._departures.insert(index, departure_time)
+        self._flights.insert(
+            index, (departure_time, arrival_time, source_id, destination_id)
+        )
+
+
+def _id(obj):
+    return getattr(obj, "pk", obj)
+
+
+def _ids(objects):
+    return [_id(obj) for obj in objects]
+
+
+class CrewSchedule:
+    """
+    Duty intervals of a set of crew members, loaded with one query so
+    that many candidate flights can be checked against them in memory.
+    Only duties overlapping ``[start, end)`` are loaded when given.
+    """
+
+    def __init__(self, crew, exclude_flight=None, start=None, end=None):
+        intervals = defaultdict(list)
+        duties = Flight.crew.through.objects.filter(crew_id__in=_ids(crew))
+        if exclude_flight is not None:
+            duties = duties.exclude(flight_id=_id(exclude_flight))
+        if start is not None:
+            duties = duties.filter(flight__arrival_time__gt=start)
+        if end is not None:
+            duties = duties.filter(flight__departure_time__lt=end)
+        duties = duties.values_list(
+            "crew_id",
+            "flight_id",
+            "flight__departure_time",
+            "flight__arrival_time",
+        )
+        for crew_id, flight_id, departure_time, arrival_time in duties:
+            intervals[crew_id].append(
+                (departure_time, arrival_time, flight_id)
+            )
+        self._trees = {
+            crew_id: IntervalTree(crew_intervals)
+            for crew_id, crew_intervals in intervals.items()
+        }
+
+    def __len__(self):
+        return sum(len(tree) for tree in self._trees.values())
+
+    def conflicts(self, crew, departure_time, arrival_time):
+        conflicts = {}
+        for crew_id in _ids(crew):
+            tree = self._trees.get(crew_id)
+            flight_ids = (
+                tree.overlapping(departure_time, arrival_time) if tree else []
+            )
+            if flight_ids:
+                conflicts[crew_id] = sorted(flight_ids)
+        return conflicts
+
+
+def lock_duties(airplanes, crew):
+    """
+    Lock the rows of the airplanes and crew members until the end of the
+    transaction, so that concurrent writers check their flights for
+    conflicts and save them one at a time instead of both passing the
+    checks. A no-op on databases without SELECT ... FOR UPDATE.
+    """
+    list(
+        Airplane.objects.select_for_update()
+        .filter(pk__in=_ids(airplanes))
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    list(
+        Crew.objects.select_for_update()
+        .filter(pk__in=_ids(crew))
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def find_crew_conflicts(
+    crew, departure_time, arrival_time, exclude_flight=None
+):
+    """
+    Return ``{crew_id: [flight_id, ...]}`` for crew members already on
+    duty during ``[departure_time, arrival_time)``.
+    """
+    if connection.vendor != "postgresql":
+        schedule = CrewSchedule(
+            crew, exclude_flight, start=departure_time, end=arrival_time
+        )
+        return schedule.conflicts(crew, departure_time, arrival_time)
+
+    duties = (
+        Flight.crew.through.objects.filter(crew_id__in=_ids(crew))
+        .annotate(
+            period=TsTzRange("flight__departure_time", "flight__arrival_time")
+        )
+        .filter(period__overlap=DateTimeTZRange(departure_time, arrival_time))
+    )
+    if exclude_flight is not None:
+        duties = duties.exclude(flight_id=_id(exclude_flight))
+
+    conflicts = defaultdict(list)
+    for crew_id, flight_id in duties.order_by("flight_id").values_list(
+        "crew_id", "flight_id"
+    ):
+        conflicts[crew_id].append(flight_id)
+    return dict(conflicts)
+
+
+def check_airplane_rotation(
+    airplane, route, departure_time, arrival_time, exclude_flight=None
+):
+    """
+    Return errors for a flight that would double-book the airplane or
+    break its rotation, i.e. not depart from the airport the airplane
+    arrived at on its previous flight, or not arrive where its next
+    flight departs from.
+
+    Flights of one airplane never overlap, so only the flight before
+    and the flights starting during the new one can conflict; each is
+    a short range scan on flight_airplane_departure_idx.
+    """
+    flights = Flight.objects.filter(airplane_id=_id(airplane)).select_related(
+        "route"
+    )
+    if exclude_flight is not None:
+        flights = flights.exclude(pk=_id(exclude_flight))
+
+    overlapping = list(
+        flights.filter(
+            departure_time__gte=departure_time,
+            departure_time__lt=arrival_time,
+        ).values_list("id", flat=True)
+    )
+    previous = (
+        flights.filter(departure_time__lt=departure_time)
+        .order_by("-departure_time")
+        .first()
+    )
+    if previous and previous.arrival_time > departure_time:
+        overlapping.insert(0, previous.id)
+    if overlapping:
+        return [
+            f"Airplane is already assigned to overlapping flights: "
+            f"{overlapping}"
+        ]
+
+    errors = []
+    if previous and previous.route.destination_id != route.source_id:
+        errors.append(
+            f"Airplane arrives from flight {previous.id} at a different "
+            f"airport than this flight departs from"
+        )
+    following = (
+        flights.filter(departure_time__gte=arrival_time)
+        .order_by("departure_time")
+        .first()
+    )
+    if following and following.route.source_id != route.destination_id:
+        errors.append(
+            f"Flight {following.id} departs from a different airport "
+            f"than this flight arrives at"
+        )
+    return errors
+
+
+def schedule_occurrences(schedule, start_date, end_date):
+    """
+    Yield ``(departure_time, arrival_time)`` in UTC for every day the
+    schedule operates on between the dates, inclusive.
+    """
+    zone = ZoneInfo(schedule.timezone)
+    day = max(start_date, schedule.valid_from)
+    last_day = min(end_date, schedule.valid_until)
+    while day <= last_day:
+        if schedule.operates_on(day):
+            departure_time = datetime.combine(
+                day, schedule.departure_time, tzinfo=zone
+            ).astimezone(dt_timezone.utc)
+            yield departure_time, departure_time + schedule.duration
+        day += timedelta(days=1)
+
+
+def _airplane_rotations(airplane_ids, window_start, window_end):
+    flights = defaultdict(list)
+    for airplane_id, *flight in Flight.objects.filter(
+        airplane_id__in=airplane_ids,
+        departure_time__gte=window_start,
+        departure_time__lt=window_end,
+    ).values_list(
+        "airplane_id",
+        "departure_time",
+        "arrival_time",
+        "route__source_id",
+        "route__destination_id",
+    ):
+        flights[airplane_id].append(tuple(flight))
+
+    airplane_flights = Flight.objects.filter(airplane_id=OuterRef("pk"))
+    neighbours = (
+        Airplane.objects.filter(id__in=airplane_ids)
+        .annotate(
+            arrived_at=Subquery(
+                airplane_flights.filter(departure_time__lt=window_start)
+                .order_by("-departure_time")
+                .values("route__destination_id")[:1]
+            ),
+            departs_from=Subquery(
+                airplane_flights.filter(departure_time__gte=window_end)
+                .order_by("departure_time")
+                .values("route__source_id")[:1]
+            ),
+        )
+        .values_list("id", "arrived_at", "departs_from")
+    )
+    return {
+        airplane_id: Rotation(flights[airplane_id], arrived_at, departs_from)
+        for airplane_id, arrived_at, departs_from in neighbours
+    }
+
+
+def _crew_timelines(crew_ids, window_start, window_end):
+    intervals = defaultdict(list)
+    duties = Flight.crew.through.objects.filter(
+        crew_id__in=crew_ids,
+        flight__departure_time__lt=window_end,
+        flight__arrival_time__gt=window_start,
+    )
+    for crew_id, flight_id, departure_time, arrival_time in duties.values_list(
+        "crew_id",
+        "flight_id",
+        "flight__departure_time",
+        "flight__arrival_time",
+    ):
+        intervals[crew_id].append((departure_time, arrival_time, flight_id))
+    crew = defaultdict(Timeline)
+    crew.update(
+        (crew_id, Timeline(crew_intervals))
+        for crew_id, crew_intervals in intervals.items()
+    )
+    return crew
+
+
+def _plan_batch(occurrences, routes):
+    """
+    Check ``(departure_time, arrival_time, schedule)`` occurrences,
+    sorted by departure, against the flights they can conflict with and
+    each other, holding lock_duties on their airplanes and crew until
+    the caller's transaction ends. Returns ``(planned, skipped)``.
+    """
+    first_departure = occurrences[0][0]
+    # Flights last less than a day, so only flights departing within a
+    # day before the batch can reach into it.
+    window_start = first_departure - FlightSchedule.MAX_DURATION
+    window_end = max(arrival_time for _, arrival_time, _ in occurrences)
+    schedules = {schedule.id: schedule for _, _, schedule in occurrences}
+    airplane_ids = {schedule.airplane_id for schedule in schedules.values()}
+    crew_ids = {
+        member.id
+        for schedule in schedules.values()
+        for member in schedule.crew.all()
+    }
+    lock_duties(airplane_ids, crew_ids)
+    existing = set(
+        Flight.objects.filter(
+            schedule_id__in=schedules,
+            departure_time__gte=first_departure,
+            departure_time__lte=occurrences[-1][0],
+        ).values_list("schedule_id", "departure_time")
+    )
+    airplanes = _airplane_rotations(airplane_ids, window_start, window_end)
+    crew = _crew_timelines(crew_ids, window_start, window_end)
+
+    planned = []
+    skipped = []
+    for departure_time, arrival_time, schedule in occurrences:
+        key = (schedule.id, departure_time)
+        if key in existing:
+            continue
+        source_id, destination_id = routes[schedule.route_id]
+        reason = airplanes[schedule.airplane_id].conflicts(
+            departure_time, arrival_time, source_id, destination_id
+        )
+        if reason:
+            skipped.append((schedule.id, departure_time, reason))
+            continue
+        schedule_crew = [member.id for member in schedule.crew.all()]
+        busy_crew = [
+            crew_id
+            for crew_id in schedule_crew
+            if crew[crew_id].overlapping(departure_time, arrival_time)
+        ]
+        if busy_crew:
+            skipped.append(
+                (
+                    schedule.id,
+                    departure_time,
+                    f"crew members {busy_crew} are busy",
+                )
+            )
+            continue
+
+        flight = Flight(
+            route_id=schedule.route_id,
+            airplane_id=schedule.airplane_id,
+            departure_time=departure_time,
+            arrival_time=arrival_time,
+            schedule=schedule,
+        )
+        airplanes[schedule.airplane_id].add(
+            departure_time, arrival_time, source_id, destination_id
+        )
+        for crew_id in schedule_crew:
+            crew[crew_id].add(departure_time, arrival_time, key)
+        planned.append((flight, schedule_crew))
+    return planned, skipped
+
+
+def generate_flights(schedules, start_date, end_date, batch_size=1000):
+    """
+    Create the flights of ``schedules`` departing between the dates that
+    do not exist yet, with the schedule's crew. Occurrences that have
+    already departed are left out.
+
+    Occurrences that would double-book the airplane or a crew member, or
+    break the airplane's rotation as check_airplane_rotation would, are
+    skipped and returned as ``(schedule_id, departure_time, reason)``.
+    Occurrences are handled in order of departure, ``batch_size`` at a
+    time: each batch reads the flights it can conflict with using a few
+    range queries, is checked in memory and written with bulk inserts in
+    one transaction. Returns ``(created, skipped)``.
+    """
+    now = timezone.now()
+    schedules = list(schedules)
+    routes = {
+        route_id: (source_id, destination_id)
+        for route_id, source_id, destination_id in Route.objects.filter(
+            id__in={schedule.route_id for schedule in schedules}
+        ).values_list("id", "source_id", "destination_id")
+    }
+    occurrences = []
+    skipped = []
+    for schedule in schedules:
+        for departure_time, arrival_time in schedule_occurrences(
+            schedule, start_date, end_date
+        ):
+            if departure_time <= now:
+                continue
+            if schedule.duration >= FlightSchedule.MAX_DURATION:
+                skipped.append(
+                    (schedule.id, departure_time, "flight lasts a day or more")
+                )
+                continue
+            occurrences.append((departure_time, arrival_time, schedule))
+    occurrences.sort(key=lambda occurrence: (occurrence[0], occurrence[2].id))
+
+    created = 0
+    for start in range(0, len(occurrences), batch_size):
+        end = start + batch_size
+        with transaction.atomic():
+            planned, batch_skipped = _plan_batch(
+                occurrences[start:end], routes
+            )
+            Flight.objects.bulk_create([flight for flight, _ in planned])
+            Flight.crew.through.objects.bulk_create(
+                [
+                    Flight.crew.through(flight_id=flight.id, crew_id=crew_id)
+                    for flight, flight_crew in planned
+                    for crew_id in flight_crew
+                ]
+            )
+            # bulk_create sends no post_save signals.
+            record_flight_changes(*(flight.id for flight, _ in planned))
+        created += len(planned)
+        skipped.extend(batch_skipped)
+    return created, skipped
@@ -0,0 +1,153 @@
+from collections import defaultdict
+from itertools import islice
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Flight, Ticket
+
+
+class SeatMap:
+    """
+    Seat occupancy of one flight, stored as one integer bitmap per row
+    where bit ``seat - 1`` is set when the seat is taken.
+    """
+
+    __slots__ = ("flight_id", "rows", "seats_in_row", "_occupied")
+
+    def __init__(self, flight_id, rows, seats_in_row, taken=()):
+        self.flight_id = flight_id
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        self._occupied = [0] * (rows + 1)
+        for row, seat in taken:
+            self.take(row, seat)
+
+    def take(self, row, seat):
+        self._occupied[row] |= 1 << (seat - 1)
+
+    def is_taken(self, row, seat):
+        return bool(self._occupied[row] >> (seat - 1) & 1)
+
+    @property
+    def seats_left(self):
+        taken = sum(bin(occupied).count("1") for occupied in self._occupied)
+        return self.rows * self.seats_in_row - taken
+
+    def blocks(self, party_size):
+        """
+        Yield ``(row, first_seat)`` of non-overlapping runs of
+        ``party_size`` free adjacent seats, front rows first.
+        """
+        if not 1 <= party_size <= self.seats_in_row:
+            return
+        mask = (1 << party_size) - 1
+        for row in range(1, self.rows + 1):
+            occupied = self._occupied[row]
+            first = 0
+            while first + party_size <= self.seats_in_row:
+                collision = occupied & (mask << first)
+                if not collision:
+                    yield row, first + 1
+                    first += party_size
+                else:
+                    # Skip past the last taken seat inside the window.
+                    first = collision.bit_length()
+
+    def best_seats(self, party_size):
+        """
+        Return ``[(row, seat), ...]`` for a party: the front-most block
+        of adjacent seats in one row, otherwise the first free seats
+        front to back so the group stays as close as possible. Return
+        ``None`` when fewer than ``party_size`` seats are left.
+        """
+        block = next(self.blocks(party_size), None)
+        if block is not None:
+            row, first_seat = block
+            last_seat = first_seat + party_size - 1
+            return [(row, seat) for seat in range(first_seat, last_seat + 1)]
+        seats = list(islice(self.free_seats(), party_size))
+        return seats if len(seats) == party_size else None
+
+    def free_seats(self):
+        """Yield ``(row, seat)`` of every free seat, front to back."""
+        for row in range(1, self.rows + 1):
+            for seat in range(1, self.seats_in_row + 1):
+                if not self._occupied[row] >> (seat - 1) & 1:
+                    yield row, seat
+
+
+def load_seat_maps(flight_ids):
+    """
+    Return ``{flight_id: SeatMap}`` for the existing flights among
+    ``flight_ids``, reading their tickets in one query.
+
+    Occupancy always comes from the tickets rather than seats_sold, so
+    a drifted counter can't hand out taken seats.
+    """
+    flights = list(
+        Flight.objects.filter(id__in=flight_ids).values_list(
+            "id", "airplane__rows", "airplane__seats_in_row"
+        )
+    )
+
+    taken = defaultdict(list)
+    if flights:
+        tickets = Ticket.objects.filter(
+            flight_id__in=[flight[0] for flight in flights]
+        ).values_list("flight_id", "row", "seat")
+        for flight_id, row, seat in tickets:
+            taken[flight_id].append((row, seat))
+
+    return {
+        flight_id: SeatMap(flight_id, rows, seats_in_row, taken[flight_id])
+        for flight_id, rows, seats_in_row in flights
+    }
+
+
+def reserve_seats(flight, count):
+    """
+    Count ``count`` more seats as sold on ``flight`` unless fewer are
+    left. Return whether the seats were reserved.
+
+    The capacity check and the increment are one conditional UPDATE,
+    which also locks the flight row until the transaction ends.
+    """
+    return bool(
+        Flight.objects.filter(
+            pk=flight.pk, seats_sold__lte=flight.airplane.capacity - count
+        ).update(seats_sold=F("seats_sold") + count)
+    )
+
+
+def release_seats(flight_id, count):
+    """Count ``count`` fewer seats as sold on the flight."""
+    Flight.objects.filter(pk=flight_id).update(
+        seats_sold=F("seats_sold") - count
+    )
+
+
+def tickets_sold():
+    """Expression counting the tickets of the flight being queried."""
+    return Coalesce(
+        Subquery(
+            Ticket.objects.filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("id"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def find_seats_sold_drift(flights):
+    """
+    Return ``[(flight_id, seats_sold, tickets), ...]`` for the flights
+    whose seats_sold doesn't match their number of tickets.
+    """
+    return list(
+        flights.annotate(tickets_count=tickets_sold())
+        .exclude(seats_sold=F("tickets_count"))
+        .values_list("id", "seats_sold", "tickets_count")
+    )
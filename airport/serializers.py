@@ -1,8 +1,15 @@
-from django.db import transaction
+from collections import Counter
+from functools import partial
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from .models import (
+    ArchivedFlight,
+    ArchivedTicket,
     Airport,
     AirplaneType,
     Airplane,
@@ -12,12 +19,53 @@ from .models import (
     Order,
     Ticket,
 )
+from .geo import great_circle_km
+from .pricing import (
+    get_load_buckets,
+    invalidate_flight_fares,
+    price_flights,
+    price_tickets,
+)
+from .scheduling import (
+    check_airplane_rotation,
+    find_crew_conflicts,
+    lock_duties,
+)
+from .seating import load_seat_maps, reserve_seats
 
 
 class AirportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Airport
-        fields = ("id", "name", "closest_big_city")
+        fields = (
+            "id",
+            "name",
+            "closest_big_city",
+            "iata_code",
+            "latitude",
+            "longitude",
+        )
+
+
+class NearestAirportSerializer(AirportSerializer):
+    distance_km = serializers.FloatField(read_only=True)
+
+    class Meta(AirportSerializer.Meta):
+        fields = AirportSerializer.Meta.fields + ("distance_km",)
+
+
+class NearestAirportQuerySerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lon = serializers.FloatField(min_value=-180, max_value=180)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # The number of airports is ?k= on the wire and "count" in
+        # validated_data.
+        fields["k"] = serializers.IntegerField(
+            min_value=1, max_value=50, default=5, source="count"
+        )
+        return fields
 
 
 class AirplaneTypeSerializer(serializers.ModelSerializer):
@@ -40,6 +88,26 @@ class AirplaneDetailSerializer(AirplaneSerializer):
     type = AirplaneTypeSerializer()
 
 
+class AirplaneUtilizationDaySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    flights = serializers.IntegerField()
+    block_hours = serializers.FloatField()
+
+
+class AirplaneIdleGapSerializer(serializers.Serializer):
+    after_flight = serializers.IntegerField()
+    before_flight = serializers.IntegerField()
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    hours = serializers.FloatField()
+
+
+class AirplaneUtilizationSerializer(serializers.Serializer):
+    block_hours = serializers.FloatField()
+    days = AirplaneUtilizationDaySerializer(many=True)
+    idle_gaps = AirplaneIdleGapSerializer(many=True)
+
+
 class CrewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Crew
@@ -50,20 +118,47 @@ class RouteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Route
         fields = ("id", "source", "destination", "distance")
+        extra_kwargs = {"distance": {"required": False}}
 
     def validate(self, data):
-        source = data["source"]
-        destination = data["destination"]
-        distance = data["distance"]
+        source = data.get("source", getattr(self.instance, "source", None))
+        destination = data.get(
+            "destination", getattr(self.instance, "destination", None)
+        )
+
+        if source == destination:
+            raise serializers.ValidationError("Flight to the same city")
+
+        # Airports with coordinates determine the distance, anything
+        # sent by the client is ignored.
+        if None not in (
+            source.latitude,
+            source.longitude,
+            destination.latitude,
+            destination.longitude,
+        ):
+            data["distance"] = round(
+                great_circle_km(
+                    source.latitude,
+                    source.longitude,
+                    destination.latitude,
+                    destination.longitude,
+                )
+            )
+        distance = data.get(
+            "distance", getattr(self.instance, "distance", None)
+        )
+
+        if distance is None:
+            raise serializers.ValidationError(
+                {"distance": "Required unless both airports have coordinates"}
+            )
 
         if distance <= 1:
             raise serializers.ValidationError(
                 "Distance must be greater than 0"
             )
 
-        if source == destination:
-            raise serializers.ValidationError("Flight to the same city")
-
         return data
 
 
@@ -89,9 +184,31 @@ class FlightSerializer(serializers.ModelSerializer):
         fields = ("id", "route", "airplane", "departure_time", "arrival_time")
 
 
+class FlightPriceListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        flights = list(data.all() if hasattr(data, "all") else data)
+        # The flight catalog prices its flights itself.
+        fares = self.context.get("fares")
+        if fares is None:
+            fares = price_flights(flights)
+        self.child.fares = fares
+        return super().to_representation(flights)
+
+
 class FlightListSerializer(FlightSerializer):
     route = serializers.StringRelatedField(read_only=True)
     airplane = serializers.StringRelatedField(read_only=True)
+    price_from = serializers.SerializerMethodField()
+
+    class Meta(FlightSerializer.Meta):
+        fields = FlightSerializer.Meta.fields + ("price_from",)
+        list_serializer_class = FlightPriceListSerializer
+
+    def get_price_from(self, obj) -> str:
+        fares = getattr(self, "fares", None)
+        if fares is None or obj.id not in fares:
+            fares = price_flights([obj])
+        return str(fares[obj.id])
 
 
 class FlightDetailSerializer(FlightSerializer):
@@ -115,6 +232,45 @@ class FlightDetailSerializer(FlightSerializer):
         )
 
 
+class FlightLookupSerializer(serializers.Serializer):
+    route = serializers.IntegerField()
+    date = serializers.DateField()
+
+
+class FlightBatchSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list
+    )
+    lookups = FlightLookupSerializer(many=True, required=False, default=list)
+
+    def validate(self, attrs):
+        size = len(attrs["ids"]) + len(attrs["lookups"])
+        if not size:
+            raise ValidationError("Provide flight ids or lookups.")
+        if size > settings.FLIGHT_BATCH_MAX_SIZE:
+            raise ValidationError(
+                f"At most {settings.FLIGHT_BATCH_MAX_SIZE} ids and lookups "
+                f"can be resolved at once."
+            )
+        return attrs
+
+
+class SeatAvailabilitySerializer(serializers.Serializer):
+    flights = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False
+    )
+    party_size = serializers.IntegerField(min_value=1)
+    max_blocks = serializers.IntegerField(min_value=0, default=3)
+
+    def validate_flights(self, value):
+        if len(value) > settings.FLIGHT_BATCH_MAX_SIZE:
+            raise ValidationError(
+                f"At most {settings.FLIGHT_BATCH_MAX_SIZE} flights "
+                f"can be checked at once."
+            )
+        return value
+
+
 class FlightCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Flight
@@ -127,8 +283,59 @@ class FlightCreateSerializer(serializers.ModelSerializer):
             "crew",
         )
 
+    def _get_value(self, attrs, field_name):
+        if field_name in attrs:
+            return attrs[field_name]
+        if field_name == "crew":
+            return self.instance.crew.all() if self.instance else []
+        return getattr(self.instance, field_name)
+
+    def validate(self, attrs):
+        data = super(FlightCreateSerializer, self).validate(attrs=attrs)
+        departure_time = self._get_value(attrs, "departure_time")
+        arrival_time = self._get_value(attrs, "arrival_time")
+        Flight.validate_times(departure_time, arrival_time, ValidationError)
+
+        # FlightViewSet validates and saves in one transaction.
+        lock_duties(
+            [self._get_value(attrs, "airplane")],
+            self._get_value(attrs, "crew"),
+        )
+        rotation_errors = check_airplane_rotation(
+            self._get_value(attrs, "airplane"),
+            self._get_value(attrs, "route"),
+            departure_time,
+            arrival_time,
+            exclude_flight=self.instance,
+        )
+        if rotation_errors:
+            raise ValidationError({"airplane": rotation_errors})
+
+        conflicts = find_crew_conflicts(
+            self._get_value(attrs, "crew"),
+            departure_time,
+            arrival_time,
+            exclude_flight=self.instance,
+        )
+        if conflicts:
+            raise ValidationError(
+                {
+                    "crew": [
+                        f"Crew member {crew_id} is already assigned to "
+                        f"overlapping flights: {flight_ids}"
+                        for crew_id, flight_ids in conflicts.items()
+                    ]
+                }
+            )
+        return data
+
 
 class TicketSerializer(serializers.ModelSerializer):
+    # Validation and pricing read the route and airplane.
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("route", "airplane")
+    )
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
         Ticket.validate_ticket(
@@ -141,21 +348,38 @@ class TicketSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Ticket
-        fields = ("id", "row", "seat", "flight")
+        fields = ("id", "row", "seat", "flight", "price")
+        read_only_fields = ("price",)
 
 
 class TicketListSerializer(TicketSerializer):
     flight = FlightSerializer(many=False, read_only=True)
 
 
+class AutoAssignSerializer(serializers.Serializer):
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("route", "airplane")
+    )
+    party_size = serializers.IntegerField(min_value=1)
+
+
 class OrderSerializer(serializers.ModelSerializer):
-    tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
+    tickets = TicketSerializer(
+        many=True, read_only=False, allow_empty=False, required=False
+    )
+    auto_assign = AutoAssignSerializer(write_only=True, required=False)
 
     class Meta:
         model = Order
-        fields = ("id", "tickets", "created_at")
+        fields = ("id", "tickets", "auto_assign", "created_at", "total_price")
+        read_only_fields = ("total_price",)
 
     def validate(self, data):
+        if ("tickets" in data) == ("auto_assign" in data):
+            raise ValidationError(
+                "Provide either tickets or auto_assign, not both."
+            )
+
         tickets_data = data.get("tickets", [])
         ticket_set = set()
         for ticket_data in tickets_data:
@@ -169,14 +393,120 @@ class OrderSerializer(serializers.ModelSerializer):
             ticket_set.add(ticket)
         return data
 
+    @staticmethod
+    def assign_seats(flight, party_size):
+        """Pick seats for the party from the flight's current occupancy."""
+        # reserve_seats locked the flight, so concurrent group bookings
+        # on it are serialized and never pick the same seats.
+        error = ValidationError(
+            {"auto_assign": "Not enough free seats on this flight."}
+        )
+        if not reserve_seats(flight, party_size):
+            raise error
+        # The seat map reads the tickets, which may disagree with a
+        # drifted seats_sold.
+        seats = load_seat_maps([flight.pk])[flight.pk].best_seats(party_size)
+        if seats is None:
+            raise error
+        return [
+            {"row": row, "seat": seat, "flight": flight} for row, seat in seats
+        ]
+
+    @staticmethod
+    def reserve_tickets(tickets_data):
+        seats = Counter(ticket_data["flight"] for ticket_data in tickets_data)
+        # In id order, so concurrent orders lock flights in the same
+        # order and can't deadlock.
+        for flight in sorted(seats, key=attrgetter("pk")):
+            if not reserve_seats(flight, seats[flight]):
+                raise ValidationError(
+                    {
+                        "tickets": "Not enough free seats on flight "
+                        f"{flight.pk}."
+                    }
+                )
+
     def create(self, validated_data):
         with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
+            auto_assign = validated_data.pop("auto_assign", None)
+            tickets_data = validated_data.pop("tickets", None)
+            # Fares follow the load before this order's seats are sold.
+            load_buckets = get_load_buckets(
+                [auto_assign["flight"]]
+                if auto_assign
+                else [ticket_data["flight"] for ticket_data in tickets_data]
+            )
+            if auto_assign:
+                tickets_data = self.assign_seats(**auto_assign)
+            else:
+                self.reserve_tickets(tickets_data)
             order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+            prices = price_tickets(
+                [
+                    (ticket_data["flight"], ticket_data["row"])
+                    for ticket_data in tickets_data
+                ],
+                load_buckets,
+            )
+            tickets = [
+                Ticket(order=order, price=price, **ticket_data)
+                for ticket_data, price in zip(tickets_data, prices)
+            ]
+            # Inserted without Ticket.save, whose signals would count the
+            # seats reserved above again.
+            try:
+                Ticket.objects.bulk_create(tickets)
+            except IntegrityError:
+                raise ValidationError(
+                    {"tickets": "Some of the seats were just taken."}
+                )
+            for flight_id in {ticket.flight_id for ticket in tickets}:
+                transaction.on_commit(
+                    partial(invalidate_flight_fares, flight_id)
+                )
+            order.total_price = sum(ticket.price for ticket in tickets)
+            order.save(update_fields=["total_price"])
             return order
 
 
+class ArchivedFlightSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedFlight
+        fields = FlightSerializer.Meta.fields
+
+
+class ArchivedTicketListSerializer(serializers.ModelSerializer):
+    flight = ArchivedFlightSerializer(read_only=True)
+
+    class Meta:
+        model = ArchivedTicket
+        fields = TicketSerializer.Meta.fields
+
+
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+    archived_tickets = ArchivedTicketListSerializer(many=True, read_only=True)
+
+    class Meta(OrderSerializer.Meta):
+        fields = OrderSerializer.Meta.fields + ("archived_tickets",)
+
+
+class OrderSummarySerializer(serializers.ModelSerializer):
+    tickets_count = serializers.IntegerField(read_only=True)
+    flights = serializers.ListField(
+        child=serializers.IntegerField(), read_only=True
+    )
+    first_departure = serializers.DateTimeField(read_only=True)
+    last_arrival = serializers.DateTimeField(read_only=True)
+
+    class Meta:
+        model = Order
+        fields = (
+            "id",
+            "created_at",
+            "total_price",
+            "tickets_count",
+            "flights",
+            "first_departure",
+            "last_arrival",
+        )
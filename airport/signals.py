@@ -0,0 +1,108 @@
+from functools import partial
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .catalog import (
+    record_flight_changes,
+    record_upcoming_flight_changes,
+    start_of_today,
+)
+from .geo import invalidate_airport_index, routes_of, update_route_distances
+from .models import Airplane, Airport, Flight, Route, Ticket
+from .pricing import invalidate_flight_fares, invalidate_route_fares
+from .seating import release_seats, reserve_seats
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def invalidate_fares_on_ticket_change(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_flight_fares(instance.flight_id))
+
+
+@receiver(pre_save, sender=Ticket)
+def count_ticket_sold(sender, instance, raw=False, **kwargs):
+    # Orders reserve their seats in OrderSerializer.create and insert
+    # tickets without signals, this counts tickets saved otherwise.
+    # Ticket.save is atomic, so a failed insert gives the seat back.
+    if raw:
+        return
+    previous_flight_id = None
+    if not instance._state.adding:
+        previous_flight_id = (
+            Ticket.objects.filter(pk=instance.pk)
+            .values_list("flight_id", flat=True)
+            .first()
+        )
+        if previous_flight_id == instance.flight_id:
+            return
+    if not reserve_seats(instance.flight, 1):
+        raise ValidationError({"flight": "No free seats left on this flight."})
+    if previous_flight_id is not None:
+        release_seats(previous_flight_id, 1)
+        transaction.on_commit(
+            partial(invalidate_flight_fares, previous_flight_id)
+        )
+
+
+@receiver(post_delete, sender=Ticket)
+def count_ticket_refunded(sender, instance, **kwargs):
+    release_seats(instance.flight_id, 1)
+
+
+@receiver(post_save, sender=Route)
+def invalidate_fares_on_route_change(
+    sender, instance, created=False, raw=False, **kwargs
+):
+    if not created and not raw:
+        invalidate_route_fares([instance])
+
+
+@receiver(post_save, sender=Airport)
+def update_routes_on_airport_change(sender, instance, raw=False, **kwargs):
+    if not raw and instance.latitude is not None:
+        update_route_distances(routes_of(instance))
+    transaction.on_commit(invalidate_airport_index)
+
+
+@receiver(post_delete, sender=Airport)
+def invalidate_index_on_airport_delete(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_airport_index)
+
+
+@receiver(post_save, sender=Flight)
+def record_flight_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_flight_changes(instance.id)
+
+
+@receiver(post_delete, sender=Flight)
+def record_flight_deletion(sender, instance, **kwargs):
+    # Catalogs only hold flights departing today or later, so deleting
+    # older flights, e.g. when archiving, changes nothing for them.
+    if instance.departure_time >= start_of_today():
+        record_flight_changes(instance.id)
+
+
+# Flights show routes and airplanes by name.
+@receiver(post_save, sender=Airport)
+def record_airport_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_upcoming_flight_changes(
+            Q(route__source=instance) | Q(route__destination=instance)
+        )
+
+
+@receiver(post_save, sender=Airplane)
+def record_airplane_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_upcoming_flight_changes(airplane=instance)
+
+
+@receiver(post_save, sender=Route)
+def record_route_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_upcoming_flight_changes(route=instance)
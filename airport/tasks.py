@@ -0,0 +1,23 @@
+from django.core.mail import send_mail
+
+from .jobs import job
+from .models import Order
+
+
+@job("send_order_confirmation")
+def send_order_confirmation(order_id):
+    order = Order.objects.select_related("user").get(id=order_id)
+    tickets = order.tickets.select_related(
+        "flight__route__source", "flight__route__destination"
+    ).order_by("flight__departure_time", "row", "seat")
+    lines = [
+        f"{ticket.flight.route}, departs {ticket.flight.departure_time}: "
+        f"row {ticket.row}, seat {ticket.seat}"
+        for ticket in tickets
+    ]
+    send_mail(
+        f"Order #{order.id} confirmed",
+        "\n".join(lines + [f"Total: {order.total_price}"]),
+        None,
+        [order.user.email],
+    )
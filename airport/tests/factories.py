@@ -0,0 +1,130 @@
+"""
+Bulk factories for large fixtures.
+
+Every model is inserted with one bulk_create per call, so thousands of
+flights take a handful of queries. Names and emails are numbered from
+a per-process counter to stay unique across calls.
+"""
+import itertools
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from airport.models import (
+    Airport,
+    AirplaneType,
+    Airplane,
+    Crew,
+    Route,
+    Flight,
+    Order,
+    Ticket,
+)
+
+_numbers = itertools.count(1)
+
+
+def create_airports(count):
+    return Airport.objects.bulk_create(
+        Airport(
+            name=f"Airport {number}",
+            closest_big_city=f"City {number}",
+        )
+        for number in itertools.islice(_numbers, count)
+    )
+
+
+def create_routes(count, distance=100):
+    """Create ``count`` routes along a chain of new airports."""
+    airports = create_airports(count + 1)
+    return Route.objects.bulk_create(
+        Route(source=source, destination=destination, distance=distance)
+        for source, destination in zip(airports, airports[1:])
+    )
+
+
+def create_airplanes(count, rows=10, seats_in_row=10):
+    airplane_type = AirplaneType.objects.create(name=f"Type {next(_numbers)}")
+    return Airplane.objects.bulk_create(
+        Airplane(
+            name=f"Plane {number}",
+            rows=rows,
+            seats_in_row=seats_in_row,
+            type=airplane_type,
+        )
+        for number in itertools.islice(_numbers, count)
+    )
+
+
+def create_flights(
+    count,
+    routes=None,
+    airplanes=None,
+    start=None,
+    spacing=timedelta(hours=1),
+    duration=timedelta(hours=1),
+    crew=(),
+):
+    """
+    Create ``count`` flights departing every ``spacing`` from ``start``
+    (now by default), cycling through ``routes`` and ``airplanes``.
+    Without them, each flight gets its own route and airplane.
+    """
+    routes = routes or create_routes(count)
+    airplanes = airplanes or create_airplanes(count)
+    start = start or timezone.now()
+    flights = Flight.objects.bulk_create(
+        Flight(
+            route=route,
+            airplane=airplane,
+            departure_time=start + spacing * index,
+            arrival_time=start + spacing * index + duration,
+        )
+        for index, route, airplane in zip(
+            range(count), itertools.cycle(routes), itertools.cycle(airplanes)
+        )
+    )
+    Flight.crew.through.objects.bulk_create(
+        Flight.crew.through(flight=flight, crew=member)
+        for flight in flights
+        for member in crew
+    )
+    return flights
+
+
+def create_crew(count):
+    return Crew.objects.bulk_create(
+        Crew(first_name="Crew", last_name=f"Member {number}")
+        for number in itertools.islice(_numbers, count)
+    )
+
+
+def create_user(**params):
+    number = next(_numbers)
+    return get_user_model().objects.create_user(
+        params.pop("email", f"user{number}@test.com"),
+        params.pop("password", "test_password"),
+        **params,
+    )
+
+
+def create_orders(flights, tickets_per_order=1, user=None):
+    """
+    Create one order per flight holding ``tickets_per_order`` tickets
+    in its first rows, and count them in the flights' seats_sold.
+    """
+    user = user or create_user()
+    orders = Order.objects.bulk_create(Order(user=user) for _ in flights)
+    tickets = []
+    for flight, order in zip(flights, orders):
+        seats_in_row = flight.airplane.seats_in_row
+        for index in range(tickets_per_order):
+            row, seat = divmod(index, seats_in_row)
+            tickets.append(
+                Ticket(flight=flight, order=order, row=row + 1, seat=seat + 1)
+            )
+        flight.seats_sold += tickets_per_order
+    Ticket.objects.bulk_create(tickets)
+    Flight.objects.bulk_update(flights, ["seats_sold"], batch_size=1000)
+    return orders
@@ -0,0 +1,140 @@
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from airport.admin import SeatTaken
+from airport.models import Flight, Order, Ticket
+from airport.tests.factories import (
+    create_airplanes,
+    create_crew,
+    create_flights,
+    create_orders,
+)
+from airport.tests.test_airport_api import sample_airplane, sample_flight
+
+
+def create_rows(count):
+    """Bulk-create ``count`` tickets on flights with distinct routes."""
+    flights = create_flights(count, crew=create_crew(1))
+    create_orders(flights)
+
+
+class AdminQueryCountTests(TestCase):
+    """
+    Changelists and change forms must not issue queries per row or per
+    related object, so their query count is the same for a handful of
+    rows as for more rows than fit on a page.
+    """
+
+    url_names = (
+        "admin:airport_route_changelist",
+        "admin:airport_flight_changelist",
+        "admin:airport_order_changelist",
+        "admin:airport_ticket_changelist",
+        "admin:airport_ticket_add",
+        "admin:airport_flight_add",
+    )
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "test_password"
+        )
+        self.client.force_login(self.admin)
+
+    def count_queries(self, url):
+        # Warm up per-process caches such as ContentType lookups.
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        create_rows(5)
+        few = {
+            name: self.count_queries(reverse(name)) for name in self.url_names
+        }
+
+        create_rows(250)
+        many = {
+            name: self.count_queries(reverse(name)) for name in self.url_names
+        }
+
+        self.assertEqual(many, few)
+
+    def test_flight_airplane_filter_lists_only_airplanes_with_flights(self):
+        flights = create_flights(2)
+        create_airplanes(1)
+
+        response = self.client.get(reverse("admin:airport_flight_changelist"))
+
+        airplane_filter = next(
+            spec
+            for spec in response.context["cl"].filter_specs
+            if spec.field_path == "airplane"
+        )
+        self.assertEqual(
+            sorted(pk for pk, _ in airplane_filter.lookup_choices),
+            sorted(flight.airplane_id for flight in flights),
+        )
+
+
+class TicketAdminTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "test_password"
+        )
+        self.client.force_login(self.admin)
+        self.flight = sample_flight(
+            airplane=sample_airplane(rows=1, seats_in_row=1)
+        )
+        self.order = Order.objects.create(user=self.admin)
+
+    def add_ticket(self):
+        return self.client.post(
+            reverse("admin:airport_ticket_add"),
+            {
+                "row": 1,
+                "seat": 1,
+                "flight": self.flight.id,
+                "order": self.order.id,
+            },
+        )
+
+    def assert_sold_out(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context["adminform"].form.errors["flight"],
+            ["No free seats left on this flight."],
+        )
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_sold_out_flight_is_a_form_error(self):
+        Flight.objects.filter(id=self.flight.id).update(seats_sold=1)
+
+        self.assert_sold_out(self.add_ticket())
+
+    def test_seat_taken_while_saving_is_a_form_error(self):
+        changeform_view = admin.ModelAdmin.changeform_view
+
+        def book_last_seat(*args, **kwargs):
+            try:
+                return changeform_view(*args, **kwargs)
+            except SeatTaken:
+                # Another booking committed while the save was rolled back.
+                Flight.objects.filter(id=self.flight.id).update(seats_sold=1)
+                raise
+
+        with mock.patch(
+            "airport.signals.reserve_seats", return_value=False
+        ), mock.patch.object(
+            admin.ModelAdmin, "changeform_view", book_last_seat
+        ):
+            response = self.add_ticket()
+
+        self.assert_sold_out(response)
@@ -1,4 +1,5 @@
 from datetime import timedelta
+from itertools import count
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
@@ -16,6 +17,8 @@ from airport.models import (
     Crew,
     Route,
     Flight,
+    Order,
+    Ticket,
 )
 from airport.serializers import (
     FlightListSerializer,
@@ -25,6 +28,7 @@ from airport.serializers import (
 FLIGHT_LIST_URL = reverse("airport:flight-list")
 ORDER_LIST_URL = reverse("airport:order-list")
 ROUTE_LIST_URL = reverse("airport:route-list")
+ORDER_SUMMARY_URL = reverse("airport:order-summary")
 
 
 def sample_airport(**params):
@@ -37,10 +41,12 @@ def sample_airport(**params):
     return Airport.objects.create(**defaults)
 
 
+_airplane_type_numbers = count(1)
+
+
 def sample_airplane_type(**params):
-    id = AirplaneType.objects.count() + 1
     defaults = {
-        "name": f"airplane_type #{id}",
+        "name": f"airplane_type #{next(_airplane_type_numbers)}",
     }
     defaults.update(params)
 
@@ -163,6 +169,23 @@ class AuthenticatedAirportApiTests(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_order_list_orders_tickets_by_seat(self):
+        order = Order.objects.create(user=self.user)
+        for row, seat in ((2, 1), (1, 2), (1, 1)):
+            Ticket.objects.create(
+                row=row, seat=seat, flight=self.flight, order=order
+            )
+
+        response = self.client.get(ORDER_LIST_URL)
+
+        self.assertEqual(
+            [
+                (ticket["row"], ticket["seat"])
+                for ticket in response.data["results"][0]["tickets"]
+            ],
+            [(1, 1), (1, 2), (2, 1)],
+        )
+
     def test_create_invalid_order_must_be_validated(self):
         payload = {
             "tickets": [
@@ -199,3 +222,67 @@ class AdminAirportApiTests(TestCase):
         response = self.client.post(ROUTE_LIST_URL, payload)
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class OrderSummaryApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_password",
+        )
+        self.client.force_authenticate(self.user)
+
+        self.past_flight = sample_flight(
+            departure_time=timezone.now() - timedelta(days=2),
+            arrival_time=timezone.now() - timedelta(days=2, hours=-2),
+        )
+        self.upcoming_flight = sample_flight()
+
+        self.past_order = Order.objects.create(user=self.user)
+        for seat in (1, 2):
+            Ticket.objects.create(
+                row=1,
+                seat=seat,
+                flight=self.past_flight,
+                order=self.past_order,
+            )
+        self.mixed_order = Order.objects.create(user=self.user)
+        for flight in (self.past_flight, self.upcoming_flight):
+            Ticket.objects.create(
+                row=2, seat=1, flight=flight, order=self.mixed_order
+            )
+
+    def test_order_summary(self):
+        response = self.client.get(ORDER_SUMMARY_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = {order["id"]: order for order in response.data["results"]}
+        self.assertEqual(results[self.past_order.id]["tickets_count"], 2)
+        self.assertEqual(
+            results[self.past_order.id]["flights"], [self.past_flight.id]
+        )
+        self.assertEqual(
+            results[self.mixed_order.id]["flights"],
+            sorted([self.past_flight.id, self.upcoming_flight.id]),
+        )
+
+    def test_order_summary_upcoming(self):
+        response = self.client.get(ORDER_SUMMARY_URL, {"upcoming": "true"})
+
+        self.assertEqual(
+            [order["id"] for order in response.data["results"]],
+            [self.mixed_order.id],
+        )
+        self.assertEqual(response.data["results"][0]["tickets_count"], 2)
+
+    def test_order_summary_excludes_other_users(self):
+        other_user = get_user_model().objects.create_user(
+            "other@test.com",
+            "test_password",
+        )
+        self.client.force_authenticate(other_user)
+
+        response = self.client.get(ORDER_SUMMARY_URL)
+
+        self.assertEqual(response.data["results"], [])
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.test import APIClient
+
+from airport.models import (
+    ArchivedFlight,
+    ArchivedTicket,
+    Flight,
+    Order,
+    Ticket,
+)
+from airport.tests.test_airport_api import (
+    FLIGHT_LIST_URL,
+    ORDER_LIST_URL,
+    ORDER_SUMMARY_URL,
+    sample_crew,
+    sample_flight,
+)
+
+
+class ArchiveFlightsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com", "test_password"
+        )
+        self.client.force_authenticate(self.user)
+
+        now = timezone.now()
+        self.crew = sample_crew()
+        self.old_flights = [
+            sample_flight(
+                departure_time=now - timedelta(days=days),
+                arrival_time=now - timedelta(days=days, hours=-2),
+            )
+            for days in (40, 50)
+        ]
+        self.old_flights[0].crew.add(self.crew)
+        self.flight = sample_flight()
+
+        self.order = Order.objects.create(user=self.user)
+        self.old_ticket = Ticket.objects.create(
+            order=self.order, flight=self.old_flights[0], row=1, seat=1
+        )
+        self.ticket = Ticket.objects.create(
+            order=self.order, flight=self.flight, row=1, seat=1
+        )
+
+    def archive(self, *args):
+        before = (timezone.localdate() - timedelta(days=30)).isoformat()
+        out = StringIO()
+        call_command("archive_flights", "--before", before, *args, stdout=out)
+        return out.getvalue()
+
+    def test_moves_old_flights_with_crew_and_tickets(self):
+        out = self.archive("--batch-size", "1")
+
+        self.assertIn("Archived 2 flights and 1 tickets", out)
+        self.assertEqual(list(Flight.objects.all()), [self.flight])
+        self.assertEqual(list(Ticket.objects.all()), [self.ticket])
+
+        archived = ArchivedFlight.objects.get(id=self.old_flights[0].id)
+        self.assertEqual(
+            archived.departure_time, self.old_flights[0].departure_time
+        )
+        self.assertEqual(list(archived.crew.all()), [self.crew])
+        archived_ticket = ArchivedTicket.objects.get(id=self.old_ticket.id)
+        self.assertEqual(archived_ticket.order, self.order)
+        self.assertEqual(archived_ticket.flight, archived)
+
+        self.assertIn("Archived 0 flights", self.archive())
+
+    def test_read_endpoints_skip_archive_but_order_history_keeps_it(self):
+        self.archive()
+
+        flights = self.client.get(FLIGHT_LIST_URL).data
+        self.assertEqual(
+            [flight["id"] for flight in flights], [self.flight.id]
+        )
+
+        order = self.client.get(ORDER_LIST_URL).data["results"][0]
+        self.assertEqual(
+            [ticket["id"] for ticket in order["tickets"]], [self.ticket.id]
+        )
+        self.assertEqual(
+            [ticket["id"] for ticket in order["archived_tickets"]],
+            [self.old_ticket.id],
+        )
+        self.assertEqual(
+            order["archived_tickets"][0]["flight"]["id"],
+            self.old_flights[0].id,
+        )
+
+    def test_order_summary_counts_archived_tickets(self):
+        self.archive()
+
+        summary = self.client.get(ORDER_SUMMARY_URL).data["results"][0]
+        self.assertEqual(summary["tickets_count"], 2)
+        self.assertEqual(
+            summary["flights"],
+            sorted([self.old_flights[0].id, self.flight.id]),
+        )
+        self.assertEqual(
+            parse_datetime(summary["first_departure"]),
+            self.old_flights[0].departure_time,
+        )
+        self.assertEqual(
+            parse_datetime(summary["last_arrival"]), self.flight.arrival_time
+        )
+
+    def test_refuses_future_dates(self):
+        tomorrow = (timezone.localdate() + timedelta(days=1)).isoformat()
+
+        with self.assertRaises(CommandError):
+            call_command("archive_flights", "--before", tomorrow)
@@ -0,0 +1,159 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airport.catalog import flight_catalog
+from airport.models import FlightChange
+from airport.tests.test_airport_api import (
+    FLIGHT_LIST_URL,
+    sample_airplane,
+    sample_flight,
+    sample_route,
+)
+
+
+@override_settings(
+    FLIGHT_CATALOG_ENABLED=True, FLIGHT_CATALOG_MAX_STALENESS=3600
+)
+class FlightCatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        flight_catalog.reset()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "user@test.com", "test_password"
+            )
+        )
+        self.route = sample_route()
+        self.airplane = sample_airplane()
+        departure = timezone.now() + timedelta(days=2)
+        self.flights = [
+            sample_flight(
+                route=route,
+                airplane=self.airplane,
+                departure_time=departure + timedelta(hours=hours),
+                arrival_time=departure + timedelta(hours=hours + 2),
+            )
+            for route, hours in (
+                (self.route, 3),
+                (self.route, 1),
+                (sample_route(distance=500), 2),
+            )
+        ]
+        self.date = timezone.localtime(departure).date().isoformat()
+
+    def search(self, **params):
+        response = self.client.get(FLIGHT_LIST_URL, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_matches_database(self):
+        for params in (
+            {"departure_time": self.date},
+            {"departure_time": self.date, "route": self.route.id},
+        ):
+            from_catalog = self.search(**params)
+            with override_settings(FLIGHT_CATALOG_ENABLED=False):
+                from_database = self.search(**params)
+            self.assertEqual(
+                from_catalog,
+                sorted(from_database, key=lambda f: f["departure_time"]),
+            )
+        self.assertEqual(
+            [flight["id"] for flight in from_catalog],
+            [self.flights[1].id, self.flights[0].id],
+        )
+
+    def test_search_without_queries(self):
+        self.search(departure_time=self.date)
+
+        with self.assertNumQueries(0):
+            self.search(departure_time=self.date)
+
+    def test_changes_applied_on_sync(self):
+        self.search(departure_time=self.date)
+        self.assertEqual(
+            FlightChange.objects.filter(flight_id__isnull=False).count(), 3
+        )
+
+        added = sample_flight(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time=self.flights[0].departure_time,
+            arrival_time=self.flights[0].arrival_time,
+        )
+        self.flights[1].departure_time += timedelta(days=1)
+        self.flights[1].arrival_time += timedelta(days=1)
+        self.flights[1].save()
+        self.flights[2].delete()
+
+        # Within the staleness bound the previous copy is served.
+        self.assertEqual(len(self.search(departure_time=self.date)), 3)
+
+        flight_catalog.sync(force=True)
+        self.assertEqual(
+            sorted(f["id"] for f in self.search(departure_time=self.date)),
+            sorted([self.flights[0].id, added.id]),
+        )
+
+    def test_search_prices_flights_once_between_syncs(self):
+        first = self.search(departure_time=self.date)
+
+        with mock.patch("airport.catalog.price_flights") as price_flights:
+            self.assertEqual(self.search(departure_time=self.date), first)
+        price_flights.assert_not_called()
+
+    def changed_flight_ids(self):
+        return set(
+            FlightChange.objects.filter(
+                created_at__gte=self.changes_since
+            ).values_list("flight_id", flat=True)
+        )
+
+    def test_route_change_reloads_its_flights(self):
+        self.search(departure_time=self.date)
+        self.changes_since = timezone.now()
+        self.route.distance = 4321
+        self.route.save()
+
+        self.assertEqual(
+            self.changed_flight_ids(), {self.flights[0].id, self.flights[1].id}
+        )
+        flight_catalog.sync(force=True)
+        for flight in self.search(departure_time=self.date):
+            self.assertEqual(
+                "Distance: 4321" in flight["route"],
+                flight["id"] != self.flights[2].id,
+            )
+
+    def test_airport_and_airplane_changes_reload_their_flights(self):
+        self.changes_since = timezone.now()
+        airport = self.route.source
+        airport.name = "Renamed"
+        airport.save()
+
+        self.assertEqual(
+            self.changed_flight_ids(), {self.flights[0].id, self.flights[1].id}
+        )
+
+        self.changes_since = timezone.now()
+        sample_airplane().save()
+        self.assertEqual(self.changed_flight_ids(), set())
+        self.airplane.save()
+        self.assertEqual(
+            self.changed_flight_ids(), {flight.id for flight in self.flights}
+        )
+
+    def test_past_dates_and_unfiltered_lists_use_database(self):
+        yesterday = timezone.localdate() - timedelta(days=1)
+
+        self.search(departure_time=yesterday.isoformat())
+        self.assertEqual(len(self.search()), 3)
+
+        self.assertEqual(len(flight_catalog), 0)
@@ -0,0 +1,105 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight, Order, Ticket
+from airport.tests.test_airport_api import sample_flight
+from airport_api.db.routers import (
+    ReplicaRouter,
+    database_routing,
+    is_pinned_to_primary,
+    route_reads_to_replica,
+)
+
+FLIGHT_LIST_URL = reverse("airport:flight-list")
+ORDER_LIST_URL = reverse("airport:order-list")
+
+
+@override_settings(READ_REPLICA_DATABASES=["replica_0"])
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_use_primary_by_default(self):
+        with database_routing():
+            self.assertIsNone(self.router.db_for_read(Flight))
+
+    def test_routed_reads_use_replica(self):
+        with database_routing():
+            route_reads_to_replica()
+            self.assertEqual(self.router.db_for_read(Flight), "replica_0")
+            self.assertEqual(self.router.db_for_write(Flight), "default")
+
+        self.assertIsNone(self.router.db_for_read(Flight))
+
+    @override_settings(READ_REPLICA_DATABASES=[])
+    def test_reads_use_primary_without_replicas(self):
+        with database_routing():
+            route_reads_to_replica()
+            self.assertIsNone(self.router.db_for_read(Flight))
+
+
+# replica_0 mirrors the default database in tests, so it only sees
+# committed rows, as a real replica would.
+@override_settings(READ_REPLICA_DATABASES=["replica_0"])
+class ReplicaReadViewSetTests(TransactionTestCase):
+    databases = {"default", "replica_0"}
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_password",
+        )
+        self.flight = sample_flight()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url):
+        with CaptureQueriesContext(connections["replica_0"]) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+
+    def test_safe_reads_are_served_by_replica(self):
+        response, replica_queries = self.get(FLIGHT_LIST_URL)
+
+        self.assertEqual(
+            [flight["id"] for flight in response.data], [self.flight.id]
+        )
+        self.assertGreater(replica_queries, 0)
+
+    def test_user_reads_own_writes_from_primary(self):
+        payload = {
+            "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]
+        }
+        response = self.client.post(ORDER_LIST_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(is_pinned_to_primary(self.user))
+
+        response, replica_queries = self.get(ORDER_LIST_URL)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(replica_queries, 0)
+        self.assertEqual(self.get(FLIGHT_LIST_URL)[1], 0)
+
+    def test_objects_read_from_replica_relate_to_primary_ones(self):
+        flight = Flight.objects.using("replica_0").get(id=self.flight.id)
+        order = Order.objects.create(user=self.user)
+
+        ticket = Ticket(row=1, seat=1, flight=flight, order=order)
+        ticket.save()
+
+        self.assertEqual(Ticket.objects.get().flight_id, self.flight.id)
+
+    @override_settings(READ_REPLICA_DATABASES=[])
+    def test_relations_across_unknown_databases_are_refused(self):
+        flight = Flight.objects.using("replica_0").get(id=self.flight.id)
+        order = Order.objects.create(user=self.user)
+
+        with self.assertRaises(ValueError):
+            Ticket(row=1, seat=1, flight=flight, order=order)
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order, Ticket
+from airport.tests.test_airport_api import sample_crew, sample_flight
+
+FLIGHT_BATCH_URL = reverse("airport:flight-batch")
+
+
+class FlightBatchApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_password",
+        )
+        self.client.force_authenticate(self.user)
+        self.flights = [sample_flight() for _ in range(3)]
+        for flight in self.flights:
+            flight.crew.add(sample_crew())
+            Ticket.objects.create(
+                row=1,
+                seat=1,
+                flight=flight,
+                order=Order.objects.create(user=self.user),
+            )
+
+    def test_batch_by_ids(self):
+        ids = [flight.id for flight in self.flights] + [0]
+
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                FLIGHT_BATCH_URL, {"ids": ids}, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["flights"]
+        self.assertEqual([result["id"] for result in results], ids)
+        self.assertEqual(
+            results[0]["flight"]["taken_places"], [{"row": 1, "seat": 1}]
+        )
+        self.assertEqual(len(results[0]["flight"]["crew"]), 1)
+        self.assertEqual(results[-1], {"id": 0, "error": "Not found."})
+
+    def test_batch_by_route_and_date(self):
+        flight = self.flights[0]
+        tomorrow = (flight.departure_time + timedelta(days=1)).date()
+        payload = {
+            "lookups": [
+                {
+                    "route": flight.route_id,
+                    "date": timezone.localtime(flight.departure_time).date(),
+                },
+                {"route": flight.route_id, "date": tomorrow},
+            ]
+        }
+
+        response = self.client.post(FLIGHT_BATCH_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lookups = response.data["lookups"]
+        self.assertEqual(
+            [found["id"] for found in lookups[0]["flights"]], [flight.id]
+        )
+        self.assertEqual(lookups[1]["flights"], [])
+
+    @override_settings(FLIGHT_BATCH_MAX_SIZE=2)
+    def test_batch_size_limited(self):
+        ids = [flight.id for flight in self.flights]
+
+        response = self.client.post(
+            FLIGHT_BATCH_URL, {"ids": ids}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
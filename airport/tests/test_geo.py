@@ -0,0 +1,192 @@
+import random
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.geo import KDTree, great_circle_km, unit_vector
+from airport.models import Airport, Flight, Route
+from airport.pricing import price_flights
+from airport.tests.test_airport_api import (
+    ROUTE_LIST_URL,
+    sample_airport,
+    sample_flight,
+)
+
+NEAREST_URL = reverse("airport:airport-nearest")
+
+JFK = {"latitude": 40.6413, "longitude": -73.7781}
+LHR = {"latitude": 51.47, "longitude": -0.4543}
+CDG = {"latitude": 49.0097, "longitude": 2.5479}
+
+
+class GreatCircleTests(TestCase):
+    def test_known_distance(self):
+        distance = great_circle_km(
+            JFK["latitude"],
+            JFK["longitude"],
+            LHR["latitude"],
+            LHR["longitude"],
+        )
+        self.assertAlmostEqual(distance, 5540, delta=5)
+
+    def test_kd_tree_matches_brute_force(self):
+        rng = random.Random(1)
+        points = [
+            unit_vector(rng.uniform(-90, 90), rng.uniform(-180, 180))
+            for _ in range(500)
+        ]
+        tree = KDTree(points, range(len(points)))
+        for _ in range(20):
+            target = unit_vector(rng.uniform(-90, 90), rng.uniform(-180, 180))
+            expected = sorted(
+                range(len(points)),
+                key=lambda i: sum(
+                    (a - b) ** 2 for a, b in zip(points[i], target)
+                ),
+            )[:7]
+            self.assertEqual(
+                [value for _, value in tree.nearest(target, 7)], expected
+            )
+
+    def test_empty_tree(self):
+        self.assertEqual(KDTree([], []).nearest((1, 0, 0), 3), [])
+
+
+class RouteDistanceTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@test.com", "test_password"
+            )
+        )
+        self.jfk = sample_airport(name="JFK", **JFK)
+        self.lhr = sample_airport(name="LHR", **LHR)
+
+    def test_distance_computed_from_coordinates(self):
+        response = self.client.post(
+            ROUTE_LIST_URL,
+            {"source": self.jfk.id, "destination": self.lhr.id, "distance": 1},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertAlmostEqual(response.data["distance"], 5540, delta=5)
+
+    def test_distance_required_without_coordinates(self):
+        source = sample_airport(name="A")
+        destination = sample_airport(name="B")
+
+        response = self.client.post(
+            ROUTE_LIST_URL,
+            {"source": source.id, "destination": destination.id},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("distance", response.data)
+
+    def test_moving_airport_updates_routes(self):
+        route = Route.objects.create(
+            source=self.jfk, destination=self.lhr, distance=5555
+        )
+
+        self.lhr.latitude, self.lhr.longitude = CDG.values()
+        self.lhr.save()
+
+        route.refresh_from_db()
+        self.assertAlmostEqual(route.distance, 5835, delta=10)
+
+    def test_moving_airport_drops_cached_fares(self):
+        cache.clear()
+        route = Route.objects.create(
+            source=self.jfk, destination=self.lhr, distance=5555
+        )
+        flight = sample_flight(route=route)
+
+        def fare():
+            flights = Flight.objects.select_related("route", "airplane")
+            return price_flights(flights)[flight.id]
+
+        old_fare = fare()
+
+        self.lhr.latitude, self.lhr.longitude = CDG.values()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lhr.save()
+
+        self.assertGreater(fare(), old_fare)
+
+    def test_command_updates_bulk_imported_airports(self):
+        source, destination = Airport.objects.bulk_create(
+            [
+                Airport(name="CDG", closest_big_city="Paris", **CDG),
+                Airport(name="JFK", closest_big_city="New York", **JFK),
+            ]
+        )
+        route = Route.objects.create(
+            source=source, destination=destination, distance=2
+        )
+
+        out = StringIO()
+        call_command("update_route_distances", stdout=out)
+
+        route.refresh_from_db()
+        self.assertAlmostEqual(route.distance, 5835, delta=10)
+        self.assertIn("Updated the distance of 1 routes", out.getvalue())
+
+
+class NearestAirportTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "user@test.com", "test_password"
+            )
+        )
+        sample_airport(name="JFK", iata_code="JFK", **JFK)
+        sample_airport(name="LHR", iata_code="LHR", **LHR)
+        sample_airport(name="No coordinates")
+
+    def nearest(self, **params):
+        response = self.client.get(NEAREST_URL, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_returns_nearest_first(self):
+        data = self.nearest(lat=48.8566, lon=2.3522, k=5)
+
+        self.assertEqual([a["iata_code"] for a in data], ["LHR", "JFK"])
+        self.assertAlmostEqual(data[0]["distance_km"], 348, delta=5)
+
+    def test_k_limits_the_number_of_airports(self):
+        self.assertEqual(len(self.nearest(lat=48.8566, lon=2.3522, k=1)), 1)
+
+    def test_index_rebuilt_after_airport_changes(self):
+        self.nearest(lat=48.8566, lon=2.3522, k=1)
+
+        cdg = sample_airport(name="CDG", iata_code="CDG", **CDG)
+        self.assertEqual(
+            self.nearest(lat=48.8566, lon=2.3522, k=1)[0]["id"], cdg.id
+        )
+
+        cdg.delete()
+        self.assertEqual(
+            self.nearest(lat=48.8566, lon=2.3522, k=1)[0]["iata_code"],
+            "LHR",
+        )
+
+    def test_invalid_query(self):
+        for params in (
+            {"lat": 91, "lon": 0},
+            {"lat": 0},
+            {"lat": 0, "lon": 0, "k": 0},
+        ):
+            response = self.client.get(NEAREST_URL, params)
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST, params
+            )
@@ -0,0 +1,73 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command, CommandError
+from django.db.utils import OperationalError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+
+class HealthEndpointTests(TestCase):
+    def test_healthz(self):
+        response = self.client.get(reverse("healthz"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_readyz(self):
+        response = self.client.get(reverse("readyz"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"status": "ok"})
+
+    @mock.patch(
+        "airport_api.health.pending_migrations",
+        return_value=[("airport", "0003")],
+    )
+    def test_readyz_unavailable_with_pending_migrations(self, _):
+        with mock.patch("airport_api.health._migrations_applied", False):
+            response = self.client.get(reverse("readyz"))
+
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(response.json()["reason"], "pending migrations")
+
+    @mock.patch(
+        "airport_api.health.check_database",
+        side_effect=OperationalError(
+            'connection to server at "db.internal" (10.0.0.5), port 5432 '
+            "failed"
+        ),
+    )
+    def test_readyz_hides_database_error(self, _):
+        with self.assertLogs("airport_api.health", "WARNING") as logs:
+            response = self.client.get(reverse("readyz"))
+
+        self.assertEqual(
+            response.json(),
+            {"status": "unavailable", "reason": "database unavailable"},
+        )
+        self.assertIn("db.internal", logs.output[0])
+
+
+@mock.patch("airport.management.commands.wait_for_db.time.sleep")
+@mock.patch("airport.management.commands.wait_for_db.check_database")
+class WaitForDbCommandTests(TestCase):
+    def test_waits_until_database_is_ready(self, check_database, sleep):
+        check_database.side_effect = [OperationalError] * 3 + [None]
+        out = StringIO()
+
+        call_command("wait_for_db", stdout=out)
+
+        self.assertEqual(check_database.call_count, 4)
+        self.assertEqual(
+            [call.args[0] for call in sleep.call_args_list], [0.1, 0.2, 0.4]
+        )
+        self.assertIn("Database available after", out.getvalue())
+
+    def test_gives_up_after_timeout(self, check_database, sleep):
+        check_database.side_effect = OperationalError
+
+        with self.assertRaises(CommandError):
+            call_command("wait_for_db", timeout=0, stdout=StringIO())
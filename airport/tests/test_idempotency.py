@@ -0,0 +1,180 @@
+import threading
+import unittest
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import IdempotencyKey, Order
+from airport.serializers import OrderSerializer
+from airport.tests.test_airport_api import ORDER_LIST_URL, sample_flight
+
+
+class IdempotentOrderCreateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_password",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.payload = {
+            "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]
+        }
+
+    def post(self, payload, key="retry-1"):
+        return self.client.post(
+            ORDER_LIST_URL, payload, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_returns_original_response(self):
+        first = self.post(self.payload)
+        retry = self.post(self.payload)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_for_different_request(self):
+        self.post(self.payload)
+        other_payload = {
+            "tickets": [{"row": 1, "seat": 2, "flight": self.flight.id}]
+        }
+
+        response = self.post(other_payload)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_invalid_request_is_not_stored(self):
+        invalid_payload = {
+            "tickets": [{"row": 100, "seat": 1, "flight": self.flight.id}]
+        }
+
+        response = self.post(invalid_payload)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_keys_are_scoped_to_user(self):
+        self.post(self.payload)
+        other_user = get_user_model().objects.create_user(
+            "other@test.com",
+            "test_password",
+        )
+        self.client.force_authenticate(other_user)
+        payload = {
+            "tickets": [{"row": 1, "seat": 2, "flight": self.flight.id}]
+        }
+
+        response = self.post(payload)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_purge_expired_keys(self):
+        self.post(self.payload, key="old")
+        self.post(
+            {"tickets": [{"row": 1, "seat": 2, "flight": self.flight.id}]},
+            key="new",
+        )
+        IdempotencyKey.objects.filter(key="old").update(
+            created_at=timezone.now() - timedelta(days=2)
+        )
+
+        call_command("purge_idempotency_keys", stdout=StringIO())
+
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list("key", flat=True)),
+            ["new"],
+        )
+
+    def test_expired_key_is_not_replayed(self):
+        self.post(self.payload)
+        IdempotencyKey.objects.update(
+            created_at=timezone.now() - timedelta(days=2)
+        )
+        payload = {
+            "tickets": [{"row": 1, "seat": 2, "flight": self.flight.id}]
+        }
+
+        response = self.post(payload)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(
+            IdempotencyKey.objects.get().response_body["id"],
+            response.data["id"],
+        )
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "Needs concurrent transactions"
+)
+class ConcurrentIdempotentOrderCreateTests(TransactionTestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_password",
+        )
+        self.flight = sample_flight()
+        self.payload = {
+            "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]
+        }
+
+    def post(self, responses):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        try:
+            responses.append(
+                client.post(
+                    ORDER_LIST_URL,
+                    self.payload,
+                    format="json",
+                    HTTP_IDEMPOTENCY_KEY="retry-1",
+                )
+            )
+        finally:
+            connections.close_all()
+
+    def test_retry_during_original_request_replays_it(self):
+        create = OrderSerializer.create
+        creating = threading.Event()
+        retried = threading.Event()
+
+        def slow_create(serializer, validated_data):
+            creating.set()
+            retried.wait(timeout=5)
+            return create(serializer, validated_data)
+
+        original, retry = [], []
+        with mock.patch.object(OrderSerializer, "create", slow_create):
+            first = threading.Thread(target=self.post, args=(original,))
+            first.start()
+            creating.wait(timeout=5)
+            second = threading.Thread(target=self.post, args=(retry,))
+            second.start()
+            # Give the retry time to block on the claimed key.
+            second.join(timeout=0.5)
+            retried.set()
+            first.join()
+            second.join()
+
+        self.assertEqual(original[0].status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry[0].status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry[0].data, original[0].data)
+        self.assertEqual(retry[0]["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
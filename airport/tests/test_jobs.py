@@ -0,0 +1,96 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.jobs import enqueue, job, run_pending_jobs
+from airport.models import Job
+from airport.tests.test_airport_api import ORDER_LIST_URL, sample_flight
+
+calls = []
+
+
+@job("test_flaky")
+def flaky(fail_times):
+    calls.append(fail_times)
+    if len(calls) <= fail_times:
+        raise RuntimeError("flaky")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_job_runs_once(self):
+        enqueue("test_flaky", fail_times=0)
+
+        self.assertEqual(run_pending_jobs(), 1)
+        self.assertEqual(run_pending_jobs(), 0)
+        self.assertEqual(Job.objects.get().status, Job.Status.DONE)
+
+    def test_failed_job_is_retried_later(self):
+        enqueue("test_flaky", fail_times=1)
+
+        run_pending_jobs()
+        failed = Job.objects.get()
+        self.assertEqual(failed.status, Job.Status.PENDING)
+        self.assertIn("RuntimeError", failed.last_error)
+        self.assertEqual(run_pending_jobs(), 0)
+
+        Job.objects.update(run_after=failed.created_at)
+        run_pending_jobs()
+        self.assertEqual(Job.objects.get().status, Job.Status.DONE)
+        self.assertEqual(len(calls), 2)
+
+    def test_job_is_dead_lettered_after_max_attempts(self):
+        dead = enqueue("test_flaky", fail_times=10)
+        Job.objects.update(max_attempts=2)
+
+        for _ in range(2):
+            Job.objects.update(run_after=dead.created_at)
+            run_pending_jobs()
+
+        dead.refresh_from_db()
+        self.assertEqual(dead.status, Job.Status.DEAD)
+        self.assertEqual(dead.attempts, 2)
+
+    def test_run_workers_once(self):
+        enqueue("test_flaky", fail_times=0)
+        out = StringIO()
+
+        call_command("run_workers", once=True, stdout=out)
+
+        self.assertIn("Ran 1 jobs", out.getvalue())
+
+
+class OrderConfirmationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_password",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def test_order_confirmation_enqueued_after_commit(self):
+        payload = {
+            "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]
+        }
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(ORDER_LIST_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        queued = Job.objects.get()
+        self.assertEqual(queued.name, "send_order_confirmation")
+        self.assertEqual(queued.payload, {"order_id": response.data["id"]})
+
+        run_pending_jobs()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
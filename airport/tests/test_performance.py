@@ -0,0 +1,126 @@
+"""
+Query counts against thousands of flights, built with the bulk
+factories. Skip them with ``manage.py test --exclude-tag performance``.
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airport.catalog import flight_catalog, start_of_today
+from airport.tests.factories import (
+    create_airplanes,
+    create_crew,
+    create_flights,
+    create_orders,
+    create_routes,
+    create_user,
+)
+from airport.tests.test_airport_api import (
+    FLIGHT_LIST_URL,
+    ORDER_SUMMARY_URL,
+)
+from airport.tests.test_seating import FLIGHT_AVAILABILITY_URL
+
+FLIGHTS = 5000
+
+
+@tag("performance")
+class LargeScheduleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.start = start_of_today() + timedelta(days=1)
+        cls.flights = create_flights(
+            FLIGHTS,
+            routes=create_routes(50),
+            airplanes=create_airplanes(50),
+            start=cls.start,
+            spacing=timedelta(minutes=10),
+            crew=create_crew(2),
+        )
+        cls.user = create_user()
+        create_orders(cls.flights[:1000], tickets_per_order=3, user=cls.user)
+        cls.other_user = create_user()
+        create_orders(cls.flights[-1:], user=cls.other_user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def date(self, days):
+        return timezone.localtime(self.start + timedelta(days=days)).date()
+
+    def count_queries(self, method, url, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format="json")
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_flight_list_queries_independent_of_day_size(self):
+        busy_queries, busy = self.count_queries(
+            "get", FLIGHT_LIST_URL, {"departure_time": self.date(1)}
+        )
+        # The schedule ends early on its last day.
+        quiet_queries, quiet = self.count_queries(
+            "get", FLIGHT_LIST_URL, {"departure_time": self.date(34)}
+        )
+
+        self.assertEqual(len(busy), 144)
+        self.assertLess(len(quiet), 144)
+        self.assertEqual(busy_queries, quiet_queries)
+
+    def test_availability_for_many_flights(self):
+        flight_ids = [flight.id for flight in self.flights[900:1100]]
+
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                FLIGHT_AVAILABILITY_URL,
+                {"flights": flight_ids, "party_size": 3},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        seats_left = {
+            result["flight"]: result["seats_left"] for result in response.data
+        }
+        self.assertEqual(seats_left[self.flights[999].id], 97)
+        self.assertEqual(seats_left[self.flights[1000].id], 100)
+
+    def test_order_summary_queries_independent_of_orders(self):
+        queries, summary = self.count_queries("get", ORDER_SUMMARY_URL, {})
+        self.client.force_authenticate(self.other_user)
+        single_queries, single = self.count_queries(
+            "get", ORDER_SUMMARY_URL, {}
+        )
+
+        self.assertEqual(summary["count"], 1000)
+        self.assertEqual(single["count"], 1)
+        self.assertEqual(queries, single_queries)
+
+    @override_settings(
+        FLIGHT_CATALOG_ENABLED=True, FLIGHT_CATALOG_MAX_STALENESS=3600
+    )
+    def test_catalog_search_without_queries(self):
+        flight_catalog.reset()
+        self.addCleanup(flight_catalog.reset)
+        dates = [self.date(days) for days in range(30)]
+        # The first pass loads the catalog and caches the fares.
+        for date in dates:
+            self.client.get(FLIGHT_LIST_URL, {"departure_time": date})
+
+        with self.assertNumQueries(0):
+            for date in dates:
+                self.client.get(FLIGHT_LIST_URL, {"departure_time": date})
+
+    def test_seats_sold_in_sync(self):
+        out = StringIO()
+        call_command("reconcile_seats_sold", "--dry-run", stdout=out)
+
+        self.assertIn("Found 0 flights with drift", out.getvalue())
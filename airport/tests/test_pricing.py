@@ -0,0 +1,133 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight, Order, Ticket
+from airport.pricing import (
+    compute_fare,
+    get_load_buckets,
+    load_bucket,
+    price_flights,
+    seat_class,
+)
+from airport.tests.test_airport_api import (
+    FLIGHT_LIST_URL,
+    ORDER_LIST_URL,
+    sample_airplane,
+    sample_flight,
+    sample_route,
+)
+
+
+class FareComputationTests(SimpleTestCase):
+    def test_seat_class_bands(self):
+        self.assertEqual(
+            [seat_class(row, 10) for row in range(1, 11)],
+            ["first"] + ["business"] * 2 + ["economy"] * 7,
+        )
+
+    def test_load_bucket(self):
+        self.assertEqual(load_bucket(0, 100), 0)
+        self.assertEqual(load_bucket(50, 100), 1)
+        self.assertEqual(load_bucket(80, 100), 2)
+        self.assertEqual(load_bucket(100, 100), 3)
+
+    def test_compute_fare(self):
+        self.assertEqual(compute_fare(1000, "economy", 0), Decimal("100.00"))
+        self.assertEqual(compute_fare(1000, "first", 0), Decimal("400.00"))
+        self.assertEqual(compute_fare(1000, "economy", 3), Decimal("160.00"))
+
+
+class FlightPricingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_password",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight(
+            route=sample_route(distance=1000),
+            airplane=sample_airplane(rows=2, seats_in_row=2),
+        )
+
+    def test_flight_list_shows_price(self):
+        response = self.client.get(FLIGHT_LIST_URL)
+
+        self.assertEqual(response.data[0]["price_from"], "100.00")
+
+    def test_flight_list_prices_page_in_batch(self):
+        for _ in range(5):
+            sample_flight()
+
+        flights = list(Flight.objects.select_related("route", "airplane"))
+
+        with self.assertNumQueries(1):
+            fares = price_flights(flights)
+        with self.assertNumQueries(0):
+            self.assertEqual(price_flights(flights), fares)
+
+    def test_order_stores_price_snapshot(self):
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+                {"row": 2, "seat": 1, "flight": self.flight.id},
+            ]
+        }
+
+        response = self.client.post(ORDER_LIST_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(id=response.data["id"])
+        self.assertEqual(
+            sorted(order.tickets.values_list("price", flat=True)),
+            [Decimal("100.00"), Decimal("400.00")],
+        )
+        self.assertEqual(order.total_price, Decimal("500.00"))
+
+    def test_order_prices_tickets_in_one_batch(self):
+        other_flight = sample_flight()
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+                {"row": 2, "seat": 1, "flight": self.flight.id},
+                {"row": 1, "seat": 1, "flight": other_flight.id},
+            ]
+        }
+
+        with mock.patch(
+            "airport.pricing.cache.get_many", wraps=cache.get_many
+        ) as get_many:
+            response = self.client.post(ORDER_LIST_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # Load buckets, then fares.
+        self.assertEqual(get_many.call_count, 2)
+
+    def test_fares_follow_route_distance(self):
+        self.assertEqual(price_flights([self.flight])[self.flight.id], 100)
+
+        route = self.flight.route
+        route.distance = 2000
+        with self.captureOnCommitCallbacks(execute=True):
+            route.save()
+
+        self.assertEqual(price_flights([self.flight])[self.flight.id], 180)
+
+    def test_load_cache_invalidated_when_tickets_sold(self):
+        self.assertEqual(get_load_buckets([self.flight]), {self.flight.id: 0})
+
+        order = Order.objects.create(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            for row, seat in ((1, 1), (1, 2), (2, 1)):
+                Ticket.objects.create(
+                    row=row, seat=seat, flight=self.flight, order=order
+                )
+
+        self.assertEqual(get_load_buckets([self.flight]), {self.flight.id: 2})
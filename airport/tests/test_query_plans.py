@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from airport.models import Order, Ticket
+from airport.tests.test_airport_api import sample_flight
+
+
+def explain(queryset):
+    if connection.vendor == "postgresql":
+        # Tiny test tables are always cheaper to scan sequentially.
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+class QueryPlanTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_password",
+        )
+        self.flight = sample_flight()
+        self.order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=self.order
+        )
+
+    def test_user_orders_use_user_created_index(self):
+        plan = explain(
+            Order.objects.filter(user=self.user).order_by("-created_at")
+        )
+
+        self.assertIn("order_user_created_idx", plan)
+
+    def test_order_tickets_use_covering_index(self):
+        plan = explain(
+            Ticket.objects.filter(order=self.order).values_list(
+                "flight", "row", "seat"
+            )
+        )
+
+        self.assertIn("ticket_order_idx", plan)
+
+    def test_flight_tickets_are_not_sorted_by_default(self):
+        queryset = Ticket.objects.filter(flight=self.flight)
+
+        self.assertNotIn("ORDER BY", str(queryset.query))
+        self.assertIn("airport_ticket_flight_id_row_seat", explain(queryset))
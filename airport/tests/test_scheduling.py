@@ -0,0 +1,493 @@
+import random
+import unittest
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight, FlightSchedule
+from airport.scheduling import (
+    CrewSchedule,
+    IntervalTree,
+    Timeline,
+    find_crew_conflicts,
+    generate_flights,
+    schedule_occurrences,
+)
+from airport.tests.test_airport_api import (
+    FLIGHT_LIST_URL,
+    detail_flight_url,
+    sample_airplane,
+    sample_crew,
+    sample_flight,
+    sample_route,
+)
+
+
+class IntervalTreeTests(SimpleTestCase):
+    def test_matches_brute_force(self):
+        generator = random.Random(42)
+        intervals = []
+        for value in range(500):
+            start = generator.randint(0, 10_000)
+            intervals.append((start, start + generator.randint(1, 300), value))
+        tree = IntervalTree(intervals)
+
+        for _ in range(200):
+            start = generator.randint(0, 10_000)
+            end = start + generator.randint(1, 300)
+            expected = {
+                value
+                for interval_start, interval_end, value in intervals
+                if interval_start < end and interval_end > start
+            }
+            self.assertEqual(set(tree.overlapping(start, end)), expected)
+
+    def test_back_to_back_intervals_do_not_overlap(self):
+        tree = IntervalTree([(0, 10, "a"), (20, 30, "b")])
+
+        self.assertEqual(tree.overlapping(10, 20), [])
+        self.assertEqual(sorted(tree.overlapping(9, 21)), ["a", "b"])
+
+
+class TimelineTests(SimpleTestCase):
+    def test_checks_existing_and_added_intervals(self):
+        timeline = Timeline([(0, 10, "existing")])
+        timeline.add(20, 30, "added")
+        timeline.add(40, 50, "later")
+
+        self.assertEqual(timeline.overlapping(5, 25), ["existing", "added"])
+        self.assertEqual(timeline.overlapping(29, 41), ["added", "later"])
+        self.assertEqual(timeline.overlapping(10, 20), [])
+        self.assertEqual(timeline.overlapping(30, 40), [])
+
+
+class CrewConflictTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com", "test_password", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+        self.now = timezone.now()
+        self.crew = sample_crew()
+        self.flight = sample_flight(
+            departure_time=self.now + timedelta(hours=1),
+            arrival_time=self.now + timedelta(hours=3),
+        )
+        self.flight.crew.add(self.crew)
+
+    def payload(self, departure_hours, arrival_hours):
+        return {
+            "route": sample_route().id,
+            "airplane": sample_airplane().id,
+            "departure_time": self.now + timedelta(hours=departure_hours),
+            "arrival_time": self.now + timedelta(hours=arrival_hours),
+            "crew": [self.crew.id],
+        }
+
+    def test_find_crew_conflicts(self):
+        self.assertEqual(
+            find_crew_conflicts(
+                [self.crew],
+                self.now + timedelta(hours=2),
+                self.now + timedelta(hours=4),
+            ),
+            {self.crew.id: [self.flight.id]},
+        )
+        self.assertEqual(
+            find_crew_conflicts(
+                [self.crew],
+                self.now + timedelta(hours=3),
+                self.now + timedelta(hours=4),
+            ),
+            {},
+        )
+
+    def test_crew_schedule_loads_only_overlapping_duties(self):
+        old_flight = sample_flight(
+            departure_time=self.now - timedelta(days=30),
+            arrival_time=self.now - timedelta(days=30, hours=-2),
+        )
+        old_flight.crew.add(self.crew)
+
+        schedule = CrewSchedule(
+            [self.crew],
+            start=self.now + timedelta(hours=2),
+            end=self.now + timedelta(hours=4),
+        )
+
+        self.assertEqual(len(schedule), 1)
+        self.assertEqual(len(CrewSchedule([self.crew])), 2)
+
+    @unittest.skipUnless(
+        connection.vendor == "postgresql", "Needs SELECT ... FOR UPDATE"
+    )
+    def test_create_flight_locks_airplane_and_crew(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                FLIGHT_LIST_URL, self.payload(3, 5), format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        locks = [
+            query["sql"] for query in queries if "FOR UPDATE" in query["sql"]
+        ]
+        self.assertEqual(len(locks), 2)
+
+    def test_create_flight_with_overlapping_crew_rejected(self):
+        response = self.client.post(
+            FLIGHT_LIST_URL, self.payload(2, 4), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("crew", response.data)
+
+    def test_create_flight_after_previous_duty(self):
+        response = self.client.post(
+            FLIGHT_LIST_URL, self.payload(3, 5), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_update_flight_does_not_conflict_with_itself(self):
+        response = self.client.patch(
+            detail_flight_url(self.flight.id),
+            {"arrival_time": self.now + timedelta(hours=4)},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_arrival_before_departure_rejected(self):
+        response = self.client.post(
+            FLIGHT_LIST_URL, self.payload(5, 4), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("arrival_time", response.data)
+
+    def test_crew_schedule(self):
+        later_flight = sample_flight(
+            departure_time=self.now + timedelta(hours=5),
+            arrival_time=self.now + timedelta(hours=6),
+        )
+        later_flight.crew.add(self.crew)
+        sample_flight()
+
+        response = self.client.get(
+            reverse("airport:crew-schedule", args=[self.crew.id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [flight["id"] for flight in response.data],
+            [self.flight.id, later_flight.id],
+        )
+
+
+class AirplaneRotationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com", "test_password", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+        self.start = timezone.now().replace(
+            hour=6, minute=0, second=0, microsecond=0
+        ) + timedelta(days=1)
+        self.airplane = sample_airplane()
+        self.outbound = sample_route()
+        self.inbound = sample_route(
+            source=self.outbound.destination,
+            destination=self.outbound.source,
+        )
+        self.flight = sample_flight(
+            route=self.outbound,
+            airplane=self.airplane,
+            departure_time=self.start,
+            arrival_time=self.start + timedelta(hours=2),
+        )
+
+    def payload(self, route, departure_hours, arrival_hours):
+        return {
+            "route": route.id,
+            "airplane": self.airplane.id,
+            "departure_time": self.start + timedelta(hours=departure_hours),
+            "arrival_time": self.start + timedelta(hours=arrival_hours),
+            "crew": [sample_crew().id],
+        }
+
+    def test_double_booked_airplane_rejected(self):
+        response = self.client.post(
+            FLIGHT_LIST_URL, self.payload(self.inbound, 1, 3), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("airplane", response.data)
+
+    def test_flight_must_depart_where_airplane_arrived(self):
+        response = self.client.post(
+            FLIGHT_LIST_URL, self.payload(self.outbound, 3, 5), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("airplane", response.data)
+
+    def test_flight_must_arrive_where_next_flight_departs(self):
+        response = self.client.post(
+            FLIGHT_LIST_URL,
+            self.payload(self.outbound, -4, -2),
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_valid_rotation(self):
+        response = self.client.post(
+            FLIGHT_LIST_URL, self.payload(self.inbound, 3, 5), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_airplane_utilization(self):
+        sample_flight(
+            route=self.inbound,
+            airplane=self.airplane,
+            departure_time=self.start + timedelta(hours=3),
+            arrival_time=self.start + timedelta(hours=5, minutes=30),
+        )
+
+        response = self.client.get(
+            reverse("airport:airplane-utilization", args=[self.airplane.id])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["block_hours"], 4.5)
+        self.assertEqual(
+            response.data["days"],
+            [
+                {
+                    "date": self.start.date().isoformat(),
+                    "flights": 2,
+                    "block_hours": 4.5,
+                }
+            ],
+        )
+        self.assertEqual(len(response.data["idle_gaps"]), 1)
+        self.assertEqual(response.data["idle_gaps"][0]["hours"], 1.0)
+        self.assertEqual(
+            response.data["idle_gaps"][0]["after_flight"], self.flight.id
+        )
+
+
+MONDAY = 1
+WEDNESDAY = 4
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+# Flights that have already departed are not generated, so the schedules
+# run in 2097, which has the calendar and DST dates of 2024.
+class FlightScheduleGenerationTests(TestCase):
+    def setUp(self):
+        self.crew = sample_crew()
+        self.schedule = FlightSchedule.objects.create(
+            route=sample_route(),
+            airplane=sample_airplane(),
+            weekdays=MONDAY | WEDNESDAY,
+            departure_time=time(8, 0),
+            duration=timedelta(hours=2),
+            timezone="Europe/Kyiv",
+            valid_from=date(2097, 3, 1),
+            valid_until=date(2097, 3, 31),
+        )
+        self.schedule.crew.add(self.crew)
+        self.return_schedule = FlightSchedule.objects.create(
+            route=sample_route(
+                source=self.schedule.route.destination,
+                destination=self.schedule.route.source,
+            ),
+            airplane=self.schedule.airplane,
+            weekdays=MONDAY | WEDNESDAY,
+            departure_time=time(12, 0),
+            duration=timedelta(hours=2),
+            timezone="Europe/Kyiv",
+            valid_from=date(2097, 3, 1),
+            valid_until=date(2097, 3, 31),
+        )
+
+    def generate(
+        self,
+        start_date=date(2097, 3, 1),
+        end_date=date(2097, 4, 30),
+        schedules=None,
+    ):
+        if schedules is None:
+            schedules = FlightSchedule.objects.prefetch_related("crew")
+        return generate_flights(schedules, start_date, end_date, batch_size=3)
+
+    def test_occurrences_follow_local_time_across_dst(self):
+        occurrences = list(
+            schedule_occurrences(
+                self.schedule, date(2097, 3, 25), date(2097, 4, 30)
+            )
+        )
+
+        # 08:00 in Kyiv is 06:00 UTC before the switch to summer time on
+        # March 31st and 05:00 UTC after it.
+        self.assertEqual(
+            [departure_time for departure_time, _ in occurrences],
+            [utc(2097, 3, 25, 6), utc(2097, 3, 27, 6)],
+        )
+        self.assertEqual(occurrences[0][1], utc(2097, 3, 25, 8))
+
+    def test_generates_missing_flights_with_crew(self):
+        created, skipped = self.generate()
+
+        self.assertEqual((created, skipped), (16, []))
+        flights = Flight.objects.filter(schedule=self.schedule)
+        self.assertEqual(flights.count(), 8)
+        self.assertEqual(
+            Flight.crew.through.objects.filter(crew=self.crew).count(), 8
+        )
+
+        Flight.objects.filter(schedule=self.schedule).first().delete()
+        self.assertEqual(self.generate(), (1, []))
+        self.assertEqual(self.generate(), (0, []))
+
+    def test_skips_occurrences_with_busy_airplane_or_crew(self):
+        busy_airplane = sample_flight(
+            route=self.schedule.route,
+            airplane=self.schedule.airplane,
+            departure_time=utc(2097, 3, 4, 7),
+            arrival_time=utc(2097, 3, 4, 9),
+        )
+        busy_crew = sample_flight(
+            departure_time=utc(2097, 3, 6, 5),
+            arrival_time=utc(2097, 3, 6, 7),
+        )
+        busy_crew.crew.add(self.crew)
+
+        created, skipped = self.generate()
+
+        # Without the flight there on March 6th, the airplane is not at
+        # the airport the return flight departs from.
+        self.assertEqual(created, 13)
+        self.assertEqual(
+            skipped,
+            [
+                (
+                    self.schedule.id,
+                    utc(2097, 3, 4, 6),
+                    "airplane is busy",
+                ),
+                (
+                    self.schedule.id,
+                    utc(2097, 3, 6, 6),
+                    f"crew members {[self.crew.id]} are busy",
+                ),
+                (
+                    self.return_schedule.id,
+                    utc(2097, 3, 6, 10),
+                    "airplane is at another airport",
+                ),
+            ],
+        )
+        self.assertFalse(
+            Flight.objects.filter(
+                airplane=busy_airplane.airplane, departure_time__day=4
+            )
+            .exclude(pk=busy_airplane.pk)
+            .filter(route=self.schedule.route)
+            .exists()
+        )
+
+    def test_schedules_sharing_an_airplane_do_not_overlap(self):
+        FlightSchedule.objects.create(
+            route=self.schedule.route,
+            airplane=self.schedule.airplane,
+            weekdays=MONDAY,
+            departure_time=time(9, 0),
+            duration=timedelta(hours=1),
+            timezone="Europe/Kyiv",
+            valid_from=date(2097, 3, 1),
+            valid_until=date(2097, 3, 31),
+        )
+
+        created, skipped = self.generate()
+
+        self.assertEqual(created, 16)
+        self.assertEqual(len(skipped), 4)
+
+    def test_keeps_the_airplane_rotation(self):
+        # The airplane ends up at another airport days before.
+        sample_flight(
+            airplane=self.schedule.airplane,
+            departure_time=utc(2097, 3, 1, 10),
+            arrival_time=utc(2097, 3, 1, 12),
+        )
+
+        created, skipped = self.generate()
+
+        self.assertEqual(created, 0)
+        self.assertEqual(len(skipped), 16)
+        self.assertEqual(
+            {reason for _, _, reason in skipped},
+            {"airplane is at another airport"},
+        )
+
+    def test_skips_flights_lasting_a_day_or_more(self):
+        self.schedule.duration = timedelta(hours=24)
+        with self.assertRaises(ValidationError):
+            self.schedule.full_clean()
+        self.schedule.save()
+
+        created, skipped = self.generate(schedules=[self.schedule])
+
+        self.assertEqual(created, 0)
+        self.assertEqual(
+            {reason for _, _, reason in skipped},
+            {"flight lasts a day or more"},
+        )
+
+    def test_skips_flights_that_departed_today(self):
+        today = timezone.localdate()
+        self.schedule.timezone = "UTC"
+        self.schedule.departure_time = time.min
+        self.schedule.weekdays = 127
+        self.schedule.valid_from = today
+        self.schedule.save()
+
+        self.assertEqual(
+            self.generate(today, today, schedules=[self.schedule]), (0, [])
+        )
+
+    def test_command_uses_horizon_from_today(self):
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        for schedule in (self.schedule, self.return_schedule):
+            schedule.valid_from = tomorrow
+            schedule.valid_until = tomorrow + timedelta(days=365)
+            schedule.weekdays = 127
+            schedule.save()
+        out = StringIO()
+
+        call_command("generate_flights", "--days", "13", stdout=out)
+
+        self.assertEqual(
+            Flight.objects.filter(schedule=self.schedule).count(), 13
+        )
+        self.assertIn("Created 26 flights", out.getvalue())
@@ -0,0 +1,62 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from airport_api import schema
+
+SCHEMA_URL = reverse("schema")
+
+
+class CachedSchemaTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            OPENAPI_SCHEMA_DIR=Path(directory.name)
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        schema._schema = None
+        self.addCleanup(setattr, schema, "_schema", None)
+
+    def test_build_schema_writes_versioned_file(self):
+        call_command("build_schema", stdout=StringIO())
+
+        path = schema.schema_path()
+        self.assertEqual(path.name, "schema-1.0.0.json")
+        response = self.client.get(SCHEMA_URL)
+        self.assertEqual(response.content, path.read_bytes())
+        self.assertIn(b"/api/airport/flights/", response.content)
+        self.assertIn(b'"jwtAuth"', response.content)
+
+    def test_served_from_memory_with_etag(self):
+        response = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["ETag"])
+        self.assertIn("max-age=", response["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                SCHEMA_URL, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_debug_ignores_built_file(self):
+        path = schema.schema_path()
+        path.write_bytes(b'{"stale": true}')
+
+        with override_settings(DEBUG=True):
+            response = self.client.get(SCHEMA_URL)
+
+        self.assertIn(b"/api/airport/flights/", response.content)
+
+    def test_swagger_points_to_cached_schema(self):
+        response = self.client.get(reverse("swagger-ui"))
+
+        self.assertContains(response, SCHEMA_URL)
@@ -0,0 +1,172 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Order, Ticket
+from airport.seating import SeatMap, load_seat_maps
+from airport.tests.test_airport_api import (
+    ORDER_LIST_URL,
+    sample_airplane,
+    sample_flight,
+)
+
+FLIGHT_AVAILABILITY_URL = reverse("airport:flight-availability")
+
+
+class SeatMapTests(SimpleTestCase):
+    def test_blocks_skip_taken_seats(self):
+        seat_map = SeatMap(1, rows=2, seats_in_row=6, taken=[(1, 3), (2, 1)])
+
+        self.assertEqual(
+            list(seat_map.blocks(2)), [(1, 1), (1, 4), (2, 2), (2, 4)]
+        )
+        self.assertEqual(list(seat_map.blocks(3)), [(1, 4), (2, 2)])
+        self.assertEqual(list(seat_map.blocks(6)), [])
+        self.assertEqual(list(seat_map.blocks(7)), [])
+
+    def test_seats_left(self):
+        seat_map = SeatMap(1, rows=2, seats_in_row=3, taken=[(1, 1), (2, 3)])
+
+        self.assertEqual(seat_map.seats_left, 4)
+        self.assertTrue(seat_map.is_taken(2, 3))
+        self.assertFalse(seat_map.is_taken(2, 2))
+        self.assertEqual(
+            list(seat_map.free_seats()), [(1, 2), (1, 3), (2, 1), (2, 2)]
+        )
+
+
+class SeatAvailabilityApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_password",
+        )
+        self.client.force_authenticate(self.user)
+        order = Order.objects.create(user=self.user)
+
+        self.full_flight = sample_flight(
+            airplane=sample_airplane(rows=1, seats_in_row=4)
+        )
+        for seat in (2, 3):
+            Ticket.objects.create(
+                row=1, seat=seat, flight=self.full_flight, order=order
+            )
+        self.free_flight = sample_flight(
+            airplane=sample_airplane(rows=3, seats_in_row=4)
+        )
+
+    def test_availability_for_many_flights(self):
+        payload = {
+            "flights": [self.full_flight.id, self.free_flight.id, 0],
+            "party_size": 2,
+            "max_blocks": 2,
+        }
+
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                FLIGHT_AVAILABILITY_URL, payload, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        full, free, missing = response.data
+        self.assertFalse(full["available"])
+        self.assertEqual(full["seats_left"], 2)
+        self.assertEqual(full["blocks"], [])
+        self.assertTrue(free["available"])
+        self.assertEqual(
+            free["blocks"],
+            [{"row": 1, "seats": [1, 2]}, {"row": 1, "seats": [3, 4]}],
+        )
+        self.assertEqual(missing, {"flight": 0, "error": "Not found."})
+
+    def test_available_without_suggested_blocks(self):
+        payload = {
+            "flights": [self.free_flight.id],
+            "party_size": 4,
+            "max_blocks": 0,
+        }
+
+        response = self.client.post(
+            FLIGHT_AVAILABILITY_URL, payload, format="json"
+        )
+
+        self.assertTrue(response.data[0]["available"])
+        self.assertEqual(response.data[0]["blocks"], [])
+
+    def test_load_seat_maps(self):
+        seat_maps = load_seat_maps([self.full_flight.id])
+
+        self.assertEqual(list(seat_maps), [self.full_flight.id])
+        self.assertTrue(seat_maps[self.full_flight.id].is_taken(1, 2))
+
+
+class AutoAssignOrderApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_password",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight(
+            airplane=sample_airplane(rows=2, seats_in_row=4)
+        )
+        Ticket.objects.create(
+            row=1,
+            seat=2,
+            flight=self.flight,
+            order=Order.objects.create(user=self.user),
+        )
+
+    def auto_assign(self, party_size):
+        return self.client.post(
+            ORDER_LIST_URL,
+            {
+                "auto_assign": {
+                    "flight": self.flight.id,
+                    "party_size": party_size,
+                }
+            },
+            format="json",
+        )
+
+    def seats(self, response):
+        return [
+            (ticket["row"], ticket["seat"])
+            for ticket in response.data["tickets"]
+        ]
+
+    def test_auto_assign_contiguous_block(self):
+        response = self.auto_assign(3)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.seats(response), [(2, 1), (2, 2), (2, 3)])
+
+    def test_auto_assign_splits_group_when_no_block_fits(self):
+        self.auto_assign(4)
+
+        response = self.auto_assign(3)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.seats(response), [(1, 1), (1, 3), (1, 4)])
+
+    def test_auto_assign_not_enough_seats(self):
+        response = self.auto_assign(8)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("auto_assign", response.data)
+
+    def test_tickets_and_auto_assign_are_exclusive(self):
+        response = self.client.post(
+            ORDER_LIST_URL,
+            {
+                "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}],
+                "auto_assign": {"flight": self.flight.id, "party_size": 1},
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
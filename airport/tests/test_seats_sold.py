@@ -0,0 +1,175 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import Flight, Order, Ticket
+from airport.seating import load_seat_maps
+from airport.tests.test_airport_api import (
+    ORDER_LIST_URL,
+    sample_airplane,
+    sample_flight,
+)
+
+
+class SeatsSoldTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "test_password",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight(
+            airplane=sample_airplane(rows=1, seats_in_row=3)
+        )
+
+    def seats_sold(self):
+        self.flight.refresh_from_db()
+        return self.flight.seats_sold
+
+    def order(self, *seats):
+        return self.client.post(
+            ORDER_LIST_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": seat, "flight": self.flight.id}
+                    for seat in seats
+                ]
+            },
+            format="json",
+        )
+
+    def test_orders_count_seats(self):
+        self.assertEqual(self.order(1, 2).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.seats_sold(), 2)
+
+        Order.objects.get().delete()
+
+        self.assertEqual(self.seats_sold(), 0)
+
+    def test_tickets_created_directly_are_counted(self):
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            flight=self.flight,
+            order=Order.objects.create(user=self.user),
+        )
+
+        self.assertEqual(self.seats_sold(), 1)
+
+    def test_tickets_created_directly_respect_capacity(self):
+        Flight.objects.filter(id=self.flight.id).update(seats_sold=3)
+
+        with self.assertRaises(ValidationError):
+            Ticket.objects.create(
+                row=1,
+                seat=1,
+                flight=self.flight,
+                order=Order.objects.create(user=self.user),
+            )
+
+        self.assertFalse(Ticket.objects.exists())
+        self.assertEqual(self.seats_sold(), 3)
+
+    def test_failed_insert_returns_the_seat(self):
+        self.order(1)
+        ticket = Ticket(
+            row=1,
+            seat=1,
+            flight=self.flight,
+            order=Order.objects.create(user=self.user),
+        )
+
+        with self.assertRaises(IntegrityError):
+            # Skips the uniqueness check of full_clean.
+            with mock.patch.object(Ticket, "full_clean"):
+                ticket.save()
+
+        self.assertEqual(self.seats_sold(), 1)
+
+    def test_moving_a_ticket_moves_the_seat(self):
+        self.order(1)
+        other = sample_flight(airplane=self.flight.airplane)
+        ticket = Ticket.objects.get()
+
+        ticket.flight = other
+        ticket.save()
+        ticket.seat = 2
+        ticket.save()
+
+        other.refresh_from_db()
+        self.assertEqual(other.seats_sold, 1)
+        self.assertEqual(self.seats_sold(), 0)
+
+    def test_sold_out_flight_rejected_before_tickets(self):
+        Flight.objects.filter(id=self.flight.id).update(seats_sold=2)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.order(1, 2)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("tickets", response.data)
+        self.assertFalse(
+            [
+                query
+                for query in queries
+                if "INSERT" in query["sql"]
+                and "airport_ticket" in query["sql"]
+            ]
+        )
+        self.assertEqual(self.seats_sold(), 2)
+
+    def test_seat_maps_ignore_counter_drift(self):
+        self.order(1)
+        Flight.objects.filter(id=self.flight.id).update(seats_sold=0)
+
+        seat_map = load_seat_maps([self.flight.id])[self.flight.id]
+
+        self.assertTrue(seat_map.is_taken(1, 1))
+        self.assertEqual(seat_map.seats_left, 2)
+
+    def test_auto_assign_on_drifted_full_flight(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.bulk_create(
+            Ticket(row=1, seat=seat, flight=self.flight, order=order)
+            for seat in range(1, 4)
+        )
+
+        response = self.client.post(
+            ORDER_LIST_URL,
+            {"auto_assign": {"flight": self.flight.id, "party_size": 2}},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("auto_assign", response.data)
+        self.assertEqual(self.seats_sold(), 0)
+
+    def test_reconcile_repairs_drift(self):
+        self.order(1)
+        Flight.objects.filter(id=self.flight.id).update(seats_sold=3)
+        in_sync = sample_flight()
+
+        out = StringIO()
+        call_command("reconcile_seats_sold", "--dry-run", stdout=out)
+        self.assertIn(
+            f"Flight {self.flight.id}: seats_sold is 3, 1 tickets sold",
+            out.getvalue(),
+        )
+        self.assertNotIn(f"Flight {in_sync.id}:", out.getvalue())
+        self.assertEqual(self.seats_sold(), 3)
+
+        out = StringIO()
+        call_command("reconcile_seats_sold", "--batch-size", "1", stdout=out)
+        self.assertIn("Repaired 1 flights with drift", out.getvalue())
+        self.assertEqual(self.seats_sold(), 1)
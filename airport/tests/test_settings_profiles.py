@@ -0,0 +1,87 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+SCRIPT = """
+import json
+import django
+django.setup()
+from django.conf import settings
+from django.urls import NoReverseMatch, reverse
+try:
+    docs = bool(reverse("schema"))
+except NoReverseMatch:
+    docs = False
+print(json.dumps({
+    "debug": settings.DEBUG,
+    "apps": settings.INSTALLED_APPS,
+    "middleware": settings.MIDDLEWARE,
+    "loaders": settings.TEMPLATES[0]["OPTIONS"].get("loaders"),
+    "database": settings.DATABASES["default"]["ENGINE"],
+    "docs": docs,
+}))
+"""
+
+
+def load_profile(profile, **env):
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=settings.BASE_DIR,
+        env={
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "airport_api.settings",
+            "DJANGO_ENV": profile,
+            "SECRET_KEY": "test",
+            **env,
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output)
+
+
+class SettingsProfileTests(SimpleTestCase):
+    def test_development_has_debug_toolbar(self):
+        profile = load_profile("development")
+
+        self.assertTrue(profile["debug"])
+        self.assertIn("debug_toolbar", profile["apps"])
+        middleware = profile["middleware"]
+        toolbar = middleware.index(
+            "debug_toolbar.middleware.DebugToolbarMiddleware"
+        )
+        # Adds its panel before CompressionMiddleware compresses.
+        self.assertEqual(
+            middleware[toolbar - 1],
+            "airport_api.middleware.CompressionMiddleware",
+        )
+
+    def test_production_is_trimmed(self):
+        profile = load_profile("production")
+
+        self.assertFalse(profile["debug"])
+        self.assertNotIn("debug_toolbar", profile["apps"])
+        self.assertFalse(profile["docs"])
+        self.assertFalse(
+            any("debug_toolbar" in name for name in profile["middleware"])
+        )
+        self.assertEqual(
+            profile["loaders"][0][0], "django.template.loaders.cached.Loader"
+        )
+
+    def test_production_docs_can_be_enabled(self):
+        profile = load_profile("production", API_DOCS_ENABLED="true")
+
+        self.assertTrue(profile["docs"])
+
+    def test_test_profile_needs_no_database_server(self):
+        profile = load_profile("test")
+
+        self.assertFalse(profile["debug"])
+        self.assertEqual(profile["database"], "django.db.backends.sqlite3")
+        self.assertNotIn("debug_toolbar", profile["apps"])
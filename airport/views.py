@@ -1,11 +1,51 @@
-from datetime import datetime
-
-from rest_framework import mixins, viewsets
+import hashlib
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, connection, transaction
+from django.db.models import (
+    Count,
+    Exists,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Prefetch,
+    Q,
+    Sum,
+    Window,
+)
+from django.db.models.functions import (
+    Coalesce,
+    Greatest,
+    Lag,
+    Least,
+    TruncDate,
+)
+from django.utils import timezone
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
+from airport_api.db.routers import (
+    database_routing,
+    is_pinned_to_primary,
+    pin_to_primary,
+    route_reads_to_replica,
+)
+
+from .catalog import flight_catalog
+from .geo import nearest_airports
+from .jobs import enqueue_on_commit
 from .models import (
     Airport,
     AirplaneType,
@@ -14,17 +54,25 @@ from .models import (
     Route,
     Flight,
     Order,
+    Ticket,
+    ArchivedTicket,
+    IdempotencyKey,
 )
+from .seating import load_seat_maps
 from .permissions import IsAdminOrIfAuthenticatedReadOnly
 from .serializers import (
     AirplaneTypeSerializer,
     AirportSerializer,
+    NearestAirportSerializer,
+    NearestAirportQuerySerializer,
     CrewSerializer,
     OrderSerializer,
     OrderListSerializer,
+    OrderSummarySerializer,
     AirplaneSerializer,
     AirplaneListSerializer,
     AirplaneDetailSerializer,
+    AirplaneUtilizationSerializer,
     RouteSerializer,
     RouteListSerializer,
     RouteDetailSerializer,
@@ -32,6 +80,8 @@ from .serializers import (
     FlightListSerializer,
     FlightDetailSerializer,
     FlightCreateSerializer,
+    FlightBatchSerializer,
+    SeatAvailabilitySerializer,
 )
 
 
@@ -39,19 +89,154 @@ def _params_to_ints(qs):
     return [int(str_id) for str_id in qs.split(",")]
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+class IdempotentCreateMixin:
+    """
+    Honour the ``Idempotency-Key`` header on create: the first response
+    is stored with a fingerprint of the request, and retries with the
+    same key get that response back instead of creating a duplicate.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if not key:
+            return super().create(request, *args, **kwargs)
+
+        fingerprint = hashlib.sha256(
+            json.dumps(
+                request.data, sort_keys=True, cls=DjangoJSONEncoder
+            ).encode()
+        ).hexdigest()
+        keys = IdempotencyKey.objects.filter(user=request.user, key=key)
+        expired_before = timezone.now() - timedelta(
+            hours=settings.IDEMPOTENCY_KEY_TTL_HOURS
+        )
+        stored = keys.filter(created_at__gte=expired_before).first()
+        if stored:
+            return self._replay(stored, fingerprint)
+
+        with transaction.atomic():
+            # Keys past the TTL that aren't purged yet can be reused.
+            keys.filter(created_at__lt=expired_before).delete()
+            try:
+                with transaction.atomic():
+                    # Claims the key before doing the work. A retry sent
+                    # while this request is still running waits on the
+                    # unique (user, key) index until it commits, then
+                    # replays its response. The response is filled in
+                    # before then, so it's never seen empty.
+                    claim = IdempotencyKey.objects.create(
+                        user=request.user,
+                        key=key,
+                        fingerprint=fingerprint,
+                        response_status=0,
+                        response_body={},
+                    )
+            except IntegrityError:
+                stored = keys.first()
+                if stored is None:
+                    raise
+                return self._replay(stored, fingerprint)
+
+            response = super().create(request, *args, **kwargs)
+            claim.response_status = response.status_code
+            claim.response_body = response.data
+            claim.save(update_fields=["response_status", "response_body"])
+        return response
+
+    @staticmethod
+    def _replay(stored, fingerprint):
+        if stored.fingerprint != fingerprint:
+            return Response(
+                {
+                    "detail": "Idempotency-Key was already used "
+                    "for a different request."
+                },
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        return Response(
+            stored.response_body,
+            status=stored.response_status,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+
+def _params_to_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _to_hours(duration):
+    return round(duration.total_seconds() / 3600, 2)
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe-method reads from a read replica, except for users who
+    wrote recently and must see their own writes.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with database_routing():
+            return super().dispatch(request, *args, **kwargs)
+
+    # POST actions that only read, e.g. lookups too large for a query
+    # string.
+    read_only_actions = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            request.method not in SAFE_METHODS
+            and self.action not in self.read_only_actions
+        ):
+            pin_to_primary(request.user)
+        elif not is_pinned_to_primary(request.user):
+            route_reads_to_replica()
+
+
+class AirportViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
+    def get_serializer_class(self):
+        if self.action == "nearest":
+            return NearestAirportSerializer
+
+        return self.serializer_class
 
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+    @extend_schema(parameters=[NearestAirportQuerySerializer])
+    @action(detail=False, methods=["GET"])
+    def nearest(self, request):
+        """Airports with coordinates nearest to a point, nearest first."""
+        query = NearestAirportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        nearest = nearest_airports(
+            query.validated_data["lat"],
+            query.validated_data["lon"],
+            query.validated_data["count"],
+        )
+        airports = Airport.objects.in_bulk(
+            [airport_id for airport_id, _ in nearest]
+        )
+        result = []
+        for airport_id, distance in nearest:
+            # Skip airports deleted since the index was built.
+            airport = airports.get(airport_id)
+            if airport is not None:
+                airport.distance_km = round(distance, 1)
+                result.append(airport)
+        serializer = self.get_serializer(result, many=True)
+        return Response(serializer.data)
+
+
+class AirplaneTypeViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
 class CrewViewSet(
+    ReplicaReadMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet,
@@ -60,8 +245,26 @@ class CrewViewSet(
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
 
+    def get_serializer_class(self):
+        if self.action == "schedule":
+            return FlightListSerializer
 
-class RouteViewSet(viewsets.ModelViewSet):
+        return self.serializer_class
+
+    @action(detail=True, methods=["GET"])
+    def schedule(self, request, pk=None):
+        """Duty timeline of a crew member, ordered by departure."""
+        crew = self.get_object()
+        flights = (
+            Flight.objects.filter(crew=crew)
+            .select_related("route__source", "route__destination", "airplane")
+            .order_by("departure_time")
+        )
+        serializer = self.get_serializer(flights, many=True)
+        return Response(serializer.data)
+
+
+class RouteViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Route.objects.select_related("source", "destination")
     serializer_class = RouteSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
@@ -108,7 +311,7 @@ class RouteViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
+class AirplaneViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Airplane.objects.select_related("type")
     serializer_class = AirplaneSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
@@ -133,8 +336,97 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         if self.action == "retrieve":
             return AirplaneDetailSerializer
 
+        if self.action == "utilization":
+            return AirplaneUtilizationSerializer
+
         return self.serializer_class
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "date_from",
+                type=OpenApiTypes.DATE,
+                description="Only flights departing on or after this date",
+            ),
+            OpenApiParameter(
+                "date_to",
+                type=OpenApiTypes.DATE,
+                description="Only flights departing on or before this date",
+            ),
+        ]
+    )
+    @action(detail=True, methods=["GET"])
+    def utilization(self, request, pk=None):
+        """
+        Block hours per departure day and idle gaps between consecutive
+        flights, both computed in the database.
+        """
+        airplane = self.get_object()
+        flights = Flight.objects.filter(airplane=airplane)
+
+        date_from = request.query_params.get("date_from")
+        date_to = request.query_params.get("date_to")
+        if date_from:
+            flights = flights.filter(
+                departure_time__date__gte=_params_to_date(date_from)
+            )
+        if date_to:
+            flights = flights.filter(
+                departure_time__date__lte=_params_to_date(date_to)
+            )
+
+        days = (
+            flights.annotate(date=TruncDate("departure_time"))
+            .values("date")
+            .annotate(
+                flights=Count("id"),
+                block_time=Sum(F("arrival_time") - F("departure_time")),
+            )
+            .order_by("date")
+        )
+        timeline = (
+            flights.annotate(
+                previous_id=Window(Lag("id"), order_by="departure_time"),
+                previous_arrival=Window(
+                    Lag("arrival_time"), order_by="departure_time"
+                ),
+            )
+            .values("id", "departure_time", "previous_id", "previous_arrival")
+            .order_by("departure_time")
+        )
+
+        days = [
+            {
+                "date": day["date"],
+                "flights": day["flights"],
+                "block_hours": _to_hours(day["block_time"]),
+            }
+            for day in days
+        ]
+        idle_gaps = [
+            {
+                "after_flight": flight["previous_id"],
+                "before_flight": flight["id"],
+                "start": flight["previous_arrival"],
+                "end": flight["departure_time"],
+                "hours": _to_hours(
+                    flight["departure_time"] - flight["previous_arrival"]
+                ),
+            }
+            for flight in timeline
+            if flight["previous_id"] is not None
+        ]
+        serializer = self.get_serializer(
+            {
+                "block_hours": round(
+                    sum(day["block_hours"] for day in days), 2
+                ),
+                "days": days,
+                "idle_gaps": idle_gaps,
+            }
+        )
+        return Response(serializer.data)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -154,33 +446,71 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class FlightViewSet(viewsets.ModelViewSet):
+class FlightViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Flight.objects.select_related(
         "route__source", "route__destination", "airplane"
     ).prefetch_related("crew")
     serializer_class = FlightSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    read_only_actions = ("batch", "availability")
 
-    def get_queryset(self):
+    def _search_filters(self):
+        """Return the route id, departure date and arrival date filters."""
         arrival_time = self.request.query_params.get("arrival_time")
         departure_time = self.request.query_params.get("departure_time")
         route_id_str = self.request.query_params.get("route")
 
-        queryset = self.queryset
+        route_id = departure_date = arrival_date = None
 
         if arrival_time:
-            date = datetime.strptime(arrival_time, "%Y-%m-%d").date()
-            queryset = queryset.filter(arrival_time__date=date)
+            arrival_date = datetime.strptime(arrival_time, "%Y-%m-%d").date()
 
         if departure_time:
-            date = datetime.strptime(departure_time, "%Y-%m-%d").date()
-            queryset = queryset.filter(departure_time__date=date)
+            departure_date = datetime.strptime(
+                departure_time, "%Y-%m-%d"
+            ).date()
 
         if route_id_str:
-            queryset = queryset.filter(route_id=int(route_id_str))
+            route_id = int(route_id_str)
+
+        return route_id, departure_date, arrival_date
+
+    def get_queryset(self):
+        route_id, departure_date, arrival_date = self._search_filters()
+
+        queryset = self.queryset
+
+        if arrival_date:
+            queryset = queryset.filter(arrival_time__date=arrival_date)
+
+        if departure_date:
+            queryset = queryset.filter(departure_time__date=departure_date)
+
+        if route_id:
+            queryset = queryset.filter(route_id=route_id)
+
+        if self.action in ("retrieve", "batch"):
+            queryset = queryset.select_related(
+                "airplane__type"
+            ).prefetch_related(
+                Prefetch(
+                    "tickets",
+                    queryset=Ticket.objects.order_by("row", "seat"),
+                )
+            )
 
         return queryset
 
+    # FlightCreateSerializer locks the airplane and crew while checking
+    # them for conflicts, until the flight is saved.
+    @transaction.atomic
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
     def get_serializer_class(self):
         if self.action == "list":
             return FlightListSerializer
@@ -188,11 +518,120 @@ class FlightViewSet(viewsets.ModelViewSet):
         if self.action == "retrieve":
             return FlightDetailSerializer
 
-        if self.action == "create":
+        if self.action in ("create", "update", "partial_update"):
             return FlightCreateSerializer
 
+        if self.action == "batch":
+            return FlightBatchSerializer
+
+        if self.action == "availability":
+            return SeatAvailabilitySerializer
+
         return self.serializer_class
 
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    @action(
+        detail=False,
+        methods=["POST"],
+        permission_classes=(IsAuthenticated,),
+    )
+    def availability(self, request):
+        """
+        Check whether each flight has ``party_size`` adjacent free seats
+        in one row and suggest up to ``max_blocks`` such blocks.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        flight_ids = serializer.validated_data["flights"]
+        party_size = serializer.validated_data["party_size"]
+        max_blocks = serializer.validated_data["max_blocks"]
+
+        seat_maps = load_seat_maps(flight_ids)
+        results = []
+        for flight_id in flight_ids:
+            seat_map = seat_maps.get(flight_id)
+            if seat_map is None:
+                results.append({"flight": flight_id, "error": "Not found."})
+                continue
+
+            # One block is enough to answer availability.
+            blocks = [
+                {
+                    "row": row,
+                    "seats": list(range(first_seat, first_seat + party_size)),
+                }
+                for row, first_seat in islice(
+                    seat_map.blocks(party_size), max(max_blocks, 1)
+                )
+            ]
+            results.append(
+                {
+                    "flight": flight_id,
+                    "available": bool(blocks),
+                    "seats_left": seat_map.seats_left,
+                    "blocks": blocks[:max_blocks],
+                }
+            )
+        return Response(results)
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    @action(
+        detail=False,
+        methods=["POST"],
+        permission_classes=(IsAuthenticated,),
+    )
+    def batch(self, request):
+        """
+        Resolve many flights by id and by (route, departure date) in one
+        pass. Ids that don't exist are reported per item.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+        lookups = serializer.validated_data["lookups"]
+
+        condition = Q(id__in=ids)
+        for lookup in lookups:
+            condition |= Q(
+                route_id=lookup["route"],
+                departure_time__date=lookup["date"],
+            )
+        flights = (
+            self.get_queryset().filter(condition).order_by("departure_time")
+        )
+        serialized = {
+            flight["id"]: flight
+            for flight in FlightDetailSerializer(flights, many=True).data
+        }
+
+        by_lookup = defaultdict(list)
+        for flight in flights:
+            departure_date = timezone.localtime(flight.departure_time).date()
+            by_lookup[(flight.route_id, departure_date)].append(
+                serialized[flight.id]
+            )
+
+        return Response(
+            {
+                "flights": [
+                    {"id": flight_id, "flight": serialized[flight_id]}
+                    if flight_id in serialized
+                    else {"id": flight_id, "error": "Not found."}
+                    for flight_id in ids
+                ],
+                "lookups": [
+                    {
+                        "route": lookup["route"],
+                        "date": lookup["date"],
+                        "flights": by_lookup[
+                            (lookup["route"], lookup["date"])
+                        ],
+                    }
+                    for lookup in lookups
+                ],
+            }
+        )
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -219,15 +658,43 @@ class FlightViewSet(viewsets.ModelViewSet):
         ]
     )
     def list(self, request, *args, **kwargs):
+        if settings.FLIGHT_CATALOG_ENABLED:
+            route_id, departure_date, arrival_date = self._search_filters()
+            flights = flight_catalog.search(
+                departure_date, route_id=route_id, arrival_date=arrival_date
+            )
+            if flights is not None:
+                serializer = self.get_serializer(
+                    flights,
+                    many=True,
+                    context={
+                        **self.get_serializer_context(),
+                        "fares": flight_catalog.fares(flights),
+                    },
+                )
+                return Response(serializer.data)
+
         return super().list(request, *args, **kwargs)
 
 
+def _over_all_tickets(function, aggregate, field):
+    """
+    Combine ``aggregate`` of ``field`` over live and archived tickets
+    with ``function``, ignoring a side without tickets.
+    """
+    live = aggregate(f"tickets__{field}")
+    archived = aggregate(f"archived_tickets__{field}")
+    return function(Coalesce(live, archived), Coalesce(archived, live))
+
+
 class OrderPagination(PageNumberPagination):
     page_size = 10
     max_page_size = 100
 
 
 class OrderViewSet(
+    ReplicaReadMixin,
+    IdempotentCreateMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     viewsets.GenericViewSet,
@@ -241,13 +708,126 @@ class OrderViewSet(
     pagination_class = OrderPagination
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        queryset = Order.objects.filter(user=self.request.user).order_by(
+            "-created_at"
+        )
+        if self.action == "list":
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "tickets",
+                    queryset=Ticket.objects.select_related("flight").order_by(
+                        "row", "seat", "id"
+                    ),
+                ),
+                Prefetch(
+                    "archived_tickets",
+                    queryset=ArchivedTicket.objects.select_related(
+                        "flight"
+                    ).order_by("row", "seat", "id"),
+                ),
+            )
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
             return OrderListSerializer
 
+        if self.action == "summary":
+            return OrderSummarySerializer
+
         return self.serializer_class
 
+    @staticmethod
+    def _attach_flight_ids(orders):
+        flight_ids = defaultdict(list)
+        # UNION drops duplicates; archived flights keep their ids.
+        tickets = (
+            Ticket.objects.filter(order__in=orders)
+            .values_list("order_id", "flight_id")
+            .union(
+                ArchivedTicket.objects.filter(order__in=orders).values_list(
+                    "order_id", "flight_id"
+                )
+            )
+            .order_by("order_id", "flight_id")
+        )
+        for order_id, flight_id in tickets:
+            flight_ids[order_id].append(flight_id)
+        for order in orders:
+            order.flights = flight_ids[order.id]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "upcoming",
+                type=OpenApiTypes.BOOL,
+                description=(
+                    "Only orders with flights that have not departed yet "
+                    "(ex. ?upcoming=true)"
+                ),
+            ),
+        ]
+    )
+    @action(detail=False, methods=["GET"])
+    def summary(self, request):
+        """
+        Per-order totals over live and archived tickets. Both relations
+        are joined at once, so tickets are counted distinct.
+        """
+        queryset = (
+            self.get_queryset()
+            .annotate(
+                tickets_count=Count("tickets", distinct=True)
+                + Count("archived_tickets", distinct=True),
+                first_departure=_over_all_tickets(
+                    Least, Min, "flight__departure_time"
+                ),
+                last_arrival=_over_all_tickets(
+                    Greatest, Max, "flight__arrival_time"
+                ),
+            )
+            .order_by("-created_at")
+        )
+
+        if request.query_params.get("upcoming") in ("true", "1"):
+            queryset = queryset.filter(
+                Exists(
+                    Ticket.objects.filter(
+                        order=OuterRef("pk"),
+                        flight__departure_time__gte=timezone.now(),
+                    )
+                )
+            )
+
+        postgresql = connection.vendor == "postgresql"
+        if postgresql:
+            queryset = queryset.annotate(
+                flights=ArrayAgg(
+                    "tickets__flight",
+                    distinct=True,
+                    ordering="tickets__flight",
+                    filter=Q(tickets__isnull=False),
+                    default=[],
+                ),
+                archived_flights=ArrayAgg(
+                    "archived_tickets__flight",
+                    distinct=True,
+                    ordering="archived_tickets__flight",
+                    filter=Q(archived_tickets__isnull=False),
+                    default=[],
+                ),
+            )
+
+        page = self.paginate_queryset(queryset)
+        if postgresql:
+            for order in page:
+                order.flights = sorted(order.flights + order.archived_flights)
+        else:
+            self._attach_flight_ids(page)
+
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        order = serializer.save(user=self.request.user)
+        enqueue_on_commit("send_order_confirmation", order_id=order.id)
@@ -0,0 +1,140 @@
+import threading
+import time
+
+import psycopg2.extras
+from psycopg2 import pool
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolExhausted(psycopg2.OperationalError):
+    pass
+
+
+class BoundedConnectionPool(pool.ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool whose getconn waits up to ``timeout`` seconds
+    for one of the ``maxconn`` connections to be returned, then raises
+    PoolExhausted, instead of failing at once with PoolError.
+
+    Connections idle in the pool for ``health_check_after`` seconds or
+    more are checked with ``SELECT 1`` before they are handed out, and
+    replaced when the server has dropped them, e.g. after a restart or
+    a failover. ``None`` turns the check off.
+    """
+
+    def __init__(
+        self,
+        minconn,
+        maxconn,
+        *args,
+        timeout=5,
+        health_check_after=None,
+        **kwargs,
+    ):
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._returned_at = {}
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolExhausted(
+                f"No database connection was returned to the pool within "
+                f"{self.timeout} s, all {self.maxconn} are in use."
+            )
+        try:
+            while True:
+                conn = super().getconn(key)
+                if self._is_usable(conn):
+                    return conn
+                # Replaced by another idle connection or a new one.
+                super().putconn(conn, key, close=True)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _is_usable(self, conn):
+        returned_at = self._returned_at.pop(id(conn), None)
+        if conn.closed:
+            return False
+        if (
+            returned_at is None
+            or self.health_check_after is None
+            or time.monotonic() - returned_at < self.health_check_after
+        ):
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            # Ends the transaction the check opened without autocommit.
+            conn.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def putconn(self, conn=None, key=None, close=False):
+        self._returned_at[id(conn)] = time.monotonic()
+        super().putconn(conn, key, close)
+        if conn.closed:
+            self._returned_at.pop(id(conn), None)
+        self._slots.release()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend that hands connections back to a process-wide
+    pool instead of closing them, so ASGI workers don't pay a connect
+    and auth handshake per request.
+    """
+
+    def get_pool(self, conn_params):
+        with _pools_lock:
+            connection_pool = _pools.get(self.alias)
+            if connection_pool is None:
+                pool_settings = self.settings_dict.get("POOL", {})
+                connection_pool = BoundedConnectionPool(
+                    pool_settings.get("MIN_SIZE", 1),
+                    pool_settings.get("MAX_SIZE", 10),
+                    timeout=pool_settings.get("TIMEOUT", 5),
+                    # CONN_MAX_AGE is 0 with the pool, which turns
+                    # Django's own health checks off.
+                    health_check_after=(
+                        pool_settings.get("HEALTH_CHECK_AFTER", 1)
+                        if self.settings_dict["CONN_HEALTH_CHECKS"]
+                        else None
+                    ),
+                    **conn_params,
+                )
+                _pools[self.alias] = connection_pool
+            return connection_pool
+
+    def get_new_connection(self, conn_params):
+        # Raises PoolExhausted, reported as django.db.OperationalError,
+        # when no connection is free within POOL["TIMEOUT"] seconds.
+        connection = self.get_pool(conn_params).getconn()
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        if isolation_level is None:
+            self.isolation_level = IsolationLevel.READ_COMMITTED
+        else:
+            self.isolation_level = IsolationLevel(isolation_level)
+            connection.isolation_level = self.isolation_level
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            connection_pool = _pools.get(self.alias)
+            with self.wrap_database_errors:
+                if connection_pool is None:
+                    return self.connection.close()
+                connection_pool.putconn(
+                    self.connection,
+                    close=self.connection.closed or self.errors_occurred,
+                )
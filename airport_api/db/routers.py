@@ -0,0 +1,61 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+_read_database = ContextVar("read_database", default=None)
+
+
+def _primary_pin_key(user):
+    return f"db:primary-pin:{user.pk}"
+
+
+def pin_to_primary(user):
+    """Send the user's reads to the primary until replicas catch up."""
+    if user and user.is_authenticated:
+        cache.set(
+            _primary_pin_key(user), True, settings.READ_YOUR_WRITES_SECONDS
+        )
+
+
+def is_pinned_to_primary(user):
+    if not user or not user.is_authenticated:
+        return False
+    return cache.get(_primary_pin_key(user), False)
+
+
+@contextmanager
+def database_routing():
+    token = _read_database.set(None)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+def route_reads_to_replica():
+    """
+    Route reads made inside the current ``database_routing`` block to
+    one of the configured replicas.
+    """
+    replicas = settings.READ_REPLICA_DATABASES
+    if replicas:
+        _read_database.set(random.choice(replicas))
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the primary's rows, so objects read from any of
+        # them relate; others are left to the remaining routers.
+        databases = {"default", *settings.READ_REPLICA_DATABASES}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
@@ -0,0 +1,60 @@
+import logging
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.db.utils import DatabaseError
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+
+logger = logging.getLogger(__name__)
+
+# Applied migrations can't become unapplied, so the migration graph
+# is only loaded until the first successful check.
+_migrations_applied = False
+
+
+class PendingMigrations(DatabaseError):
+    pass
+
+
+def pending_migrations(connection):
+    executor = MigrationExecutor(connection)
+    return executor.migration_plan(executor.loader.graph.leaf_nodes())
+
+
+def check_database(alias=DEFAULT_DB_ALIAS, check_migrations=False):
+    """Raise ``DatabaseError`` unless the database can serve requests."""
+    global _migrations_applied
+
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+
+    if check_migrations and not _migrations_applied:
+        if pending_migrations(connection):
+            raise PendingMigrations("Database has unapplied migrations")
+        _migrations_applied = True
+
+
+@never_cache
+def healthz(request):
+    return JsonResponse({"status": "ok"})
+
+
+@never_cache
+def readyz(request):
+    try:
+        check_database(check_migrations=True)
+    except DatabaseError as error:
+        # The error names hosts and ports, which this unauthenticated
+        # endpoint must not show.
+        logger.warning("Readiness check failed: %s", error)
+        if isinstance(error, PendingMigrations):
+            reason = "pending migrations"
+        else:
+            reason = "database unavailable"
+        return JsonResponse(
+            {"status": "unavailable", "reason": reason}, status=503
+        )
+    return JsonResponse({"status": "ok"})
@@ -0,0 +1,240 @@
+"""
+Response compression.
+
+Responses are compressed with the first of COMPRESSION_ENCODINGS that
+the client accepts and that is available: gzip always, brotli and zstd
+when the ``brotli`` and ``zstandard`` packages are installed. Bodies
+smaller than COMPRESSION_MIN_SIZE bytes go out as they are, because
+they barely shrink and compressing them still costs CPU. Streaming
+responses are compressed chunk by chunk and flushed after each chunk.
+
+Views change the threshold, or opt out with ``None``, through a
+``compression_min_size`` attribute: set it on DRF view classes or with
+the ``compression_min_size`` decorator on function views.
+
+Like Django's GZipMiddleware, gzip output carries a file name of random
+length in its header, which mitigates BREACH by making the compressed
+length of a secret vary between responses. brotli and zstd have no
+such field, so responses that may embed a CSRF token are only ever
+compressed with gzip.
+"""
+import gzip
+import secrets
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Levels trading ratio for speed, as suits responses compressed on
+# every request.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+# Upper bound of the random gzip file name, as in GZipMiddleware.
+GZIP_MAX_RANDOM_BYTES = 100
+
+
+def _randomize_gzip_header(compressed):
+    """Insert a file name of random length after the 10-byte header."""
+    header = bytearray(compressed[:10])
+    header[3] = gzip.FNAME
+    name = b"a" * secrets.randbelow(GZIP_MAX_RANDOM_BYTES) + b"\x00"
+    return bytes(header) + name + compressed[10:]
+
+
+def _gzip_compress(content):
+    return _randomize_gzip_header(gzip.compress(content, GZIP_LEVEL, mtime=0))
+
+
+def _gzip_stream():
+    compressor = zlib.compressobj(
+        GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+    )
+    header_sent = False
+
+    def compress(chunk):
+        nonlocal header_sent
+        # A sync flush always emits output, starting with the header.
+        compressed = compressor.compress(chunk) + compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+        if not header_sent:
+            header_sent = True
+            compressed = _randomize_gzip_header(compressed)
+        return compressed
+
+    def finish():
+        compressed = compressor.flush()
+        if not header_sent:
+            compressed = _randomize_gzip_header(compressed)
+        return compressed
+
+    return compress, finish
+
+
+def _brotli_stream():
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    return (
+        lambda chunk: compressor.process(chunk) + compressor.flush(),
+        compressor.finish,
+    )
+
+
+def _zstd_stream():
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    return (
+        lambda chunk: compressor.compress(chunk)
+        + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+        compressor.flush,
+    )
+
+
+# Content-Encoding: (compress a body, start compressing a stream, which
+# returns functions compressing a chunk and ending the stream).
+ENCODERS = {"gzip": (_gzip_compress, _gzip_stream)}
+if brotli is not None:
+    ENCODERS["br"] = (
+        lambda content: brotli.compress(content, quality=BROTLI_QUALITY),
+        _brotli_stream,
+    )
+if zstandard is not None:
+    ENCODERS["zstd"] = (
+        zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress,
+        _zstd_stream,
+    )
+
+
+def compression_min_size(size):
+    """
+    Set the smallest response body of a view that is compressed, or
+    disable compression with ``None``.
+    """
+
+    def decorator(view):
+        view.compression_min_size = size
+        return view
+
+    return decorator
+
+
+def accepted_encodings(header):
+    """Return ``{encoding: quality}`` from an Accept-Encoding header."""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name.strip():
+            accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(header, encodings=None):
+    """
+    Return the first of ``encodings`` (COMPRESSION_ENCODINGS by default)
+    that is available and accepted by the Accept-Encoding ``header``.
+    """
+    accepted = accepted_encodings(header)
+    if encodings is None:
+        encodings = settings.COMPRESSION_ENCODINGS
+    for encoding in encodings:
+        if encoding in ENCODERS and accepted.get(
+            encoding, accepted.get("*", 0)
+        ):
+            return encoding
+    return None
+
+
+def _compress_stream(iterator, start):
+    compress, finish = start()
+    for chunk in iterator:
+        compressed = compress(chunk)
+        if compressed:
+            yield compressed
+    yield finish()
+
+
+async def _compress_async_stream(iterator, start):
+    compress, finish = start()
+    async for chunk in iterator:
+        compressed = compress(chunk)
+        if compressed:
+            yield compressed
+    yield finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        min_size = getattr(
+            view_func, "compression_min_size", settings.COMPRESSION_MIN_SIZE
+        )
+        # DRF views keep their class on the view function.
+        view_class = getattr(view_func, "cls", None)
+        request.compression_min_size = getattr(
+            view_class, "compression_min_size", min_size
+        )
+
+    def process_response(self, request, response):
+        min_size = getattr(
+            request, "compression_min_size", settings.COMPRESSION_MIN_SIZE
+        )
+        # 304s revalidating a cached ETag have no body to compress.
+        if (
+            min_size is None
+            or response.status_code == 304
+            or response.has_header("Content-Encoding")
+            or (not response.streaming and len(response.content) < min_size)
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encodings = settings.COMPRESSION_ENCODINGS
+        # Set by get_token(), e.g. for a form with a CSRF token.
+        if "CSRF_COOKIE_NEEDS_UPDATE" in request.META:
+            encodings = [name for name in encodings if name == "gzip"]
+        encoding = choose_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", ""), encodings
+        )
+        if encoding is None:
+            return response
+
+        compress, start = ENCODERS[encoding]
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _compress_async_stream(
+                    response.streaming_content, start
+                )
+            else:
+                response.streaming_content = _compress_stream(
+                    response.streaming_content, start
+                )
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The compressed bytes differ, so a strong ETag becomes weak.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
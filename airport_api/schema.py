@@ -0,0 +1,72 @@
+"""
+Pre-generated OpenAPI schema.
+
+Generating the schema introspects every viewset and takes hundreds of
+milliseconds, so it is built once, by ``manage.py build_schema`` or on
+the first request when no built file exists, kept in memory and served
+with an ETag so clients only download it again after it changes. With
+DEBUG on, the file is ignored and each process generates the schema
+from the code it runs.
+"""
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import condition, require_safe
+from drf_spectacular.renderers import OpenApiJsonRenderer
+from drf_spectacular.settings import spectacular_settings
+
+_schema = None
+
+
+def schema_path():
+    version = settings.SPECTACULAR_SETTINGS["VERSION"]
+    return settings.OPENAPI_SCHEMA_DIR / f"schema-{version}.json"
+
+
+def generate_schema():
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return OpenApiJsonRenderer().render(schema, renderer_context={})
+
+
+def build_schema():
+    """Write the schema to its versioned file and return the path."""
+    global _schema
+    path = schema_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(generate_schema())
+    _schema = None
+    return path
+
+
+def load_schema():
+    """Return ``(content, etag)`` of the schema, loading it once."""
+    global _schema
+    if _schema is None:
+        content = None
+        if not settings.DEBUG:
+            try:
+                content = schema_path().read_bytes()
+            except FileNotFoundError:
+                pass
+        if content is None:
+            content = generate_schema()
+        _schema = content, f'"{hashlib.sha256(content).hexdigest()}"'
+    return _schema
+
+
+def _schema_etag(request):
+    return load_schema()[1]
+
+
+@require_safe
+@condition(etag_func=_schema_etag)
+def schema_view(request):
+    content, _ = load_schema()
+    response = HttpResponse(
+        content, content_type="application/vnd.oai.openapi+json"
+    )
+    max_age = settings.OPENAPI_SCHEMA_MAX_AGE
+    response["Cache-Control"] = f"public, max-age={max_age}"
+    return response
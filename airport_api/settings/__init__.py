@@ -0,0 +1,23 @@
+"""
+Settings profile selected by the DJANGO_ENV environment variable:
+``development`` (the default), ``production`` or ``test`` (the default
+of ``manage.py test``). A profile can also be chosen directly with
+DJANGO_SETTINGS_MODULE=airport_api.settings.<name>.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+DJANGO_ENV = os.environ.get("DJANGO_ENV", "development")
+
+if DJANGO_ENV == "development":
+    from .development import *  # noqa: F401, F403
+elif DJANGO_ENV == "production":
+    from .production import *  # noqa: F401, F403
+elif DJANGO_ENV == "test":
+    from .test import *  # noqa: F401, F403
+else:
+    raise ImproperlyConfigured(
+        f"Unknown DJANGO_ENV {DJANGO_ENV!r}, "
+        f"expected 'development', 'production' or 'test'"
+    )
@@ -0,0 +1,279 @@
+import os
+from datetime import timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def _env_list(name, default=""):
+    """Items of a comma-separated environment variable, stripped."""
+    items = os.environ.get(name, default).split(",")
+    return [item.strip() for item in items if item.strip()]
+
+
+SECRET_KEY = os.environ.get("SECRET_KEY")
+
+DEBUG = False
+
+ALLOWED_HOSTS = []
+
+# Serve the OpenAPI schema, Swagger and Redoc under /api/doc/.
+API_DOCS_ENABLED = True
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "rest_framework",
+    "drf_spectacular",
+    "airport",
+    "user",
+]
+
+MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "airport_api.middleware.CompressionMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "user.middleware.PasswordHashingBusyMiddleware",
+]
+
+ROOT_URLCONF = "airport_api.urls"
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = "airport_api.wsgi.application"
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.postgresql",
+        "HOST": os.environ.get("POSTGRES_HOST"),
+        "NAME": os.environ.get("POSTGRES_DB"),
+        "USER": os.environ.get("POSTGRES_USER"),
+        "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
+        "PORT": os.environ.get("POSTGRES_PORT", ""),
+        "CONN_MAX_AGE": int(os.environ.get("POSTGRES_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": (
+            os.environ.get("POSTGRES_CONN_HEALTH_CHECKS", "true").lower()
+            == "true"
+        ),
+        "OPTIONS": {
+            "connect_timeout": int(
+                os.environ.get("POSTGRES_CONNECT_TIMEOUT", 5)
+            ),
+        },
+    }
+}
+
+# Optional in-process pool for the ASGI path, where persistent
+# connections are tied to short-lived threads and can't be reused.
+POSTGRES_POOL_MAX_SIZE = int(os.environ.get("POSTGRES_POOL_MAX_SIZE", 0))
+
+if POSTGRES_POOL_MAX_SIZE:
+    DATABASES["default"].update(
+        {
+            "ENGINE": "airport_api.db.postgresql_pool",
+            "CONN_MAX_AGE": 0,
+            "POOL": {
+                "MIN_SIZE": int(os.environ.get("POSTGRES_POOL_MIN_SIZE", 1)),
+                "MAX_SIZE": POSTGRES_POOL_MAX_SIZE,
+                # Seconds to wait for a free connection.
+                "TIMEOUT": float(os.environ.get("POSTGRES_POOL_TIMEOUT", 5)),
+                # Seconds a connection can be idle before it's checked
+                # when handed out, with POSTGRES_CONN_HEALTH_CHECKS.
+                "HEALTH_CHECK_AFTER": float(
+                    os.environ.get("POSTGRES_POOL_HEALTH_CHECK_AFTER", 1)
+                ),
+            },
+        }
+    )
+
+# Comma-separated hosts of read replicas of the default database.
+# Safe-method reads from the airport API are spread across them.
+READ_REPLICA_DATABASES = []
+
+for index, host in enumerate(_env_list("POSTGRES_REPLICA_HOSTS")):
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
+    }
+    READ_REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["airport_api.db.routers.ReplicaRouter"]
+
+# Seconds a user keeps reading from the primary after a write.
+READ_YOUR_WRITES_SECONDS = int(os.environ.get("READ_YOUR_WRITES_SECONDS", 5))
+
+# Must be shared between workers (e.g. Redis) for replica pinning
+# and other cached state to be consistent across processes.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+# Seconds cached flight load factors and fares are kept.
+FARE_CACHE_TIMEOUT = int(os.environ.get("FARE_CACHE_TIMEOUT", 300))
+
+# Hours stored Idempotency-Key responses are kept before being purged.
+IDEMPOTENCY_KEY_TTL_HOURS = int(
+    os.environ.get("IDEMPOTENCY_KEY_TTL_HOURS", 24)
+)
+
+# Background jobs (python manage.py run_workers).
+JOB_WORKER_PROCESSES = int(os.environ.get("JOB_WORKER_PROCESSES", 2))
+# Seconds after which a job still marked running is assumed lost.
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", 300))
+
+EMAIL_BACKEND = os.environ.get(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+
+# Most flights resolved by one POST /flights/batch/ request.
+FLIGHT_BATCH_MAX_SIZE = int(os.environ.get("FLIGHT_BATCH_MAX_SIZE", 200))
+
+# Serve flight searches by departure date from a per-process in-memory
+# catalog (see airport.catalog), at most FLIGHT_CATALOG_MAX_STALENESS
+# seconds behind the database.
+FLIGHT_CATALOG_ENABLED = (
+    os.environ.get("FLIGHT_CATALOG_ENABLED", "false").lower() == "true"
+)
+FLIGHT_CATALOG_MAX_STALENESS = float(
+    os.environ.get("FLIGHT_CATALOG_MAX_STALENESS", 5)
+)
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
+    },
+]
+
+# The first hasher hashes new passwords; the others only verify old
+# hashes, which are upgraded on the next login.
+PASSWORD_HASHERS = [
+    "user.hashing.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+PASSWORD_HASH_ITERATIONS = int(
+    os.environ.get("PASSWORD_HASH_ITERATIONS", 600_000)
+)
+# Threads per process computing password hashes, callers allowed to
+# queue for them, and seconds a caller waits before getting a 503.
+PASSWORD_HASH_WORKERS = int(
+    os.environ.get("PASSWORD_HASH_WORKERS") or os.cpu_count() or 1
+)
+PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get("PASSWORD_HASH_QUEUE_SIZE", 64))
+PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 5))
+
+LANGUAGE_CODE = "en-us"
+
+TIME_ZONE = "UTC"
+
+USE_I18N = True
+
+USE_TZ = True
+
+STATIC_URL = "static/"
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+AUTH_USER_MODEL = "user.User"
+
+REST_FRAMEWORK = {
+    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_THROTTLE_CLASSES": [
+        "rest_framework.throttling.AnonRateThrottle",
+        "rest_framework.throttling.UserRateThrottle",
+    ],
+    "DEFAULT_THROTTLE_RATES": {"anon": "10/day", "user": "30/day"},
+    "DEFAULT_AUTHENTICATION_CLASSES": (
+        "user.authentication.RevocableJWTAuthentication",
+    ),
+    "EXCEPTION_HANDLER": "user.exceptions.exception_handler",
+}
+
+SPECTACULAR_SETTINGS = {
+    "TITLE": "Cinema Service API",
+    "DESCRIPTION": "Order cinema tickets",
+    "VERSION": "1.0.0",
+    "SERVE_INCLUDE_SCHEMA": False,
+    "SWAGGER_UI_SETTINGS": {
+        "deepLinking": True,
+        "defaultModelRendering": "model",
+        "defaultModelsExpandDepth": 2,
+        "defaultModelExpandDepth": 2,
+    },
+}
+
+# Response compression, see airport_api.middleware. Encodings in order
+# of preference; br and zstd need the brotli and zstandard packages.
+COMPRESSION_ENCODINGS = [
+    name.lower() for name in _env_list("COMPRESSION_ENCODINGS", "zstd,br,gzip")
+]
+# Smallest response body in bytes that is compressed.
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+
+# Pre-generated schema served at /api/doc/, see airport_api.schema.
+OPENAPI_SCHEMA_DIR = Path(
+    os.environ.get("OPENAPI_SCHEMA_DIR", BASE_DIR / "openapi")
+)
+# Seconds clients may use their copy of the schema without revalidating.
+OPENAPI_SCHEMA_MAX_AGE = int(os.environ.get("OPENAPI_SCHEMA_MAX_AGE", 86400))
+
+SIMPLE_JWT = {
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": (
+        "user.seriallizers.RevocableTokenObtainPairSerializer"
+    ),
+    "TOKEN_REFRESH_SERIALIZER": (
+        "user.seriallizers.RevocableTokenRefreshSerializer"
+    ),
+    "TOKEN_VERIFY_SERIALIZER": (
+        "user.seriallizers.RevocableTokenVerifySerializer"
+    ),
+}
+
+# Seconds before a token revoked by another worker is rejected here.
+TOKEN_REVOCATION_SYNC_SECONDS = int(
+    os.environ.get("TOKEN_REVOCATION_SYNC_SECONDS", 5)
+)
@@ -0,0 +1,21 @@
+from .base import *  # noqa: F401, F403
+from .base import INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = True
+
+INSTALLED_APPS = INSTALLED_APPS + ["debug_toolbar"]
+
+# After CompressionMiddleware, so the toolbar is added before the
+# response is compressed.
+_toolbar_index = (
+    MIDDLEWARE.index("airport_api.middleware.CompressionMiddleware") + 1
+)
+MIDDLEWARE = (
+    MIDDLEWARE[:_toolbar_index]
+    + ["debug_toolbar.middleware.DebugToolbarMiddleware"]
+    + MIDDLEWARE[_toolbar_index:]
+)
+
+INTERNAL_IPS = [
+    "127.0.0.1",
+]
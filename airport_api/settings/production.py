@@ -0,0 +1,37 @@
+import os
+
+from .base import *  # noqa: F401, F403
+from .base import TEMPLATES
+
+DEBUG = False
+
+ALLOWED_HOSTS = list(
+    filter(None, os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(","))
+)
+
+# The schema and docs views are routed only when wanted in this
+# deployment. drf_spectacular stays installed: views declare their
+# schema with it and DRF uses its AutoSchema.
+API_DOCS_ENABLED = (
+    os.environ.get("API_DOCS_ENABLED", "false").lower() == "true"
+)
+
+# Compile each template once per process instead of on every render.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "APP_DIRS": False,
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
+        },
+    },
+]
@@ -0,0 +1,47 @@
+import os
+
+from . import base
+from .base import *  # noqa: F401, F403
+from .base import SECRET_KEY
+
+DEBUG = False
+
+SECRET_KEY = SECRET_KEY or "test"
+
+# With POSTGRES_HOST set, tests run against PostgreSQL as configured in
+# base, which also exercises the PostgreSQL-only code paths. Otherwise
+# they use in-memory SQLite: no database server needed, and every
+# `manage.py test --parallel` worker gets its own copy.
+if os.environ.get("POSTGRES_HOST"):
+    DATABASES = {**base.DATABASES}
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": ":memory:",
+        }
+    }
+    READ_REPLICA_DATABASES = []
+
+# A mirror of the primary for tests of replica routing; reads go to it
+# only where READ_REPLICA_DATABASES is overridden.
+DATABASES.setdefault(
+    "replica_0", {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+)
+
+# Room for the per-flight fare keys of large fixtures; locmem culls
+# at 300 entries by default.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 100_000},
+    }
+}
+
+# Deliberately slow hashing would dominate tests that create users.
+# Tests of the production hasher select it themselves.
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+FLIGHT_CATALOG_ENABLED = False
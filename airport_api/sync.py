@@ -0,0 +1,65 @@
+"""
+Per-process copies of database tables, kept up to date incrementally.
+
+Used by the flight catalog and the JWT revocation list.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+
+class IncrementalSync:
+    """
+    Base for in-memory copies brought up to date at most every
+    ``interval_setting`` seconds.
+
+    Subclasses implement ``load(since)``, which applies the rows created
+    at ``since`` or later, or loads everything when ``since`` is None.
+    ``load`` runs under ``_lock``, which code changing the copy between
+    syncs must hold too.
+    """
+
+    # Name of the setting holding the seconds between syncs.
+    interval_setting = None
+    # Rows are read again for this long after they were created, so rows
+    # whose transaction committed after a later row was already seen are
+    # not missed.
+    overlap = timedelta(seconds=60)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._synced_until = None
+        self._next_sync = 0.0
+
+    def load(self, since):
+        raise NotImplementedError
+
+    def sync(self, force=False):
+        if not force and time.monotonic() < self._next_sync:
+            return
+        # Requests arriving during a sync use the current copy instead
+        # of queueing behind it, unless there is no copy yet.
+        if not self._lock.acquire(
+            blocking=force or self._synced_until is None
+        ):
+            return
+        try:
+            if not force and time.monotonic() < self._next_sync:
+                return
+            started = timezone.now()
+            if self._synced_until is None:
+                self.load(None)
+            else:
+                self.load(self._synced_until - self.overlap)
+            self._synced_until = started
+            self._next_sync = time.monotonic() + getattr(
+                settings, self.interval_setting
+            )
+        finally:
+            self._lock.release()
@@ -0,0 +1,163 @@
+import gzip
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.tests.test_airport_api import FLIGHT_LIST_URL, sample_flight
+from airport_api.middleware import (
+    ENCODERS,
+    CompressionMiddleware,
+    choose_encoding,
+    compression_min_size,
+)
+
+BODY = b'{"flights": [' + b'{"id": 1, "route": "A to B"}, ' * 100 + b"]}"
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.middleware = CompressionMiddleware(lambda request: None)
+        self.request = RequestFactory().get(
+            "/", HTTP_ACCEPT_ENCODING="gzip, deflate"
+        )
+
+    def respond(self, response, view=None):
+        if view is not None:
+            self.middleware.process_view(self.request, view, (), {})
+        return self.middleware.process_response(self.request, response)
+
+    def test_compresses_large_bodies(self):
+        response = self.respond(HttpResponse(BODY))
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(
+            response["Content-Length"], str(len(response.content))
+        )
+
+    def test_skips_small_bodies_and_not_modified(self):
+        self.assertFalse(
+            self.respond(HttpResponse(b"{}")).has_header("Content-Encoding")
+        )
+        self.assertFalse(
+            self.respond(HttpResponse(status=304)).has_header(
+                "Content-Encoding"
+            )
+        )
+
+    def test_respects_accept_encoding(self):
+        for header in ("", "identity", "gzip;q=0", "br"):
+            self.request.META["HTTP_ACCEPT_ENCODING"] = header
+            response = self.respond(HttpResponse(BODY))
+            self.assertFalse(response.has_header("Content-Encoding"), header)
+            self.assertEqual(response.content, BODY)
+
+    def test_preference_order_and_availability(self):
+        self.assertEqual(choose_encoding("gzip, zstd;q=0.5, *"), "gzip")
+        with override_settings(COMPRESSION_ENCODINGS=["unknown", "gzip"]):
+            self.assertEqual(choose_encoding("*"), "gzip")
+        with override_settings(COMPRESSION_ENCODINGS=["unknown"]):
+            self.assertIsNone(choose_encoding("*"))
+
+    def test_per_view_threshold(self):
+        @compression_min_size(None)
+        def uncompressed(request):
+            pass
+
+        @compression_min_size(1)
+        def always(request):
+            pass
+
+        response = self.respond(HttpResponse(BODY), uncompressed)
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+        # Long enough to still shrink with the random gzip padding.
+        response = self.respond(HttpResponse(b"x" * 500), always)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_streaming(self):
+        chunks = [BODY[:500], BODY[500:]]
+
+        response = self.respond(StreamingHttpResponse(iter(chunks)))
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+        self.assertEqual(
+            gzip.decompress(b"".join(response.streaming_content)), BODY
+        )
+
+    def test_gzip_length_varies(self):
+        lengths = set()
+        for _ in range(20):
+            response = self.respond(HttpResponse(BODY))
+            self.assertEqual(gzip.decompress(response.content), BODY)
+            lengths.add(len(response.content))
+
+        self.assertGreater(len(lengths), 1)
+
+    @override_settings(COMPRESSION_ENCODINGS=["zstd", "gzip"])
+    def test_csrf_token_responses_only_use_gzip(self):
+        self.request.META["HTTP_ACCEPT_ENCODING"] = "zstd, gzip"
+        # Stands in for zstd, which has no random padding either.
+        with mock.patch.dict(ENCODERS, {"zstd": ENCODERS["gzip"]}):
+            response = self.respond(HttpResponse(BODY))
+            self.assertEqual(response["Content-Encoding"], "zstd")
+
+            get_token(self.request)
+            response = self.respond(HttpResponse(BODY))
+            self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_weakens_etag(self):
+        response = HttpResponse(BODY)
+        response["ETag"] = '"abc"'
+
+        self.assertEqual(self.respond(response)["ETag"], 'W/"abc"')
+
+
+class CompressedApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "user@test.com", "test_password"
+            )
+        )
+
+    def test_flight_list(self):
+        for _ in range(10):
+            sample_flight()
+
+        response = self.client.get(
+            FLIGHT_LIST_URL, HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        flights = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(flights), 10)
+
+    def test_schema_revalidation(self):
+        url = reverse("schema")
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertTrue(response["ETag"].startswith("W/"))
+
+        response = self.client.get(
+            url,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(response.has_header("Content-Encoding"))
@@ -0,0 +1,151 @@
+import threading
+import unittest
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import psycopg2
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TransactionTestCase
+from psycopg2 import extensions
+
+from airport_api.db.postgresql_pool import base
+from airport_api.db.postgresql_pool.base import (
+    BoundedConnectionPool,
+    PoolExhausted,
+)
+
+
+class FakeConnection:
+    closed = 0
+    alive = True
+    info = SimpleNamespace(
+        transaction_status=extensions.TRANSACTION_STATUS_IDLE
+    )
+    checks = 0
+
+    def close(self):
+        self.closed = 1
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+    def execute(self, query):
+        self.checks += 1
+        if not self.alive:
+            raise psycopg2.OperationalError("server closed the connection")
+
+    def rollback(self):
+        pass
+
+
+class OfflinePool(BoundedConnectionPool):
+    """Hands out FakeConnections instead of connecting to a server."""
+
+    def _connect(self, key=None):
+        conn = FakeConnection()
+        if key is not None:
+            self._used[key] = conn
+            self._rused[id(conn)] = key
+        else:
+            self._pool.append(conn)
+        return conn
+
+
+class BoundedConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = OfflinePool(1, 2, timeout=0.05)
+
+    def test_returned_connections_are_reused(self):
+        first = self.pool.getconn()
+        self.pool.putconn(first)
+
+        self.assertIs(self.pool.getconn(), first)
+
+    def test_exhaustion_waits_then_fails(self):
+        self.pool.getconn()
+        self.pool.getconn()
+
+        with self.assertRaises(PoolExhausted):
+            self.pool.getconn()
+
+    def test_idle_connections_are_checked_when_handed_out(self):
+        self.pool.health_check_after = 0
+        first = self.pool.getconn()
+        self.assertEqual(first.checks, 0)
+        self.pool.putconn(first)
+
+        self.assertIs(self.pool.getconn(), first)
+        self.assertEqual(first.checks, 1)
+
+    def test_recently_returned_connections_are_not_checked(self):
+        self.pool.health_check_after = 60
+        first = self.pool.getconn()
+        self.pool.putconn(first)
+
+        self.assertIs(self.pool.getconn(), first)
+        self.assertEqual(first.checks, 0)
+
+    def test_dead_connections_are_replaced(self):
+        self.pool.health_check_after = 0
+        first = self.pool.getconn()
+        self.pool.putconn(first)
+        # The server restarted while the connection sat in the pool.
+        first.alive = False
+
+        replacement = self.pool.getconn()
+
+        self.assertIsNot(replacement, first)
+        self.assertTrue(first.closed)
+        # The dead connection's slot is free for the next checkout.
+        self.pool.getconn()
+
+    def test_waiter_gets_a_returned_connection(self):
+        first = self.pool.getconn()
+        self.pool.getconn()
+        self.pool.timeout = 5
+        threading.Timer(0.05, self.pool.putconn, (first,)).start()
+
+        self.assertIs(self.pool.getconn(), first)
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "Needs a PostgreSQL server"
+)
+class PooledBackendTests(TransactionTestCase):
+    def setUp(self):
+        self.settings_dict = {
+            **connection.settings_dict,
+            "ENGINE": "airport_api.db.postgresql_pool",
+            "CONN_MAX_AGE": 0,
+            "POOL": {"MIN_SIZE": 1, "MAX_SIZE": 1, "TIMEOUT": 0.05},
+        }
+        self.addCleanup(self.close_pool)
+
+    def close_pool(self):
+        connection_pool = base._pools.pop("pooled", None)
+        if connection_pool is not None:
+            connection_pool.closeall()
+
+    def wrapper(self):
+        wrapper = base.DatabaseWrapper(self.settings_dict, alias="pooled")
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_close_returns_the_connection(self):
+        wrapper = self.wrapper()
+        wrapper.ensure_connection()
+        raw_connection = wrapper.connection
+
+        wrapper.close()
+        other = self.wrapper()
+        other.ensure_connection()
+
+        self.assertIs(other.connection, raw_connection)
+        self.assertFalse(raw_connection.closed)
+
+    def test_exhausted_pool_raises_operational_error(self):
+        self.wrapper().ensure_connection()
+
+        with self.assertRaisesMessage(OperationalError, "all 1 are in use"):
+            self.wrapper().ensure_connection()
@@ -0,0 +1,56 @@
+import threading
+from datetime import timedelta
+
+from django.test import SimpleTestCase, override_settings
+
+from airport_api.sync import IncrementalSync
+
+
+class RecordingSync(IncrementalSync):
+    interval_setting = "TEST_SYNC_SECONDS"
+
+    def reset(self):
+        super().reset()
+        self.loads = []
+
+    def load(self, since):
+        self.loads.append(since)
+
+
+@override_settings(TEST_SYNC_SECONDS=60)
+class IncrementalSyncTests(SimpleTestCase):
+    def setUp(self):
+        self.copy = RecordingSync()
+
+    def test_loads_everything_then_rows_since_last_sync(self):
+        self.copy.sync()
+        synced_until = self.copy._synced_until
+        self.copy.sync()
+        self.copy.sync(force=True)
+
+        self.assertEqual(
+            self.copy.loads,
+            [None, synced_until - timedelta(seconds=60)],
+        )
+
+    def test_requests_during_a_sync_use_the_current_copy(self):
+        self.copy.sync()
+        self.copy._next_sync = 0.0
+
+        with self.copy._lock:
+            syncing = threading.Thread(target=self.copy.sync)
+            syncing.start()
+            syncing.join(timeout=1)
+
+            self.assertFalse(syncing.is_alive())
+        self.assertEqual(self.copy.loads, [None])
+
+    def test_first_sync_waits_for_a_running_one(self):
+        with self.copy._lock:
+            syncing = threading.Thread(target=self.copy.sync)
+            syncing.start()
+            syncing.join(timeout=0.1)
+
+            self.assertTrue(syncing.is_alive())
+        syncing.join()
+        self.assertEqual(self.copy.loads, [None])
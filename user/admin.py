@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.utils.translation import gettext as _
 
-from .models import User
+from .models import TokenRevocation, User
 
 
 @admin.register(User)
@@ -36,3 +36,22 @@ class UserAdmin(DjangoUserAdmin):
     list_display = ("email", "first_name", "last_name", "is_staff")
     search_fields = ("email", "first_name", "last_name")
     ordering = ("email",)
+    actions = ("revoke_tokens",)
+
+    @admin.action(description=_("Revoke all tokens of selected users"))
+    def revoke_tokens(self, request, queryset):
+        # simplejwt reads SECRET_KEY on import, which admin autodiscovery
+        # must not depend on.
+        from .revocation import revoke_user_tokens
+
+        users = list(queryset)
+        revoke_user_tokens(*users)
+        self.message_user(request, f"Revoked tokens of {len(users)} users")
+
+
+@admin.register(TokenRevocation)
+class TokenRevocationAdmin(admin.ModelAdmin):
+    list_display = ("id", "jti", "user", "created_at", "expires_at")
+    list_select_related = ("user",)
+    search_fields = ("=jti", "user__email")
+    raw_id_fields = ("user",)
@@ -0,0 +1,18 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .revocation import revocation_list
+
+
+def check_not_revoked(token):
+    if revocation_list.is_revoked(token):
+        raise InvalidToken(
+            {"detail": "Token has been revoked", "code": "token_revoked"}
+        )
+
+
+class RevocableJWTAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        check_not_revoked(token)
+        return token
@@ -0,0 +1,20 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler as drf_exception_handler
+
+from .hashing import PasswordHashingBusy
+
+
+class PasswordHashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = PasswordHashingBusy.message
+    default_code = "password_hashing_busy"
+    # Sent as Retry-After by DRF's exception handler.
+    wait = PasswordHashingBusy.retry_after
+
+
+def exception_handler(exc, context):
+    """DRF's exception handler, answering a full hashing pool with 503."""
+    if isinstance(exc, PasswordHashingBusy):
+        exc = PasswordHashingUnavailable()
+    return drf_exception_handler(exc, context)
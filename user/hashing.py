@@ -0,0 +1,84 @@
+"""
+Password hashing on a bounded thread pool.
+
+PBKDF2 is deliberately slow, and during a login storm every worker
+thread ends up hashing. All hashing and verification goes through
+PBKDF2PasswordHasher.encode, which runs on a pool of
+PASSWORD_HASH_WORKERS threads, so at most that many hashes are computed
+at once per process and the remaining CPU stays available for other
+requests. hashlib releases the GIL while deriving keys, so threads run
+in parallel. Up to PASSWORD_HASH_QUEUE_SIZE more callers wait for a
+slot. When the queue is full, callers wait up to PASSWORD_HASH_TIMEOUT
+seconds and then get PasswordHashingBusy instead of piling up, which
+API and admin requests answer with a 503.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PasswordHashingBusy(Exception):
+    """The hashing pool and its queue stayed full."""
+
+    message = "Too many sign-ins in progress, try again shortly."
+    # Seconds after which clients should retry.
+    retry_after = 1
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = settings.PASSWORD_HASH_WORKERS
+            _pool = (
+                ThreadPoolExecutor(workers, thread_name_prefix="hashing"),
+                threading.BoundedSemaphore(
+                    workers + settings.PASSWORD_HASH_QUEUE_SIZE
+                ),
+            )
+        return _pool
+
+
+@receiver(setting_changed)
+def _reset_pool(setting, **kwargs):
+    global _pool
+    if setting.startswith("PASSWORD_HASH_"):
+        with _pool_lock:
+            if _pool is not None:
+                _pool[0].shutdown(wait=False)
+            _pool = None
+
+
+def run_in_pool(func, *args):
+    executor, slots = _get_pool()
+    if not slots.acquire(timeout=settings.PASSWORD_HASH_TIMEOUT):
+        raise PasswordHashingBusy()
+    try:
+        return executor.submit(func, *args).result()
+    finally:
+        slots.release()
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with PASSWORD_HASH_ITERATIONS iterations, computed on
+    the hashing pool.
+
+    Hashes with another iteration count still verify. Django's
+    check_password re-encodes them with the current count on the next
+    successful login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
+
+    def encode(self, password, salt, iterations=None):
+        return run_in_pool(super().encode, password, salt, iterations)
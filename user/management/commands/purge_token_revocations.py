@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from user.models import TokenRevocation
+
+
+class Command(BaseCommand):
+    help = "Delete token revocations whose tokens have expired"
+
+    def handle(self, *args, **options):
+        deleted, _ = TokenRevocation.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} token revocations")
+        )
@@ -0,0 +1,22 @@
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from .hashing import PasswordHashingBusy
+
+
+class PasswordHashingBusyMiddleware(MiddlewareMixin):
+    """
+    Answer a full hashing pool with 503 on Django views such as the
+    admin login. API views are handled by user.exceptions.
+    """
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, PasswordHashingBusy):
+            return None
+        response = HttpResponse(
+            exception.message,
+            status=503,
+            content_type="text/plain; charset=utf-8",
+        )
+        response["Retry-After"] = str(exception.retry_after)
+        return response
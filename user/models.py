@@ -3,6 +3,7 @@ from django.contrib.auth.models import (
     BaseUserManager,
 )
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext as _
 
 
@@ -43,3 +44,27 @@ class User(AbstractUser):
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+
+
+class TokenRevocation(models.Model):
+    """
+    Revokes a single JWT by ``jti``, or every token of ``user`` issued
+    up to ``created_at``. Rows can be purged once ``expires_at`` passes,
+    as the tokens they revoke have expired by then.
+    """
+
+    jti = models.CharField(max_length=255, blank=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="token_revocations",
+        null=True,
+        blank=True,
+    )
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        if self.jti:
+            return f"Token {self.jti}"
+        return f"All tokens of {self.user} until {self.created_at}"
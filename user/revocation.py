@@ -0,0 +1,135 @@
+"""
+JWT revocation.
+
+Revocations are rows of TokenRevocation. Each process keeps an
+in-memory copy (the revoked ``jti`` and a revocation cutoff per user,
+both in dicts) so checking a token is a hash lookup. The copy is brought up to
+date from the table at most every TOKEN_REVOCATION_SYNC_SECONDS. A sync
+reads only the rows created since the last one, so revocations reach
+every worker within seconds at the cost of one small indexed query per
+interval.
+"""
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from airport_api.sync import IncrementalSync
+
+from .models import TokenRevocation
+
+# Seconds between dropping expired revocations from memory.
+PRUNE_INTERVAL = 60
+# Issue time with microseconds. "iat" has whole seconds, so it can't
+# tell whether a token issued in the same second as a revocation of all
+# of a user's tokens came before it or after it.
+ISSUED_AT_CLAIM = "issued_at"
+
+
+class RevocableRefreshToken(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        # Access tokens made from the refresh token copy the claim.
+        token[ISSUED_AT_CLAIM] = token.current_time.timestamp()
+        return token
+
+
+class RevocationList(IncrementalSync):
+    interval_setting = "TOKEN_REVOCATION_SYNC_SECONDS"
+
+    def reset(self):
+        super().reset()
+        self._jtis = {}
+        self._user_cutoffs = {}
+        self._next_prune = 0.0
+
+    def add(self, revocation):
+        with self._lock:
+            self._add(revocation)
+
+    def _add(self, revocation):
+        expires_at = revocation.expires_at.timestamp()
+        if revocation.jti:
+            self._jtis[revocation.jti] = expires_at
+        if revocation.user_id:
+            cutoff = revocation.created_at.timestamp()
+            previous = self._user_cutoffs.get(revocation.user_id)
+            if previous is None or cutoff > previous[0]:
+                self._user_cutoffs[revocation.user_id] = cutoff, expires_at
+
+    def _prune(self):
+        now = time.time()
+        self._jtis = {
+            jti: expires_at
+            for jti, expires_at in self._jtis.items()
+            if expires_at > now
+        }
+        self._user_cutoffs = {
+            user_id: cutoff
+            for user_id, cutoff in self._user_cutoffs.items()
+            if cutoff[1] > now
+        }
+
+    def load(self, since):
+        revocations = TokenRevocation.objects.filter(
+            expires_at__gt=timezone.now()
+        )
+        if since is not None:
+            revocations = revocations.filter(created_at__gte=since)
+        for revocation in revocations.only(
+            "jti", "user", "created_at", "expires_at"
+        ):
+            self._add(revocation)
+
+        now = time.monotonic()
+        if now >= self._next_prune:
+            self._prune()
+            self._next_prune = now + PRUNE_INTERVAL
+
+    def is_revoked(self, token):
+        self.sync()
+        if token.get(api_settings.JTI_CLAIM) in self._jtis:
+            return True
+        cutoff = self._user_cutoffs.get(token.get(api_settings.USER_ID_CLAIM))
+        if cutoff is None:
+            return False
+        # Tokens issued without the claim are compared by "iat", so
+        # those issued in the same second as the revocation are revoked.
+        issued_at = token.get(ISSUED_AT_CLAIM, token.get("iat", 0))
+        return issued_at <= cutoff[0]
+
+
+revocation_list = RevocationList()
+
+
+def _token_expiry(token):
+    return datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc)
+
+
+def revoke_tokens(*tokens):
+    """Revoke the given simplejwt tokens."""
+    revocations = TokenRevocation.objects.bulk_create(
+        TokenRevocation(
+            jti=token[api_settings.JTI_CLAIM], expires_at=_token_expiry(token)
+        )
+        for token in tokens
+    )
+    for revocation in revocations:
+        revocation_list.add(revocation)
+
+
+def revoke_user_tokens(*users):
+    """Revoke every token issued so far to the given users."""
+    now = timezone.now()
+    expires_at = now + max(
+        api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME
+    )
+    revocations = TokenRevocation.objects.bulk_create(
+        TokenRevocation(user=user, created_at=now, expires_at=expires_at)
+        for user in users
+    )
+    for revocation in revocations:
+        revocation_list.add(revocation)
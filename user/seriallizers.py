@@ -1,5 +1,16 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+
+from .authentication import check_not_revoked
+from .revocation import RevocableRefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -20,3 +31,38 @@ class UserSerializer(serializers.ModelSerializer):
             user.save()
 
         return user
+
+
+class RevocableTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = RevocableRefreshToken
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        check_not_revoked(self.token_class(attrs["refresh"]))
+        return super().validate(attrs)
+
+
+class RevocableTokenVerifySerializer(TokenVerifySerializer):
+    def validate(self, attrs):
+        check_not_revoked(UntypedToken(attrs["token"]))
+        return super().validate(attrs)
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(
+        required=False, help_text="Refresh token to revoke as well"
+    )
+    everywhere = serializers.BooleanField(
+        default=False, help_text="Revoke every token of the user"
+    )
+
+    def validate_refresh(self, value):
+        try:
+            refresh = RefreshToken(value)
+        except TokenError as error:
+            raise serializers.ValidationError(str(error))
+        user = self.context["request"].user
+        if refresh.get(api_settings.USER_ID_CLAIM) != user.id:
+            raise serializers.ValidationError("Token belongs to another user")
+        return refresh
@@ -0,0 +1,89 @@
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user import hashing
+
+REGISTER_URL = reverse("user:create")
+ADMIN_LOGIN_URL = reverse("admin:login")
+
+
+@override_settings(
+    PASSWORD_HASHERS=["user.hashing.PBKDF2PasswordHasher"],
+    PASSWORD_HASH_ITERATIONS=1000,
+)
+class PasswordHashingTests(TestCase):
+    def test_iterations_come_from_settings(self):
+        self.assertTrue(
+            make_password("password").startswith("pbkdf2_sha256$1000$")
+        )
+
+    def test_login_rehashes_with_current_iterations(self):
+        user = get_user_model().objects.create_user(
+            "user@test.com", "password"
+        )
+
+        with self.settings(PASSWORD_HASH_ITERATIONS=2000):
+            self.assertEqual(
+                authenticate(email="user@test.com", password="password"), user
+            )
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$2000$"))
+        self.assertTrue(user.check_password("password"))
+
+    def fill_pool(self):
+        _, slots = hashing._get_pool()
+        slots.acquire()
+        self.addCleanup(slots.release)
+
+    @override_settings(
+        PASSWORD_HASH_WORKERS=1,
+        PASSWORD_HASH_QUEUE_SIZE=0,
+        PASSWORD_HASH_TIMEOUT=0,
+    )
+    def test_full_pool_rejects_with_503(self):
+        self.fill_pool()
+
+        response = APIClient().post(
+            REGISTER_URL, {"email": "new@test.com", "password": "password"}
+        )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertFalse(get_user_model().objects.exists())
+
+    @override_settings(
+        PASSWORD_HASH_WORKERS=1,
+        PASSWORD_HASH_QUEUE_SIZE=0,
+        PASSWORD_HASH_TIMEOUT=0,
+    )
+    def test_full_pool_rejects_admin_login_with_503(self):
+        get_user_model().objects.create_superuser("admin@test.com", "password")
+        self.fill_pool()
+
+        response = self.client.post(
+            ADMIN_LOGIN_URL,
+            {"username": "admin@test.com", "password": "password"},
+        )
+
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(response["Retry-After"], "1")
+
+    @override_settings(
+        PASSWORD_HASH_WORKERS=1,
+        PASSWORD_HASH_QUEUE_SIZE=0,
+        PASSWORD_HASH_TIMEOUT=0,
+    )
+    def test_full_pool_raises_outside_requests(self):
+        self.fill_pool()
+
+        with self.assertRaises(hashing.PasswordHashingBusy):
+            make_password("password")
@@ -0,0 +1,167 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from user.models import TokenRevocation
+from user.revocation import revocation_list
+
+ME_URL = reverse("user:manage")
+LOGOUT_URL = reverse("user:logout")
+TOKEN_URL = reverse("user:token_obtain_pair")
+REFRESH_URL = reverse("user:token_refresh")
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        revocation_list.reset()
+        self.addCleanup(revocation_list.reset)
+        self.user = get_user_model().objects.create_user(
+            "user@test.com", "password"
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+        self.access = self.refresh.access_token
+        self.client = self.client_for(self.access)
+
+    def client_for(self, access):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return client
+
+    def test_logout_revokes_access_and_refresh_token(self):
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+
+        response = self.client.post(LOGOUT_URL, {"refresh": str(self.refresh)})
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            self.client.get(ME_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        response = APIClient().post(
+            REFRESH_URL, {"refresh": str(self.refresh)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cannot_revoke_refresh_token_of_another_user(self):
+        other = get_user_model().objects.create_user(
+            "other@test.com", "password"
+        )
+
+        response = self.client.post(
+            LOGOUT_URL, {"refresh": str(RefreshToken.for_user(other))}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(TokenRevocation.objects.exists())
+
+    def test_logout_everywhere_revokes_earlier_tokens_only(self):
+        other_session = self.client_for(
+            RefreshToken.for_user(self.user).access_token
+        )
+
+        self.client.post(LOGOUT_URL, {"everywhere": True})
+
+        self.assertEqual(
+            other_session.get(ME_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        # Logging in again straight away, within the same second, gives
+        # valid tokens.
+        response = APIClient().post(
+            TOKEN_URL, {"email": "user@test.com", "password": "password"}
+        )
+        later = self.client_for(response.data["access"])
+        self.assertEqual(later.get(ME_URL).status_code, 200)
+        response = APIClient().post(
+            REFRESH_URL, {"refresh": response.data["refresh"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(revocation_list.is_revoked(self.access))
+
+    def test_revocations_from_other_workers_are_synced(self):
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+        TokenRevocation.objects.create(
+            jti=self.access["jti"],
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        # Another worker's revocation is picked up within the interval.
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+
+        with override_settings(TOKEN_REVOCATION_SYNC_SECONDS=0):
+            revocation_list.sync(force=True)
+
+        self.assertEqual(
+            self.client.get(ME_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    def test_check_between_syncs_does_not_query(self):
+        revocation_list.sync(force=True)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(revocation_list.is_revoked(self.access))
+
+    def test_admin_action_revokes_user_tokens(self):
+        admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "password"
+        )
+        self.client.force_login(admin)
+
+        self.client.post(
+            reverse("admin:user_user_changelist"),
+            {"action": "revoke_tokens", "_selected_action": [self.user.id]},
+        )
+
+        self.assertTrue(revocation_list.is_revoked(self.access))
+
+    def test_revocations_wait_for_a_running_prune(self):
+        revocation = TokenRevocation(
+            jti="revoked-while-pruning",
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        adding = threading.Thread(
+            target=revocation_list.add, args=(revocation,)
+        )
+        prune = revocation_list._prune
+
+        def prune_while_adding():
+            adding.start()
+            adding.join(timeout=0.1)
+            # Instead of changing the dicts the prune iterates.
+            self.assertTrue(adding.is_alive())
+            prune()
+
+        with mock.patch.object(
+            revocation_list, "_prune", side_effect=prune_while_adding
+        ):
+            revocation_list.sync(force=True)
+        adding.join()
+
+        self.assertTrue(
+            revocation_list.is_revoked({"jti": "revoked-while-pruning"})
+        )
+
+    def test_purge_deletes_expired_revocations(self):
+        now = timezone.now()
+        kept = TokenRevocation.objects.create(
+            jti="kept", expires_at=now + timedelta(hours=1)
+        )
+        TokenRevocation.objects.create(jti="expired", expires_at=now)
+
+        out = StringIO()
+        call_command("purge_token_revocations", stdout=out)
+
+        self.assertIn("Deleted 1 token revocations", out.getvalue())
+        self.assertQuerySetEqual(TokenRevocation.objects.all(), [kept])
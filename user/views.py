@@ -1,8 +1,10 @@
-from rest_framework import generics
+from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.response import Response
 
-from .seriallizers import UserSerializer
+from .authentication import RevocableJWTAuthentication
+from .revocation import revoke_tokens, revoke_user_tokens
+from .seriallizers import LogoutSerializer, UserSerializer
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -11,8 +13,31 @@ class CreateUserView(generics.CreateAPIView):
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (RevocableJWTAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
         return self.request.user
+
+
+class LogoutView(generics.GenericAPIView):
+    """
+    Revoke the access token of the request and the given refresh token,
+    or with ``everywhere`` every token issued to the user so far.
+    """
+
+    serializer_class = LogoutSerializer
+    authentication_classes = (RevocableJWTAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if serializer.validated_data["everywhere"]:
+            revoke_user_tokens(request.user)
+        else:
+            tokens = [request.auth]
+            if "refresh" in serializer.validated_data:
+                tokens.append(serializer.validated_data["refresh"])
+            revoke_tokens(*tokens)
+        return Response(status=status.HTTP_204_NO_CONTENT)